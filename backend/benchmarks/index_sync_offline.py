@@ -0,0 +1,122 @@
+"""
+Offline Knowledge Base Sync Benchmark
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Compares a full re-embed with a diff-based sync as the catalog grows
+
+For each catalog size, a manifest is built from a full sync, then a
+fraction of listings is edited, un-approved or deleted and an incremental
+sync is planned against it. Planning (hashing and diffing) is measured for
+real; embedding is charged per document at --embed-ms (all-MiniLM-L6-v2 on
+CPU is a few ms per listing), so no model or Chroma is needed.
+
+Usage (from backend/):
+    python benchmarks/index_sync_offline.py
+    python benchmarks/index_sync_offline.py --sizes 1k,10000,100k --change-rate 0.01 --embed-ms 4
+    python benchmarks/index_sync_offline.py --output sync.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import generate_dataset, resolve_scale
+from services.index_sync import IndexManifest
+
+
+def listing_dicts(scale: str, seed: int) -> List[Dict[str, Any]]:
+    """Approved synthetic listings in the Firestore document shape"""
+    dataset = generate_dataset(scale, seed=seed)
+    return [
+        {
+            'id': l.id, 'title': l.title, 'description': l.description, 'category': l.category,
+            'location': l.location, 'price': l.price, 'currency': 'USD', 'amenities': l.amenities,
+            'tags': l.tags, 'partnerId': l.partner_id, 'status': 'approved', 'updatedAt': l.updated_at,
+        }
+        for l in dataset.listings
+    ]
+
+
+def run_size(scale: str, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    listings = listing_dicts(scale, args.seed)
+    live_ids = {listing['id'] for listing in listings}
+
+    manifest = IndexManifest()
+    start = time.perf_counter()
+    full_plan = manifest.plan(listings, live_ids)
+    full_plan_ms = (time.perf_counter() - start) * 1000
+    manifest.commit(full_plan)
+
+    # Edit / un-approve / delete a fraction of the catalog
+    changed = []
+    for listing in rng.sample(listings, max(1, int(len(listings) * args.change_rate))):
+        roll = rng.random()
+        if roll < 0.8:
+            changed.append({**listing, 'price': listing['price'] + 1})
+        elif roll < 0.9:
+            changed.append({**listing, 'status': 'suspended'})
+            live_ids.discard(listing['id'])
+        else:
+            live_ids.discard(listing['id'])
+
+    start = time.perf_counter()
+    plan = manifest.plan(changed, live_ids)
+    sync_plan_ms = (time.perf_counter() - start) * 1000
+
+    full_ms = full_plan_ms + len(listings) * args.embed_ms
+    sync_ms = sync_plan_ms + len(plan.upserts) * args.embed_ms
+    return {
+        "listings": len(listings),
+        "changed": len(changed),
+        "plan": plan.summary(),
+        "full_reembed_ms": round(full_ms, 1),
+        "diff_sync_ms": round(sync_ms, 1),
+        "diff_plan_ms": round(sync_plan_ms, 2),
+        "speedup": round(full_ms / sync_ms, 1) if sync_ms else None,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 72)
+    print(f"Knowledge base sync: change rate {report['change_rate']:.1%}, "
+          f"{report['embed_ms']}ms per embedded document")
+    print("=" * 72)
+    print(f"{'listings':>9} {'embedded':>9} {'deleted':>8} {'full re-embed':>14} {'diff sync':>11} {'speedup':>8}")
+    for row in report["results"]:
+        print(f"{row['listings']:>9} {row['plan']['upserted']:>9} {row['plan']['deleted']:>8} "
+              f"{row['full_reembed_ms'] / 1000:>13.1f}s {row['diff_sync_ms'] / 1000:>10.2f}s "
+              f"{row['speedup']:>7}x")
+    print("=" * 72 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline knowledge base sync benchmark")
+    parser.add_argument("--sizes", default="1k,10000,100k", help="Comma-separated catalog sizes (1k, 100k, 1m or a number)")
+    parser.add_argument("--change-rate", type=float, default=0.01, help="Fraction of listings changed between syncs")
+    parser.add_argument("--embed-ms", type=float, default=4.0, help="Embedding cost per document")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    sizes = [int(size) if size.isdigit() else size for size in (s.strip() for s in args.sizes.split(",")) if size]
+    report = {
+        "change_rate": args.change_rate,
+        "embed_ms": args.embed_ms,
+        "results": [run_size(size, args) for size in sorted(sizes, key=resolve_scale)],
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Concurrency Benchmark for /api/listings
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Measures request latency (P50/P95/P99) with N concurrent clients
+
+Why this exists:
+The data layer used to call the sync Firestore client directly inside
+`async def` handlers, so one slow read froze the uvicorn event loop and every
+concurrent request queued behind it. This script makes that visible: with a
+blocking data layer P99 grows roughly linearly with the number of clients,
+with the non-blocking layer it stays close to a single Firestore round trip.
+
+Usage (server must be running, e.g. `python main.py`):
+    # Before: check out the commit prior to the executor change
+    python benchmarks/listings_concurrency.py --label before --output before.json
+
+    # After: current tree
+    python benchmarks/listings_concurrency.py --label after --output after.json
+
+    # Side-by-side
+    python benchmarks/listings_concurrency.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+import requests
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_client(url: str, params: Dict[str, Any], requests_per_client: int, timeout: float) -> Dict[str, Any]:
+    """One simulated client issuing sequential requests"""
+    session = requests.Session()
+    latencies = []
+    errors = 0
+
+    for _ in range(requests_per_client):
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+            if response.status_code != 200:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_benchmark(
+    base_url: str,
+    clients: int,
+    requests_per_client: int,
+    params: Dict[str, Any],
+    timeout: float
+) -> Dict[str, Any]:
+    """Fire `clients` concurrent clients at /api/listings and aggregate latencies"""
+    url = f"{base_url.rstrip('/')}/api/listings"
+
+    # Warm up (first call pays connection setup + Firestore channel init)
+    requests.get(url, params=params, timeout=timeout)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(
+            lambda _: run_client(url, params, requests_per_client, timeout),
+            range(clients)
+        ))
+    wall_seconds = time.perf_counter() - wall_start
+
+    latencies = [lat for r in results for lat in r["latencies"]]
+    errors = sum(r["errors"] for r in results)
+
+    return {
+        "url": url,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_rps": round(len(latencies) / wall_seconds, 1) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.mean(latencies), 1) if latencies else 0.0,
+    }
+
+
+def print_result(label: str, result: Dict[str, Any]):
+    print(f"\n📊 {label}")
+    print("-" * 50)
+    for key in ["clients", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "mean_ms"]:
+        print(f"  {key:<16} {result[key]}")
+
+
+def compare(before_path: str, after_path: str):
+    """Print a before/after table from two saved runs"""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"\n{'metric':<16}{'before':>12}{'after':>12}{'change':>10}")
+    print("-" * 50)
+    for key in ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]:
+        b, a = before[key], after[key]
+        change = f"{(a - b) / b:+.0%}" if b else "n/a"
+        print(f"{key:<16}{b:>12}{a:>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for /api/listings")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--category", default=None)
+    parser.add_argument("--location", default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", default=None, help="Save JSON result to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    params = {k: v for k, v in {"category": args.category, "location": args.location}.items() if v}
+
+    try:
+        result = run_benchmark(args.base_url, args.clients, args.requests_per_client, params, args.timeout)
+    except requests.RequestException as e:
+        print(f"❌ Could not reach server at {args.base_url}: {e}")
+        sys.exit(1)
+
+    result["label"] = args.label
+    print_result(args.label, result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
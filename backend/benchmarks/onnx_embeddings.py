@@ -0,0 +1,200 @@
+"""
+ONNX Embedding Backend Benchmark
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Latency and recall of the int8 ONNX backend against sentence-transformers
+
+Encodes synthetic listing texts and search queries with both backends and
+reports:
+- query latency (one text per call, as on the search and intent paths)
+  and document throughput (batched, as when indexing)
+- agreement: cosine similarity between the two vectors of every text
+- recall@k of ONNX query vectors against a PyTorch-built index (the
+  existing indexes) and against an ONNX-built index, with the PyTorch
+  top-k as ground truth
+
+Exits non-zero when the export misses the compatibility tolerance
+documented in services/onnx_embeddings.py.
+
+Needs sentence-transformers, requirements-onnx.txt and an exported model:
+    python -m services.onnx_embeddings export ./onnx_models/all-MiniLM-L6-v2-int8
+
+Usage (from backend/):
+    python benchmarks/onnx_embeddings.py
+    python benchmarks/onnx_embeddings.py --scale 1k --queries 300 --k 10 --output onnx.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import generate_dataset, CATEGORIES, LOCATIONS, TAGS
+from services.index_sync import listing_document
+from services.onnx_embeddings import (
+    OnnxEmbeddings, SOURCE_MODEL, DEFAULT_MODEL_DIR, MIN_MEAN_COSINE, MIN_COSINE, MIN_RECALL
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def corpus(scale: str, queries: int, seed: int):
+    """Listing texts as indexed by the trainer, and search-style queries"""
+    dataset = generate_dataset(scale, seed=seed)
+    documents = [
+        listing_document({
+            'id': l.id, 'title': l.title, 'description': l.description, 'category': l.category,
+            'location': l.location, 'price': l.price, 'amenities': l.amenities, 'tags': l.tags,
+        })[0]
+        for l in dataset.listings
+    ]
+    rng = random.Random(seed)
+    texts = [
+        rng.choice([
+            f"{rng.choice(TAGS)} {rng.choice(CATEGORIES)} in {rng.choice(LOCATIONS)}",
+            f"cheap {rng.choice(CATEGORIES)} near {rng.choice(LOCATIONS)}",
+            f"best {rng.choice(TAGS)} experience for families",
+        ])
+        for _ in range(queries)
+    ]
+    return documents, texts
+
+
+def timed_queries(encode, queries: List[str]) -> Dict[str, float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        encode([query])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+    }
+
+
+def timed_documents(encode, documents: List[str]):
+    start = time.perf_counter()
+    vectors = np.asarray(encode(documents), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    return vectors, round(len(documents) / elapsed, 1)
+
+
+def top_k(queries: np.ndarray, index: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ index.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    from sentence_transformers import SentenceTransformer  # type: ignore[import-not-found]
+
+    documents, queries = corpus(args.scale, args.queries, args.seed)
+
+    start = time.perf_counter()
+    torch_model = SentenceTransformer(SOURCE_MODEL, device='cpu')
+    torch_load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    onnx_model = OnnxEmbeddings(args.model_dir, threads=args.threads)
+    onnx_load_ms = (time.perf_counter() - start) * 1000
+
+    def torch_encode(texts):
+        return torch_model.encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+
+    # Warm both up so one-off initialization isn't timed
+    torch_encode(queries[:4])
+    onnx_model.encode(queries[:4])
+
+    torch_docs, torch_docs_per_s = timed_documents(torch_encode, documents)
+    onnx_docs, onnx_docs_per_s = timed_documents(onnx_model.encode, documents)
+    torch_latency = timed_queries(torch_encode, queries)
+    onnx_latency = timed_queries(onnx_model.encode, queries)
+
+    torch_queries = np.asarray(torch_encode(queries), dtype=np.float32)
+    onnx_queries = onnx_model.encode(queries)
+    cosines = np.concatenate([
+        np.sum(torch_docs * onnx_docs, axis=1),
+        np.sum(torch_queries * onnx_queries, axis=1),
+    ])
+
+    k = min(args.k, len(documents))
+    truth = top_k(torch_queries, torch_docs, k)
+    report = {
+        "documents": len(documents),
+        "queries": len(queries),
+        "k": k,
+        "torch": {"load_ms": round(torch_load_ms, 1), "query": torch_latency, "docs_per_second": torch_docs_per_s},
+        "onnx": {"load_ms": round(onnx_load_ms, 1), "query": onnx_latency, "docs_per_second": onnx_docs_per_s},
+        "query_speedup": round(torch_latency["mean_ms"] / onnx_latency["mean_ms"], 2),
+        "cosine_mean": round(float(cosines.mean()), 4),
+        "cosine_min": round(float(cosines.min()), 4),
+        "recall_existing_index": round(recall(top_k(onnx_queries, torch_docs, k), truth), 4),
+        "recall_onnx_index": round(recall(top_k(onnx_queries, onnx_docs, k), truth), 4),
+    }
+    report["within_tolerance"] = (
+        report["cosine_mean"] >= MIN_MEAN_COSINE
+        and report["cosine_min"] >= MIN_COSINE
+        and report["recall_existing_index"] >= MIN_RECALL
+        and report["recall_onnx_index"] >= MIN_RECALL
+    )
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 72)
+    print(f"Embedding backends: {report['documents']} documents, {report['queries']} queries, k={report['k']}")
+    print("=" * 72)
+    print(f"{'backend':<8} {'load':>9} {'query p50':>10} {'query p95':>10} {'docs/s':>9}")
+    for name in ("torch", "onnx"):
+        row = report[name]
+        print(f"{name:<8} {row['load_ms']:>7.0f}ms {row['query']['p50_ms']:>8.2f}ms "
+              f"{row['query']['p95_ms']:>8.2f}ms {row['docs_per_second']:>9.1f}")
+    print(f"\nQuery speedup: {report['query_speedup']}x")
+    print(f"Cosine to PyTorch vectors: mean {report['cosine_mean']} (>= {MIN_MEAN_COSINE}), "
+          f"min {report['cosine_min']} (>= {MIN_COSINE})")
+    print(f"Recall@{report['k']}: existing index {report['recall_existing_index']}, "
+          f"ONNX index {report['recall_onnx_index']} (>= {MIN_RECALL})")
+    print(("✅ Within" if report["within_tolerance"] else "❌ Outside") + " compatibility tolerance")
+    print("=" * 72 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX vs PyTorch embedding benchmark")
+    parser.add_argument("--scale", default="1k", help="Synthetic catalog size (1k, 100k or a number)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of search queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for recall")
+    parser.add_argument("--model-dir", default=os.getenv('ONNX_MODEL_DIR', DEFAULT_MODEL_DIR))
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+    sys.exit(0 if report["within_tolerance"] else 1)
+
+
+if __name__ == "__main__":
+    main()
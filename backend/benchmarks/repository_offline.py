@@ -0,0 +1,153 @@
+"""
+Offline Repository Benchmark
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Measures data-layer latency and backend call counts without Firebase
+
+Runs a mixed, popularity-skewed workload (listing reads, filtered browse,
+saved-item hydration, availability checks) with N concurrent workers
+against InMemoryRepository, optionally wrapped in CachedRepository. The
+latency model stands in for a Firestore round trip, so cache and batching
+changes show up as fewer backend calls and lower percentiles.
+
+Usage (from backend/):
+    python benchmarks/repository_offline.py --scale 100k
+    python benchmarks/repository_offline.py --scale 1k --no-cache --base-ms 10 --jitter-ms 5
+    python benchmarks/repository_offline.py --scale 100k --output after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import CachedRepository, SearchFilters
+from data.memory_repository import InMemoryRepository, LatencyModel
+from data.synthetic import generate_dataset, CATEGORIES, LOCATIONS, EPOCH
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_worker(repo, dataset, operations: int, seed: int, latencies: Dict[str, List[float]]):
+    """One worker issuing a mixed sequence of repository calls"""
+    rng = random.Random(seed)
+    hot_ids = dataset.sample_listing_ids(operations, seed=seed)
+    travelers = dataset.preferences
+
+    for i in range(operations):
+        roll = rng.random()
+        start = time.perf_counter()
+
+        if roll < 0.45:
+            kind = 'get_listing'
+            await repo.get_listing(hot_ids[i])
+        elif roll < 0.70:
+            kind = 'browse'
+            filters = SearchFilters(category=rng.choice(CATEGORIES), location=rng.choice(LOCATIONS))
+            await repo.get_listings_page(filters, page_size=20)
+        elif roll < 0.85:
+            kind = 'saved_items'
+            user_id = rng.choice(travelers).user_id
+            saved = await repo.get_user_saved_listings(user_id)
+            await repo.get_listings_batch(saved)
+        else:
+            kind = 'availability'
+            check_in = EPOCH + timedelta(days=rng.randint(-30, 90))
+            await repo.check_availability(hot_ids[i], check_in, check_in + timedelta(days=rng.randint(1, 5)))
+
+        latencies.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    print(f"📦 Generating '{args.scale}' dataset (seed={args.seed})...")
+    gen_start = time.perf_counter()
+    dataset = generate_dataset(args.scale, seed=args.seed)
+    print(f"   {dataset.summary()} in {time.perf_counter() - gen_start:.1f}s")
+
+    base = InMemoryRepository.from_dataset(
+        dataset,
+        latency=LatencyModel(base_ms=args.base_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+    )
+    repo = base if args.no_cache else CachedRepository(base_repository=base)
+
+    latencies: Dict[str, List[float]] = {}
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[
+        run_worker(repo, dataset, args.operations, args.seed + worker, latencies)
+        for worker in range(args.workers)
+    ])
+    wall_seconds = time.perf_counter() - wall_start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "label": args.label,
+        "scale": args.scale,
+        "cached": not args.no_cache,
+        "workers": args.workers,
+        "operations": len(all_latencies),
+        "throughput_ops": round(len(all_latencies) / wall_seconds, 1),
+        "backend_calls": dict(base.calls),
+        "overall": summarize(all_latencies),
+        "by_operation": {kind: summarize(values) for kind, values in sorted(latencies.items())},
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 60)
+    print(f"Offline repository benchmark [{report['label']}] - scale {report['scale']}, "
+          f"{'cached' if report['cached'] else 'uncached'}")
+    print("=" * 60)
+    print(f"Operations: {report['operations']}  Throughput: {report['throughput_ops']} ops/s")
+    print(f"Backend calls: {sum(report['backend_calls'].values())}")
+    for kind, stats in report["by_operation"].items():
+        print(f"  {kind:<14} n={stats['count']:<6} P50 {stats['p50_ms']:>7}ms  "
+              f"P95 {stats['p95_ms']:>7}ms  P99 {stats['p99_ms']:>7}ms")
+    print("=" * 60 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline data-layer benchmark")
+    parser.add_argument("--scale", default="1k", help="1k, 100k, 1m or a number of listings")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--operations", type=int, default=200, help="Operations per worker")
+    parser.add_argument("--base-ms", type=float, default=8.0, help="Simulated round trip")
+    parser.add_argument("--jitter-ms", type=float, default=4.0)
+    parser.add_argument("--no-cache", action="store_true", help="Benchmark the raw repository")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
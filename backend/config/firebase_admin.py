@@ -4,6 +4,9 @@ Initializes Firebase Admin for server-side operations
 """
 
 import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 from dotenv import load_dotenv
@@ -78,3 +81,89 @@ def init_db():
     if db is None:
         db = get_firestore_client()
     return db
+
+
+# Bounded thread pool for blocking Firestore calls
+# The google-cloud-firestore sync client does network I/O on the calling thread,
+# so every call made from an async endpoint must be pushed off the event loop.
+_firestore_executor = None
+
+def get_firestore_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool used for Firestore I/O
+    Size is controlled by FIRESTORE_MAX_WORKERS (default: 32)
+    """
+    global _firestore_executor
+    if _firestore_executor is None:
+        max_workers = int(os.getenv('FIRESTORE_MAX_WORKERS', '32'))
+        _firestore_executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='firestore'
+        )
+    return _firestore_executor
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking Firestore call on the shared executor
+    
+    Usage:
+        doc = await run_blocking(doc_ref.get)
+        docs = await run_blocking(query.get)
+    
+    Note: query.stream() is lazy - use query.get() (or wrap the whole
+    iteration) so the network reads happen on the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_firestore_executor(),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def _take(iterator, count: int) -> list:
+    """Pull up to count items from a blocking iterator"""
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) >= count:
+            break
+    return batch
+
+
+def _close(iterator):
+    """Release a blocking iterator (generators close, gRPC streams cancel)"""
+    for method_name in ('close', 'cancel'):
+        method = getattr(iterator, method_name, None)
+        if method is not None:
+            try:
+                method()
+            except Exception as e:
+                print(f"⚠️  Error closing stream: {e}")
+            return
+
+
+async def iterate_blocking(iterable_factory, batch_size: int = 100):
+    """
+    Async generator over a blocking iterable (e.g. query.stream)
+    
+    Items are pulled batch_size at a time on the shared executor, so the
+    event loop never blocks on the network and only one batch is held in
+    memory at once. The source iterator is closed when the generator is,
+    including when the consumer stops early.
+    
+    Usage:
+        async for doc in iterate_blocking(query.stream):
+            ...
+    """
+    iterator = await run_blocking(lambda: iter(iterable_factory()))
+    try:
+        while True:
+            batch = await run_blocking(_take, iterator, batch_size)
+            if not batch:
+                return
+            for item in batch:
+                yield item
+    finally:
+        # A consumer that stops early (e.g. a disconnected client) must not
+        # leave the underlying gRPC stream open until garbage collection
+        await run_blocking(_close, iterator)
@@ -45,7 +45,8 @@ COMPONENTS
 3. firestore_repository.py - Real-Time Implementation
    ├─ Direct Firestore queries (indexed)
    ├─ NO caching at this level
-   ├─ Real-time availability checks
+   ├─ Real-time availability checks (booking_index.py: in-memory intervals
+   │  fed by a bookings listener; BOOKING_INDEX_VERIFY cross-checks Firestore)
    ├─ Real-time price queries
    └─ Batch operations for efficiency
 
@@ -54,7 +55,8 @@ COMPONENTS
    ├─ Different TTLs for different data types
    ├─ NEVER caches critical data (availability, price)
    ├─ Cache hit/miss metrics
-   └─ Manual invalidation support
+   ├─ Manual invalidation support
+   └─ Optional shared L2 (l2_cache.py, CACHE_L2_URL) for multi-worker deployments
 
 
 CACHING POLICY
@@ -68,6 +70,18 @@ Search results      | 1 min   | Balance freshness and performance
 Availability        | NEVER   | Must be real-time (bookings happen)
 Price               | NEVER   | Must be real-time (dynamic pricing)
 Bookings            | NEVER   | Must be real-time (status changes)
+Not found (listing, | 30 sec  | Negative entry; stops repeated lookups for
+  preferences)      |         | deleted listings / travelers without a profile
+
+With change-driven invalidation (invalidation.py, CACHE_CHANGE_FEED_ENABLED)
+listing/preference entries live 6 hours and searches 1 hour: Firestore
+listeners on `listings` and `travelers` evict the affected keys within about
+a second. Check `change_driven.invalidation_lag_ms` in the cache stats.
+
+Stale-while-revalidate (stale_windows): an expired listing or search entry
+is still served for up to 10 seconds past its TTL while a background task
+refreshes it. Invalidated entries are never served stale, and availability,
+price and bookings are never cached at all.
 
 
 USAGE EXAMPLES
@@ -298,9 +312,11 @@ MONITORING & DEBUGGING
 Cache Statistics:
 -----------------
 
-stats = data_repo._get_cache_stats()
-print(f"Hit rate: {stats['hit_rate']}")
-print(f"Cache size: {stats['listing_cache_size']}")
+stats = data_repo._get_cache_stats()   # also served at GET /api/cache/stats
+print(f"Hit ratio: {stats['totals']['hit_ratio']:.2%}")
+for name, cache in stats['caches'].items():
+    print(f"{name}: {cache['entries']} entries, {cache['bytes']} / {cache['budget_bytes']} bytes, "
+          f"{cache['evictions']} evictions")
 
 Health Check:
 -------------
@@ -312,12 +328,18 @@ if not is_healthy:
 Cache Invalidation:
 -------------------
 
-# When listing is updated via admin
+# When listing is updated via admin (also evicts the cached searches
+# and pages it may appear in)
 data_repo.invalidate_listing(listing_id)
 
 # When user updates preferences
 data_repo.invalidate_user_preferences(user_id)
 
+# With an L2 cache configured, both calls also delete the shared entry
+# and broadcast the eviction to every worker
+data_repo = CachedRepository(base_repo, l2=get_l2_cache())
+await data_repo.start_invalidation_listener()
+
 
 BEST PRACTICES
 ==============
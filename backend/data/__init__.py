@@ -6,15 +6,34 @@ Provides clean abstraction for real-time data access
 from .repository import DataRepository
 from .firestore_repository import FirestoreRepository
 from .cached_repository import CachedRepository
+from .memory_repository import InMemoryRepository, LatencyModel
+from .catalog import ListingCatalog, get_listing_catalog
+from .l2_cache import L2Cache, LocalL2Cache, RedisL2Cache, get_l2_cache
+from .invalidation import CacheInvalidator, ChangeEvent
 from .models import Listing, UserPreferences, Booking, AvailabilityCheck, SearchFilters
+from .pagination import Page, InvalidPageToken
+from .projection import InvalidFieldSelection
 
 __all__ = [
     'DataRepository',
     'FirestoreRepository',
     'CachedRepository',
+    'InMemoryRepository',
+    'LatencyModel',
+    'ListingCatalog',
+    'get_listing_catalog',
+    'L2Cache',
+    'LocalL2Cache',
+    'RedisL2Cache',
+    'get_l2_cache',
+    'CacheInvalidator',
+    'ChangeEvent',
     'Listing',
     'UserPreferences',
     'Booking',
     'AvailabilityCheck',
     'SearchFilters',
+    'Page',
+    'InvalidPageToken',
+    'InvalidFieldSelection',
 ]
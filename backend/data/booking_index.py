@@ -0,0 +1,265 @@
+"""
+Booking Interval Index
+In-process index of active (pending / confirmed) bookings per listing,
+kept current by a Firestore on_snapshot listener
+
+Why:
+- check_availability re-read every active booking of the listing and
+  scanned them linearly on every call, and availability is asked for
+  constantly (chat, booking screen)
+- With the intervals in memory an overlap query is two binary searches
+  plus the conflicts themselves, and costs no Firestore reads
+
+Structure:
+- Per listing, intervals sorted by start date, plus the longest booking
+  duration. Any booking overlapping [start, end) must start in
+  (start - longest, end), so that window is found with bisect and only
+  its entries are compared: O(log n + window)
+
+Consistency:
+- The watch query covers status in (pending, confirmed); a booking that
+  is cancelled or completed leaves the query and arrives as REMOVED
+- Each booking keeps the update_time of the document version it came
+  from; an older version arriving late is ignored (version check)
+- `version` increases by one for every applied snapshot
+- `ready` is False until the first snapshot and whenever the watch is no
+  longer active - callers then fall back to querying Firestore, so a dead
+  listener never serves stale availability
+- verify mode (FirestoreRepository(verify_availability=True)) answers
+  from Firestore as before and compares with the index; mismatches are
+  logged and counted in stats()
+
+Usage:
+    index = get_booking_index()
+    index.start(db)                        # blocks until the first snapshot
+    index.overlapping('listing_1', check_in, check_out)
+"""
+
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import BookingStatus
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value)
+
+DEFAULT_START_TIMEOUT = 30.0
+
+
+def _utc(value: datetime) -> datetime:
+    """Compare naive and aware datetimes alike (naive is taken as UTC)"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class _ListingIntervals:
+    """Active bookings of one listing, sorted by start"""
+
+    __slots__ = ('starts', 'entries', 'longest')
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.entries: List[Tuple[datetime, datetime, str]] = []  # (start, end, booking_id)
+        self.longest = timedelta(0)
+
+    def add(self, start: datetime, end: datetime, booking_id: str):
+        entry = (start, end, booking_id)
+        i = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(i, entry)
+        self.starts.insert(i, start)
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, start: datetime, end: datetime, booking_id: str):
+        entry = (start, end, booking_id)
+        i = bisect.bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+            del self.starts[i]
+            if end - start >= self.longest:
+                self.longest = max((e - s for s, e, _ in self.entries), default=timedelta(0))
+
+    def overlapping(self, start: datetime, end: datetime) -> List[str]:
+        lo = bisect.bisect_right(self.starts, start - self.longest)
+        hi = bisect.bisect_left(self.starts, end)
+        return [booking_id for s, e, booking_id in self.entries[lo:hi] if e > start]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class BookingIndex:
+    """
+    Active booking intervals per listing
+
+    Thread-safety: snapshot callbacks run on the Firestore watch thread,
+    readers run on the event loop; every access holds the index lock.
+    """
+
+    def __init__(self, collection: str = 'bookings'):
+        self.collection = collection
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+        self.stale_updates = 0
+        self.verified = 0
+        self.mismatches = 0
+
+        self._listings: Dict[str, _ListingIntervals] = {}
+        # booking_id -> (listing_id, start, end, update_time)
+        self._bookings: Dict[str, Tuple[str, datetime, datetime, Optional[datetime]]] = {}
+
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._watch = None
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lifecycle
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    @property
+    def ready(self) -> bool:
+        """True once loaded and while the listener is still running"""
+        if not self._loaded.is_set():
+            return False
+        return self._watch is None or getattr(self._watch, 'is_active', True)
+
+    def start(self, db, timeout: float = DEFAULT_START_TIMEOUT) -> bool:
+        """
+        Attach the snapshot listener and wait for the initial load
+
+        Blocking - call via run_blocking() from async code.
+
+        Returns:
+            True if the initial snapshot arrived within timeout
+        """
+        if self._watch is None:
+            query = db.collection(self.collection).where('status', 'in', list(ACTIVE_STATUSES))
+            self._watch = query.on_snapshot(self._on_snapshot)
+
+        if not self._loaded.wait(timeout):
+            logger.warning(f"BookingIndex: initial snapshot not received within {timeout}s - checking availability in Firestore")
+            return False
+        return True
+
+    def stop(self):
+        """Detach the snapshot listener (the index stops being used)"""
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        self._loaded.clear()
+
+    def _on_snapshot(self, docs, changes, read_time):
+        """Firestore watch callback"""
+        try:
+            self.apply_changes(changes)
+        except Exception as e:
+            logger.error(f"BookingIndex: failed to apply snapshot: {e}")
+
+    def apply_changes(self, changes: Iterable[Any]):
+        """
+        Apply one snapshot's document changes and bump the version
+
+        Each change has `.type.name` (ADDED / MODIFIED / REMOVED) and
+        `.document` (a DocumentSnapshot).
+        """
+        changed = 0
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                if change.type.name == 'REMOVED':
+                    self._remove(doc.id)
+                else:
+                    self._upsert(doc.id, doc.to_dict() or {}, getattr(doc, 'update_time', None))
+                changed += 1
+
+            self.version += 1
+            self.updated_at = datetime.utcnow()
+
+        if not self._loaded.is_set():
+            self._loaded.set()
+            logger.info(f"✓ BookingIndex loaded {len(self._bookings)} active bookings")
+        elif changed:
+            logger.debug(f"BookingIndex applied {changed} changes (version {self.version})")
+
+    def _upsert(self, booking_id: str, data: Dict[str, Any], update_time: Optional[datetime]):
+        current = self._bookings.get(booking_id)
+        if current is not None and update_time is not None and current[3] is not None \
+                and _utc(update_time) < _utc(current[3]):
+            self.stale_updates += 1
+            return
+
+        self._remove(booking_id)
+        listing_id = data.get('listing_id')
+        start, end = data.get('start_date'), data.get('end_date')
+        if data.get('status') not in ACTIVE_STATUSES or not listing_id \
+                or not isinstance(start, datetime) or not isinstance(end, datetime):
+            return
+
+        start, end = _utc(start), _utc(end)
+        self._listings.setdefault(listing_id, _ListingIntervals()).add(start, end, booking_id)
+        self._bookings[booking_id] = (listing_id, start, end, update_time)
+
+    def _remove(self, booking_id: str):
+        current = self._bookings.pop(booking_id, None)
+        if current is None:
+            return
+        listing_id, start, end, _ = current
+        intervals = self._listings[listing_id]
+        intervals.remove(start, end, booking_id)
+        if not intervals:
+            del self._listings[listing_id]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Queries
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def __len__(self) -> int:
+        return len(self._bookings)
+
+    def overlapping(self, listing_id: str, start_date: datetime, end_date: datetime) -> List[str]:
+        """IDs of active bookings overlapping [start_date, end_date), by start"""
+        with self._lock:
+            intervals = self._listings.get(listing_id)
+            if intervals is None:
+                return []
+            return intervals.overlapping(_utc(start_date), _utc(end_date))
+
+    def record_verification(self, listing_id: str, indexed: List[str], actual: List[str]) -> bool:
+        """Count a verify-mode comparison; returns True if they agree"""
+        self.verified += 1
+        if sorted(indexed) == sorted(actual):
+            return True
+        self.mismatches += 1
+        logger.warning(
+            f"BookingIndex mismatch for {listing_id} (version {self.version}): "
+            f"index {sorted(indexed)} vs Firestore {sorted(actual)}"
+        )
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Index status for health endpoints"""
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'bookings': len(self._bookings),
+                'listings': len(self._listings),
+                'version': self.version,
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+                'stale_updates': self.stale_updates,
+                'verified': self.verified,
+                'mismatches': self.mismatches,
+            }
+
+
+# Singleton instance
+_index_instance: Optional[BookingIndex] = None
+
+
+def get_booking_index() -> BookingIndex:
+    """Get or create the process-wide booking index (not started)"""
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = BookingIndex()
+    return _index_instance
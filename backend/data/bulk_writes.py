@@ -0,0 +1,180 @@
+"""
+Bulk Writes
+Many-document mutations through Firestore's BulkWriter
+
+Why BulkWriter:
+- Writes go out in parallel batches instead of one round trip per document
+- Batches are non-atomic, so every document gets its own result (one bad
+  ID does not fail the other 499 in its batch)
+- Rate limiting follows Firestore's 500/50/5 ramp-up rule automatically
+
+Retries:
+- Transient errors (ABORTED, UNAVAILABLE, DEADLINE_EXCEEDED,
+  RESOURCE_EXHAUSTED, INTERNAL) are retried up to max_attempts times
+- Anything else (e.g. NOT_FOUND on update) fails that item immediately
+
+run_bulk_write() blocks until every operation has settled - call it via
+run_blocking() from async code.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BULK_OPERATIONS = ('create', 'set', 'update', 'delete')
+
+# Upper bound on operations accepted in one call
+MAX_BULK_OPERATIONS = 10_000
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+# gRPC status codes worth retrying
+RETRYABLE_CODES = frozenset({
+    4,   # DEADLINE_EXCEEDED
+    8,   # RESOURCE_EXHAUSTED
+    10,  # ABORTED
+    13,  # INTERNAL
+    14,  # UNAVAILABLE
+})
+
+
+@dataclass
+class BulkOperation:
+    """One document mutation"""
+    op: str
+    collection: str
+    document_id: Optional[str] = None  # generated for 'create' when omitted
+    data: Dict[str, Any] = field(default_factory=dict)
+    merge: bool = False  # 'set' only
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of one BulkOperation"""
+    collection: str
+    document_id: str
+    op: str
+    success: bool
+    attempts: int = 1
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'collection': self.collection,
+            'document_id': self.document_id,
+            'op': self.op,
+            'success': self.success,
+            'attempts': self.attempts,
+            'error': self.error,
+        }
+
+
+def summarize(results: List[BulkWriteResult]) -> Dict[str, Any]:
+    """Counts for API responses"""
+    succeeded = sum(1 for r in results if r.success)
+    return {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+    }
+
+
+def validate_operations(operations: List[BulkOperation]):
+    """
+    Reject malformed requests before anything is written
+
+    Raises:
+        ValueError: Unknown op, missing ID/data, too many operations, or the
+            same document touched twice (results are keyed by document)
+    """
+    if len(operations) > MAX_BULK_OPERATIONS:
+        raise ValueError(f"At most {MAX_BULK_OPERATIONS} operations per bulk write")
+
+    seen = set()
+    for operation in operations:
+        if operation.op not in BULK_OPERATIONS:
+            raise ValueError(f"Unsupported bulk operation: {operation.op}")
+        if operation.op != 'create' and not operation.document_id:
+            raise ValueError(f"'{operation.op}' requires a document_id")
+        if operation.op in ('update', 'set') and not operation.data:
+            raise ValueError(f"'{operation.op}' requires data")
+
+        if operation.document_id:
+            key = (operation.collection, operation.document_id)
+            if key in seen:
+                raise ValueError(f"Duplicate operation for {operation.collection}/{operation.document_id}")
+            seen.add(key)
+
+
+def run_bulk_write(
+    db,
+    operations: List[BulkOperation],
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+) -> List[BulkWriteResult]:
+    """
+    Apply operations with a BulkWriter and wait for all of them
+
+    Returns:
+        One BulkWriteResult per operation, in input order
+
+    Raises:
+        ValueError: See validate_operations()
+    """
+    validate_operations(operations)
+    if not operations:
+        return []
+
+    results: Dict[str, BulkWriteResult] = {}
+    lock = threading.Lock()
+    order: List[str] = []
+
+    def on_success(reference, write_result, bulk_writer):
+        with lock:
+            results[reference.path].success = True
+
+    def on_error(failure, bulk_writer) -> bool:
+        retry = failure.code in RETRYABLE_CODES and failure.attempts < max_attempts
+        if not retry:
+            with lock:
+                result = results[failure.operation.reference.path]
+                result.error = failure.message
+                result.attempts = failure.attempts
+        return retry
+
+    writer = db.bulk_writer()
+    writer.on_write_result(on_success)
+    writer.on_write_error(on_error)
+
+    for operation in operations:
+        collection = db.collection(operation.collection)
+        reference = (
+            collection.document(operation.document_id)
+            if operation.document_id else collection.document()
+        )
+        results[reference.path] = BulkWriteResult(
+            collection=operation.collection,
+            document_id=reference.id,
+            op=operation.op,
+            success=False,
+        )
+        order.append(reference.path)
+
+        if operation.op == 'create':
+            writer.create(reference, operation.data)
+        elif operation.op == 'set':
+            writer.set(reference, operation.data, merge=operation.merge)
+        elif operation.op == 'update':
+            writer.update(reference, operation.data)
+        else:
+            writer.delete(reference)
+
+    writer.close()  # flushes and waits for retries
+
+    ordered = [results[path] for path in order]
+    counts = summarize(ordered)
+    logger.info(f"✓ Bulk write: {counts['succeeded']}/{counts['total']} succeeded")
+    return ordered
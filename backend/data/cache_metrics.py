@@ -0,0 +1,114 @@
+"""
+Size-Aware, Metered Caches
+TTL caches bounded by memory rather than entry count
+
+Why:
+- TTLCache(maxsize=1000) counts entries, but a search entry holding 100
+  listings with long descriptions costs far more than one preferences
+  entry, so entry limits say nothing about memory
+- A single combined hit counter hid which cache was actually working
+
+MeteredTTLCache sizes each value with estimate_size(), evicts least
+recently inserted entries once the byte budget is exceeded, and keeps its
+own hits / misses / evictions.
+"""
+
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from cachetools import TTLCache
+
+KB = 1024
+MB = 1024 * KB
+
+
+def estimate_size(value: Any, _seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate deep size of a cached value in bytes
+
+    Follows containers and dataclass/object attributes; shared objects are
+    counted once. An estimate - good enough to compare entries, not exact.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return size + estimate_size(vars(value), seen)
+    return size
+
+
+class MeteredTTLCache(TTLCache):
+    """
+    TTLCache with a byte budget and per-cache counters
+
+    maxsize is a budget in bytes. A value larger than the whole budget is
+    not cached (counted as rejected) instead of raising ValueError, and
+    any previous value under its key is dropped rather than kept stale.
+    Callers record hits/misses; evictions (budget pressure, not TTL
+    expiry) are counted here.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget_bytes: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+        getsizeof: Callable[[Any], int] = estimate_size
+    ):
+        super().__init__(maxsize=budget_bytes, ttl=ttl, timer=timer, getsizeof=getsizeof)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def __setitem__(self, key, value):
+        try:
+            super().__setitem__(key, value)
+        except ValueError:
+            # Don't leave the previous value behind as if the refresh had worked
+            self.pop(key, None)
+            self.rejected += 1
+
+    def popitem(self):
+        # Called by Cache.__setitem__ to make room
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def clear(self):
+        # MutableMapping.clear() goes through popitem(); not an eviction
+        evictions = self.evictions
+        super().clear()
+        self.evictions = evictions
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Telemetry for /api/cache/stats"""
+        self.expire()
+        return {
+            'entries': len(self),
+            'bytes': self.currsize,
+            'budget_bytes': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 4),
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+        }
@@ -3,18 +3,57 @@ Caching Repository Wrapper
 Adds intelligent caching layer over any repository implementation
 """
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from cachetools import TTLCache
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable, List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 
 from .repository import DataRepository
 from .models import (
     Listing, UserPreferences, Booking, AvailabilityCheck, SearchFilters
 )
+from .pagination import Page, DEFAULT_PAGE_SIZE
+from .single_flight import SingleFlight
+from .l2_cache import L2Cache, encode_value, decode_value
+from .invalidation import ChangeEvent
+from .cache_metrics import MeteredTTLCache, MB
 
 logger = logging.getLogger(__name__)
 
+# Seconds per cache. The defaults assume nothing tells us about changes;
+# with a CacheInvalidator attached, TTLs only bound staleness if it stops.
+DEFAULT_TTLS = {'listing': 120, 'prefs': 300, 'search': 60}
+CHANGE_DRIVEN_TTLS = {'listing': 6 * 3600, 'prefs': 6 * 3600, 'search': 3600}
+
+# Stale-while-revalidate: seconds past its TTL an entry may still be served
+# while a background refresh runs (0 = off). Hard limit - once exceeded the
+# caller waits for a fresh fetch. Browse data only; preferences drive
+# personalisation, so they are not served stale by default.
+DEFAULT_STALE_WINDOWS = {'listing': 10, 'prefs': 0, 'search': 10}
+
+# Memory budget per cache in bytes (values sized with estimate_size;
+# a listing is ~3 KB, a 20-listing search page ~60 KB)
+DEFAULT_MEMORY_BUDGETS = {'listing': 8 * MB, 'prefs': 2 * MB, 'search': 16 * MB}
+
+# Share of a cache's budget given to its stale copies when stale-while-
+# revalidate is on; fresh and stale together stay within the budget
+STALE_BUDGET_SHARE = 0.25
+
+# Negative entries remember "not found" for listings and preferences.
+# Short, because a failed Firestore read also comes back as None.
+DEFAULT_NEGATIVE_TTL = 30
+NEGATIVE_CACHE_BUDGET = 512 * 1024
+
+LAG_SAMPLES = 1000
+
+# Tracked search dependencies are pruned of expired keys past this size
+SEARCH_PRUNE_MIN = 500
+
+# Cached offset ranges remembered per search for superset reuse
+MAX_RANGES_PER_SEARCH = 8
+
 
 class CachedRepository(DataRepository):
     """
@@ -24,73 +63,349 @@ class CachedRepository(DataRepository):
     - TTL-based caching for safe data (preferences, listings)
     - NO caching for critical real-time data (availability, price)
     - Cache invalidation support
-    - Cache hit/miss metrics
+    - Per-cache hit/miss/eviction/byte metrics
+    - Size-aware eviction: each cache has a memory budget, not an entry count
+    - Negative caching: missing listings / travelers are remembered briefly,
+      and creating the document evicts the entry
+    - Canonical search keys (SearchFilters.digest), and smaller offset
+      ranges answered from a cached larger range of the same search
+    - Single-flight misses: concurrent misses for one key share one fetch
+    - Optional shared L2 (e.g. Redis) behind the per-process caches, with
+      invalidation broadcast to every worker
+    - Change-driven eviction (apply_change_events, fed by CacheInvalidator)
+      of exactly the listing, preference and dependent search keys
+    - Stale-while-revalidate: briefly expired browse entries are served
+      at once while a background task refreshes them
     
     Cache policies:
-    - User preferences: 5 minutes (rarely change)
-    - Listing details: 2 minutes (safe for browsing)
+    - User preferences: 5 minutes (rarely change), hours when change-driven
+    - Listing details: 2 minutes (safe for browsing), hours when change-driven
     - Availability: NEVER (must be real-time)
     - Price: NEVER (must be real-time)
     """
     
-    def __init__(self, base_repository: DataRepository):
+    def __init__(
+        self,
+        base_repository: DataRepository,
+        l2: Optional[L2Cache] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_windows: Optional[Dict[str, float]] = None,
+        memory_budgets: Optional[Dict[str, int]] = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        timer: Callable[[], float] = time.monotonic
+    ):
         """
         Wrap an existing repository with caching
         
         Args:
             base_repository: Underlying repository (e.g., FirestoreRepository)
+            l2: Shared cache consulted on L1 misses (None = process-local only)
+            ttls: Per-cache TTL overrides ('listing', 'prefs', 'search')
+            stale_windows: Per-cache max staleness overrides (seconds, 0 = off)
+            memory_budgets: Per-cache budget overrides in bytes
+            negative_ttl: Seconds to remember a missing listing/traveler (0 = off)
+            timer: Clock for all TTLs (tests pass a fake one)
         """
         self.base = base_repository
+        self.l2 = l2
+        ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_windows = {**DEFAULT_STALE_WINDOWS, **(stale_windows or {})}
+        budgets = {**DEFAULT_MEMORY_BUDGETS, **(memory_budgets or {})}
+        stale_budgets = {
+            name: int(budget * STALE_BUDGET_SHARE) if self.stale_windows.get(name, 0) > 0 else 0
+            for name, budget in budgets.items()
+        }
+        fresh_budgets = {name: budget - stale_budgets[name] for name, budget in budgets.items()}
+        
+        # Separate caches with different TTLs and memory budgets
+        self.listing_cache = MeteredTTLCache('listing', fresh_budgets['listing'], ttls['listing'], timer=timer)
+        self.user_prefs_cache = MeteredTTLCache('prefs', fresh_budgets['prefs'], ttls['prefs'], timer=timer)
+        self.search_cache = MeteredTTLCache('search', fresh_budgets['search'], ttls['search'], timer=timer)
+        
+        # Keys known to have no document (value is always None)
+        self.negative_ttl = negative_ttl
+        self.negative_cache = MeteredTTLCache('negative', NEGATIVE_CACHE_BUDGET, max(negative_ttl, 1), timer=timer)
+        
+        # Stale copies outlive the fresh entry by the stale window, so an
+        # expired value can be served while it is refreshed. They take
+        # STALE_BUDGET_SHARE of their cache's budget. (fresh, stale) pairs -
+        # caches are unhashable, so looked up by identity.
+        self._stale_caches = []
+        for cache in (self.listing_cache, self.user_prefs_cache, self.search_cache):
+            window = self.stale_windows[cache.name]
+            if window > 0:
+                stale = MeteredTTLCache(f"{cache.name}_stale", stale_budgets[cache.name], cache.ttl + window, timer=timer)
+                self._stale_caches.append((cache, stale))
+        
+        # Search key dependencies for change-driven eviction:
+        # listing id -> search keys whose result contains it, and
+        # search key -> the filters it was computed for
+        self._search_dependencies: Dict[str, Set[str]] = {}
+        self._search_filters: Dict[str, SearchFilters] = {}
+        self._prune_search_at = SEARCH_PRUNE_MIN
+        
+        # Cached get_listings ranges per search:
+        # "listings:<digest>" -> [(offset, limit, cache_key)]
+        self._result_ranges: Dict[str, List[Tuple[int, int, str]]] = {}
+        
+        # Bumped on every invalidation; loads that started before it
+        # return their result but do not cache it (it may be stale)
+        self._invalidation_epoch = 0
         
-        # Separate caches with different TTLs
-        self.listing_cache = TTLCache(maxsize=1000, ttl=120)  # 2 min
-        self.user_prefs_cache = TTLCache(maxsize=500, ttl=300)  # 5 min
-        self.search_cache = TTLCache(maxsize=200, ttl=60)  # 1 min
+        # Concurrent misses for the same key await one upstream fetch
+        self._single_flight = SingleFlight()
         
-        # Metrics
-        self.cache_hits = 0
-        self.cache_misses = 0
+        # L2 writes/invalidations and revalidations run in the background;
+        # keep references
+        self._l2_tasks: set = set()
+        self._revalidation_tasks: set = set()
+        
+        # Metrics (hits/misses/evictions live on each cache)
+        self.stale_hits = 0
+        self.superset_hits = 0
+        self.revalidations = 0
+        self.revalidation_errors = 0
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self.invalidations_received = 0
+        self.invalidation_resyncs = 0
+        self.change_events = 0
+        self.change_evictions = 0
+        self._invalidation_lag_ms = deque(maxlen=LAG_SAMPLES)
         
         logger.info("✓ CachedRepository initialized (wrapping base repository)")
     
+    def _caches(self) -> List[MeteredTTLCache]:
+        """Every cache holding memory (stale copies record no hits/misses of their own)"""
+        return [self.listing_cache, self.user_prefs_cache, self.search_cache, self.negative_cache] + \
+            [stale for _, stale in self._stale_caches]
+    
+    @property
+    def cache_hits(self) -> int:
+        """Hits across all caches"""
+        return sum(cache.hits for cache in self._caches())
+    
+    @property
+    def cache_misses(self) -> int:
+        """Misses across all caches"""
+        return sum(cache.misses for cache in self._caches())
+    
     def _get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics for monitoring"""
-        total = self.cache_hits + self.cache_misses
-        hit_rate = self.cache_hits / total if total > 0 else 0
+        """Get cache statistics for monitoring (served by /api/cache/stats)"""
+        caches = {cache.name: cache.stats() for cache in self._caches()}
+        hits = sum(stats['hits'] for stats in caches.values())
+        misses = sum(stats['misses'] for stats in caches.values())
         
         return {
-            'hits': self.cache_hits,
-            'misses': self.cache_misses,
-            'total_requests': total,
-            'hit_rate': f"{hit_rate:.2%}",
-            'listing_cache_size': len(self.listing_cache),
-            'prefs_cache_size': len(self.user_prefs_cache),
-            'search_cache_size': len(self.search_cache),
+            'caches': caches,
+            'totals': {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'bytes': sum(stats['bytes'] for stats in caches.values()),
+                'evictions': sum(stats['evictions'] for stats in caches.values()),
+            },
+            'coalesced': self._single_flight.coalesced,
+            'inflight': self._single_flight.inflight,
+            'superset_hits': self.superset_hits,
+            'stale_while_revalidate': {
+                'windows': dict(self.stale_windows),
+                'stale_hits': self.stale_hits,
+                'revalidations': self.revalidations,
+                'errors': self.revalidation_errors,
+            },
+            'l2': {
+                'backend': self.l2.name,
+                'hits': self.l2_hits,
+                'misses': self.l2_misses,
+                'errors': self.l2_errors,
+                'invalidations_received': self.invalidations_received,
+                'invalidation_resyncs': self.invalidation_resyncs,
+            } if self.l2 is not None else None,
+            'change_driven': {
+                'events': self.change_events,
+                'evictions': self.change_evictions,
+                'invalidation_lag_ms': self._lag_stats(),
+            },
         }
     
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # Listing Operations (CACHED)
-    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    def _lag_stats(self) -> Dict[str, Any]:
+        """Commit-to-eviction lag over the last LAG_SAMPLES changes"""
+        samples = sorted(self._invalidation_lag_ms)
+        if not samples:
+            return {'samples': 0}
+        return {
+            'samples': len(samples),
+            'last': round(self._invalidation_lag_ms[-1], 1),
+            'avg': round(sum(samples) / len(samples), 1),
+            'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            'max': round(samples[-1], 1),
+        }
     
-    async def get_listing(self, listing_id: str) -> Optional[Listing]:
-        """Get listing (cached for 2 minutes)"""
-        cache_key = f"listing:{listing_id}"
+    async def _get_or_load(
+        self,
+        cache: MeteredTTLCache,
+        cache_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = bool,
+        filters: Optional[SearchFilters] = None,
+        negative: bool = False,
+        result_range: Optional[Tuple[str, int, int]] = None
+    ) -> Any:
+        """
+        Serve from cache, or fetch once per key and cache the result
+        
+        Concurrent misses for the same key are coalesced: only the first
+        calls loader(), the others await its result. filters marks a search
+        result so listing changes can find it. negative=True remembers a
+        None result in negative_cache. result_range (search, offset, limit)
+        lets smaller ranges of the same search be served from this entry.
         
-        if cache_key in self.listing_cache:
-            self.cache_hits += 1
+        If the entry expired less than its stale window ago, the old value
+        is returned immediately and refreshed in the background.
+        """
+        if cache_key in cache:
+            cache.hits += 1
             logger.debug(f"Cache HIT: {cache_key}")
-            return self.listing_cache[cache_key]
+            return cache[cache_key]
         
-        self.cache_misses += 1
+        if negative and cache_key in self.negative_cache:
+            self.negative_cache.hits += 1
+            logger.debug(f"Cache NEGATIVE HIT: {cache_key}")
+            return None
+        
+        async def load():
+            epoch = self._invalidation_epoch
+            
+            value = await self._l2_get(cache_key)
+            if value is not None:
+                if epoch == self._invalidation_epoch:
+                    self._store(cache, cache_key, value, filters, result_range)
+                return value
+            
+            value = await loader()
+            if epoch != self._invalidation_epoch:
+                return value
+            if should_cache(value):
+                self._store(cache, cache_key, value, filters, result_range)
+                await self._l2_set(cache_key, value, cache.ttl)
+            elif negative and value is None:
+                self._store_negative(cache_key)
+            return value
+        
+        stale = self._stale_cache_for(cache)
+        if stale is not None and cache_key in stale:
+            cache.hits += 1
+            self.stale_hits += 1
+            logger.debug(f"Cache STALE: {cache_key} (revalidating)")
+            self._revalidate(cache_key, load)
+            return stale[cache_key]
+        
+        cache.misses += 1
         logger.debug(f"Cache MISS: {cache_key}")
         
-        # Fetch from base repository
-        listing = await self.base.get_listing(listing_id)
+        return await self._single_flight.do(cache_key, load)
+    
+    def _stale_cache_for(self, cache: MeteredTTLCache) -> Optional[MeteredTTLCache]:
+        for fresh, stale in self._stale_caches:
+            if fresh is cache:
+                return stale
+        return None
+    
+    def _revalidate(self, cache_key: str, load: Callable[[], Awaitable[Any]]):
+        """Refresh an entry in the background (once per key)"""
+        if cache_key in self._single_flight:
+            return
+        self.revalidations += 1
+        
+        async def refresh():
+            try:
+                await self._single_flight.do(cache_key, load)
+            except Exception as e:
+                # Keep serving the stale copy until its window runs out
+                self.revalidation_errors += 1
+                logger.warning(f"Revalidation failed for {cache_key}: {e}")
         
-        if listing:
-            self.listing_cache[cache_key] = listing
+        task = asyncio.ensure_future(refresh())
+        self._revalidation_tasks.add(task)
+        task.add_done_callback(self._revalidation_tasks.discard)
+    
+    def _store_negative(self, cache_key: str):
+        """Remember that cache_key has no document"""
+        if self.negative_ttl > 0:
+            self.negative_cache[cache_key] = None
+    
+    def _store(
+        self,
+        cache: MeteredTTLCache,
+        cache_key: str,
+        value: Any,
+        filters: Optional[SearchFilters],
+        result_range: Optional[Tuple[str, int, int]] = None
+    ):
+        """Put a value in L1 (and its stale copy), recording search dependencies"""
+        cache[cache_key] = value
+        self.negative_cache.pop(cache_key, None)
+        stale = self._stale_cache_for(cache)
+        if stale is not None:
+            stale[cache_key] = value
+        if cache is not self.search_cache:
+            return
+        
+        if filters is not None:
+            self._search_filters[cache_key] = filters
+        if result_range is not None:
+            search, offset, limit = result_range
+            ranges = self._result_ranges.setdefault(search, [])
+            if (offset, limit, cache_key) not in ranges:
+                ranges.append((offset, limit, cache_key))
+                del ranges[:-MAX_RANGES_PER_SEARCH]
+        items = value.items if isinstance(value, Page) else value
+        for listing in items or []:
+            self._search_dependencies.setdefault(listing.id, set()).add(cache_key)
         
-        return listing
+        # Entries expire silently; drop dependencies of expired searches
+        if len(self._search_filters) > self._prune_search_at:
+            self._prune_search_dependencies()
+            self._prune_search_at = max(SEARCH_PRUNE_MIN, 2 * len(self._search_filters))
+    
+    def _search_keys(self) -> Set[str]:
+        """Search keys still servable (fresh or within their stale window)"""
+        keys = set(self.search_cache.keys())
+        stale = self._stale_cache_for(self.search_cache)
+        if stale is not None:
+            keys.update(stale.keys())
+        return keys
+    
+    def _prune_search_dependencies(self):
+        live = self._search_keys()
+        for search in list(self._result_ranges):
+            ranges = [r for r in self._result_ranges[search] if r[2] in live]
+            if ranges:
+                self._result_ranges[search] = ranges
+            else:
+                del self._result_ranges[search]
+        self._search_filters = {k: f for k, f in self._search_filters.items() if k in live}
+        for listing_id in list(self._search_dependencies):
+            keys = self._search_dependencies[listing_id] & live
+            if keys:
+                self._search_dependencies[listing_id] = keys
+            else:
+                del self._search_dependencies[listing_id]
+    
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Listing Operations (CACHED)
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    
+    async def get_listing(self, listing_id: str) -> Optional[Listing]:
+        """Get listing (cached for 2 minutes)"""
+        return await self._get_or_load(
+            self.listing_cache,
+            f"listing:{listing_id}",
+            lambda: self.base.get_listing(listing_id),
+            negative=True
+        )
     
     async def get_listings(
         self, 
@@ -99,24 +414,68 @@ class CachedRepository(DataRepository):
         offset: int = 0
     ) -> List[Listing]:
         """Get listings (cached for 1 minute)"""
-        # Create cache key from filters
-        cache_key = f"listings:{hash((str(filters.to_dict()), limit, offset))}"
+        search = f"listings:{filters.digest()}"
+        cache_key = f"{search}:{limit}:{offset}"
         
-        if cache_key in self.search_cache:
-            self.cache_hits += 1
-            logger.debug(f"Cache HIT: listings search")
-            return self.search_cache[cache_key]
+        if cache_key not in self.search_cache:
+            contained = self._from_cached_range(search, filters, offset, limit)
+            if contained is not None:
+                return contained
         
-        self.cache_misses += 1
-        logger.debug(f"Cache MISS: listings search")
+        return await self._get_or_load(
+            self.search_cache,
+            cache_key,
+            lambda: self.base.get_listings(filters, limit, offset),
+            filters=filters,
+            result_range=(search, offset, limit)
+        )
+    
+    def _from_cached_range(
+        self,
+        search: str,
+        filters: SearchFilters,
+        offset: int,
+        limit: int
+    ) -> Optional[List[Listing]]:
+        """
+        Answer [offset, offset + limit) from a cached range that contains it
         
-        # Fetch from base
-        listings = await self.base.get_listings(filters, limit, offset)
+        E.g. limit=10 from a cached limit=50, or offset=20 from a cached
+        offset=0 limit=40. Only a full containment counts - a short cached
+        result may just mean the backend capped the page size.
+        """
+        ranges = self._result_ranges.get(search)
+        if not ranges or not self.base.supports_range_reuse(filters):
+            return None
         
-        if listings:
-            self.search_cache[cache_key] = listings
+        for start, _, cache_key in list(ranges):
+            result = self.search_cache.get(cache_key)
+            if result is None:
+                ranges.remove((start, _, cache_key))
+                continue
+            if start <= offset and offset + limit <= start + len(result):
+                self.search_cache.hits += 1
+                self.superset_hits += 1
+                logger.debug(f"Cache SUPERSET HIT: {search} [{offset}:{offset + limit}] from {cache_key}")
+                return result[offset - start:offset - start + limit]
+        return None
+    
+    async def get_listings_page(
+        self,
+        filters: SearchFilters,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """Get a page of listings (cached for 1 minute, keyed by page token)"""
+        cache_key = f"listings_page:{filters.digest()}:{page_size}:{page_token}"
         
-        return listings
+        return await self._get_or_load(
+            self.search_cache,
+            cache_key,
+            lambda: self.base.get_listings_page(filters, page_size, page_token),
+            should_cache=lambda page: bool(page.items),
+            filters=filters
+        )
     
     async def search_listings_semantic(
         self,
@@ -124,19 +483,11 @@ class CachedRepository(DataRepository):
         limit: int = 10
     ) -> List[Listing]:
         """Semantic search (cached for 1 minute)"""
-        cache_key = f"semantic:{query}:{limit}"
-        
-        if cache_key in self.search_cache:
-            self.cache_hits += 1
-            return self.search_cache[cache_key]
-        
-        self.cache_misses += 1
-        results = await self.base.search_listings_semantic(query, limit)
-        
-        if results:
-            self.search_cache[cache_key] = results
-        
-        return results
+        return await self._get_or_load(
+            self.search_cache,
+            f"semantic:{query.lower()}:{limit}",
+            lambda: self.base.search_listings_semantic(query, limit)
+        )
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Availability Operations (NO CACHING - ALWAYS REAL-TIME)
@@ -176,20 +527,12 @@ class CachedRepository(DataRepository):
     
     async def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
         """Get user preferences (cached for 5 minutes)"""
-        cache_key = f"prefs:{user_id}"
-        
-        if cache_key in self.user_prefs_cache:
-            self.cache_hits += 1
-            logger.debug(f"Cache HIT: user preferences")
-            return self.user_prefs_cache[cache_key]
-        
-        self.cache_misses += 1
-        prefs = await self.base.get_user_preferences(user_id)
-        
-        if prefs:
-            self.user_prefs_cache[cache_key] = prefs
-        
-        return prefs
+        return await self._get_or_load(
+            self.user_prefs_cache,
+            f"prefs:{user_id}",
+            lambda: self.base.get_user_preferences(user_id),
+            negative=True
+        )
     
     async def get_user_saved_listings(self, user_id: str) -> List[str]:
         """Get saved listings (pass through - small data)"""
@@ -224,31 +567,52 @@ class CachedRepository(DataRepository):
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
     async def get_listings_batch(self, listing_ids: List[str]) -> List[Listing]:
-        """Batch fetch (opportunistic caching)"""
-        results = []
+        """
+        Batch fetch (opportunistic caching)
+        
+        Cache hits are served locally; all misses go to the base repository
+        in a single bulk call. Results keep the order of listing_ids.
+        Ids with a negative entry are skipped (a failed bulk read also
+        returns nothing, so the batch path does not create them).
+        """
+        found: Dict[str, Listing] = {}
         missing_ids = []
         
         # Check cache first
-        for listing_id in listing_ids:
+        for listing_id in dict.fromkeys(listing_ids):
             cache_key = f"listing:{listing_id}"
             if cache_key in self.listing_cache:
-                self.cache_hits += 1
-                results.append(self.listing_cache[cache_key])
+                self.listing_cache.hits += 1
+                found[listing_id] = self.listing_cache[cache_key]
+            elif cache_key in self.negative_cache:
+                self.negative_cache.hits += 1
             else:
                 missing_ids.append(listing_id)
+        self.listing_cache.misses += len(missing_ids)
+        
+        # Then the shared L2 cache
+        if missing_ids and self.l2 is not None:
+            from_l2 = await self._l2_get_many([f"listing:{listing_id}" for listing_id in missing_ids])
+            for listing_id, listing in zip(missing_ids, from_l2):
+                if listing is not None:
+                    self._store(self.listing_cache, f"listing:{listing_id}", listing, None)
+                    found[listing_id] = listing
+            missing_ids = [listing_id for listing_id in missing_ids if listing_id not in found]
         
-        # Fetch missing from base
+        # Fetch remaining misses from base in one bulk call
         if missing_ids:
-            self.cache_misses += len(missing_ids)
+            epoch = self._invalidation_epoch
             fetched = await self.base.get_listings_batch(missing_ids)
             
-            # Cache results
+            # Cache results (unless something was invalidated meanwhile)
             for listing in fetched:
-                cache_key = f"listing:{listing.id}"
-                self.listing_cache[cache_key] = listing
-                results.append(listing)
+                found[listing.id] = listing
+                if epoch == self._invalidation_epoch:
+                    cache_key = f"listing:{listing.id}"
+                    self._store(self.listing_cache, cache_key, listing, None)
+                    await self._l2_set(cache_key, listing, self.listing_cache.ttl)
         
-        return results
+        return [found[listing_id] for listing_id in listing_ids if listing_id in found]
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Aggregations (DELEGATE)
@@ -263,26 +627,259 @@ class CachedRepository(DataRepository):
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
     def invalidate_listing(self, listing_id: str):
-        """Manually invalidate a listing from cache"""
-        cache_key = f"listing:{listing_id}"
-        if cache_key in self.listing_cache:
-            del self.listing_cache[cache_key]
+        """
+        Manually invalidate a listing and the searches it may affect (on every worker)
+        
+        Each worker expands the broadcast listing key into its own dependent
+        search and page keys, so none keeps serving the old listing for the
+        rest of a (possibly hours-long) search TTL.
+        """
+        keys = self._keys_for_listing_invalidation(listing_id)
+        self._invalidation_epoch += 1
+        if self._evict(keys):
             logger.info(f"Invalidated cache for listing {listing_id}")
+        self._broadcast_invalidation(sorted(keys))
     
     def invalidate_user_preferences(self, user_id: str):
-        """Manually invalidate user preferences"""
+        """Manually invalidate user preferences (on every worker)"""
         cache_key = f"prefs:{user_id}"
-        if cache_key in self.user_prefs_cache:
-            del self.user_prefs_cache[cache_key]
+        self._invalidation_epoch += 1
+        if self._evict([cache_key]):
             logger.info(f"Invalidated cache for user {user_id}")
+        self._broadcast_invalidation([cache_key])
     
     def clear_all_caches(self):
-        """Clear all caches"""
+        """Clear all local caches (the shared L2 expires on its own TTLs)"""
         self.listing_cache.clear()
         self.user_prefs_cache.clear()
         self.search_cache.clear()
+        self.negative_cache.clear()
+        for _, stale in self._stale_caches:
+            stale.clear()
+        self._search_dependencies.clear()
+        self._search_filters.clear()
+        self._result_ranges.clear()
+        self._invalidation_epoch += 1
         logger.info("✓ All caches cleared")
     
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Change-Driven Invalidation
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    
+    async def apply_change_events(self, events: List[ChangeEvent]):
+        """
+        Evict every key affected by changed listings / travelers
+        
+        Runs on the event loop (CacheInvalidator schedules it from the
+        watch thread). The shared L2 copy is deleted before L1 so a miss in
+        between cannot refill L1 from a stale L2 entry.
+        """
+        keys: Set[str] = set()
+        for event in events:
+            if event.collection == 'listings':
+                keys |= self._keys_for_listing_change(event.document_id, event.data)
+            elif event.collection == 'travelers':
+                keys.add(f"prefs:{event.document_id}")
+        
+        if keys and self.l2 is not None:
+            try:
+                await self.l2.delete(list(keys))
+            except Exception as e:
+                self.l2_errors += 1
+                logger.warning(f"L2 delete failed for {len(keys)} changed keys: {e}")
+        
+        self._invalidation_epoch += 1
+        self.change_events += len(events)
+        self.change_evictions += self._evict(keys)
+        
+        now = datetime.now(timezone.utc)
+        for event in events:
+            if event.committed_at is not None:
+                committed_at = event.committed_at
+                if committed_at.tzinfo is None:
+                    committed_at = committed_at.replace(tzinfo=timezone.utc)
+                self._invalidation_lag_ms.append(max(0.0, (now - committed_at).total_seconds() * 1000))
+    
+    def _keys_for_listing_change(self, listing_id: str, data: Optional[Dict[str, Any]]) -> Set[str]:
+        """
+        Keys a listing change can affect
+        
+        - the listing itself
+        - searches whose cached result contains it (it may have left them)
+        - searches whose filters it now matches (it may have entered them)
+        - semantic results (ranking depends on content, not filters)
+        """
+        keys = {f"listing:{listing_id}"}
+        keys |= self._search_dependencies.pop(listing_id, set())
+        
+        if data is not None:
+            try:
+                listing = Listing.from_dict({**data, 'id': listing_id})
+            except (TypeError, ValueError):
+                listing = None  # Malformed document: assume it matches everything
+            for cache_key, filters in self._search_filters.items():
+                if listing is None or self._may_match(listing, filters):
+                    keys.add(cache_key)
+        
+        keys.update(k for k in self._search_keys() if k.startswith('semantic:'))
+        return keys
+    
+    def _keys_for_listing_invalidation(self, listing_id: str) -> Set[str]:
+        """
+        Keys a manual listing invalidation must evict
+        
+        The listing's new state is unknown, so - like a malformed change
+        event - it is assumed to match every cached search.
+        """
+        keys = self._keys_for_listing_change(listing_id, None)
+        keys.update(self._search_filters)
+        return keys
+    
+    @staticmethod
+    def _may_match(listing: Listing, filters: SearchFilters) -> bool:
+        """Cheap, conservative filter check (False only if it surely does not match)"""
+        if filters.available_only and (listing.status != 'approved' or not listing.available):
+            return False
+        if filters.location and listing.location != filters.location:
+            return False
+        if filters.category and listing.category != filters.category:
+            return False
+        if filters.min_price is not None and listing.price < filters.min_price:
+            return False
+        if filters.max_price is not None and listing.price > filters.max_price:
+            return False
+        return True
+    
+    def _evict(self, keys: Iterable[str]) -> int:
+        """Remove keys from L1 (stale copies too), returning how many were fresh"""
+        evicted = 0
+        for cache_key in keys:
+            for cache in (self.listing_cache, self.user_prefs_cache, self.search_cache):
+                if cache.pop(cache_key, None) is not None:
+                    evicted += 1
+            if cache_key in self.negative_cache:
+                del self.negative_cache[cache_key]
+                evicted += 1
+            for _, stale in self._stale_caches:
+                stale.pop(cache_key, None)
+            self._search_filters.pop(cache_key, None)
+        return evicted
+    
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Shared L2 Cache
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    
+    async def start_invalidation_listener(self):
+        """Subscribe this worker to invalidations broadcast by the others"""
+        if self.l2 is not None:
+            await self.l2.subscribe(self._on_invalidation, self._on_resubscribe)
+            logger.info(f"✓ Listening for cache invalidations ({self.l2.name})")
+    
+    def _on_invalidation(self, keys: List[str]):
+        """Evict keys another worker (or this one) invalidated"""
+        self.invalidations_received += 1
+        self._invalidation_epoch += 1
+        expanded = set(keys)
+        for cache_key in keys:
+            # Searches cached here may differ from the sender's
+            if cache_key.startswith('listing:'):
+                expanded |= self._keys_for_listing_invalidation(cache_key[len('listing:'):])
+        self._evict(expanded)
+        
+        # This worker's searches are in L2 too, where the sender could not see them
+        extra = expanded.difference(keys)
+        if extra:
+            self._spawn_l2_invalidation(sorted(extra), publish=False)
+    
+    def _on_resubscribe(self):
+        """The listener reconnected: invalidations sent meanwhile were missed, so drop L1"""
+        self.invalidation_resyncs += 1
+        self.clear_all_caches()
+    
+    def _broadcast_invalidation(self, keys: List[str]):
+        """Delete keys from L2 and tell every worker to drop them from L1"""
+        self._spawn_l2_invalidation(keys, publish=True)
+    
+    def _spawn_l2_invalidation(self, keys: List[str], publish: bool):
+        """Delete keys from L2 in the background (and publish them to the other workers)"""
+        if self.l2 is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning(f"No event loop - L2 invalidation skipped for {keys}")
+            return
+        
+        async def invalidate():
+            try:
+                await self.l2.delete(keys)
+                if publish:
+                    await self.l2.publish_invalidation(keys)
+                else:
+                    # A read before the delete may have refilled L1 from L2
+                    self._invalidation_epoch += 1
+                    self._evict(keys)
+            except Exception as e:
+                self.l2_errors += 1
+                logger.warning(f"L2 invalidation failed for {keys}: {e}")
+        
+        task = loop.create_task(invalidate())
+        self._l2_tasks.add(task)
+        task.add_done_callback(self._l2_tasks.discard)
+    
+    async def _l2_get(self, cache_key: str) -> Any:
+        """Read and decode one key from L2 (None on miss or L2 failure)"""
+        if self.l2 is None:
+            return None
+        try:
+            raw = await self.l2.get(cache_key)
+            value = decode_value(raw) if raw is not None else None
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"L2 read failed for {cache_key}: {e}")
+            return None
+        
+        if value is None:
+            self.l2_misses += 1
+        else:
+            self.l2_hits += 1
+        return value
+    
+    async def _l2_get_many(self, cache_keys: List[str]) -> List[Any]:
+        """Batch version of _l2_get, aligned with cache_keys"""
+        try:
+            raws = await self.l2.get_many(cache_keys)
+            values = [decode_value(raw) if raw is not None else None for raw in raws]
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"L2 batch read failed: {e}")
+            return [None] * len(cache_keys)
+        
+        hits = sum(1 for value in values if value is not None)
+        self.l2_hits += hits
+        self.l2_misses += len(values) - hits
+        return values
+    
+    async def _l2_set(self, cache_key: str, value: Any, ttl: float):
+        """Write to L2; values L2 cannot serialize stay process-local"""
+        if self.l2 is None:
+            return
+        try:
+            await self.l2.set(cache_key, encode_value(value), ttl)
+        except TypeError:
+            pass
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"L2 write failed for {cache_key}: {e}")
+    
+    async def close(self):
+        """Flush pending invalidations/refreshes and close the L2 connection"""
+        pending = self._l2_tasks | self._revalidation_tasks
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self.l2 is not None:
+            await self.l2.close()
+    
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Health Check
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -290,3 +887,7 @@ class CachedRepository(DataRepository):
     async def health_check(self) -> bool:
         """Check base repository health"""
         return await self.base.health_check()
+    
+    def supports_range_reuse(self, filters: SearchFilters) -> bool:
+        """Delegates to the base repository"""
+        return self.base.supports_range_reuse(filters)
@@ -0,0 +1,405 @@
+"""
+Listing Catalog
+In-process replica of the listings collection, kept current by a
+Firestore on_snapshot listener
+
+Why a replica:
+- Browse, matching and partner analytics re-read the whole listings
+  collection on every request
+- The catalog is small enough to hold in memory; after the initial
+  snapshot only changed documents cross the wire
+- Lookups by id, partner, category, location and tag become dict hits
+
+Consistency:
+- Reads see the state as of the last applied snapshot (usually well
+  under a second behind Firestore)
+- `version` increases by one for every applied snapshot, so callers can
+  tell whether anything changed since they last looked
+- Until the first snapshot arrives, or once the listener has died,
+  `ready` is False and callers must fall back to querying Firestore
+- Queries walk ID-sorted views of the secondary indexes, so a page reads
+  only as far as it needs; a view is rebuilt lazily after its index
+  bucket changes
+
+Usage:
+    catalog = get_listing_catalog()
+    catalog.start(db)                      # blocks until the first snapshot
+    catalog.by_partner('partner_1', statuses=('approved', 'pending'))
+"""
+
+import logging
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Hashable
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .pagination import OrderBy, Page, clamp_page_size, decode_page_token, encode_page_token
+from .query_planner import Predicate
+
+logger = logging.getLogger(__name__)
+
+# Fields with a secondary index: field name -> document field
+INDEXED_FIELDS = {
+    'partner': 'partnerId',
+    'category': 'category',
+    'location': 'location',
+    'status': 'status',
+}
+TAG_FIELD = 'tags'
+
+DEFAULT_START_TIMEOUT = 30.0
+
+# Listings checked per lock acquisition while iterating a query
+ITER_CHUNK_SIZE = 256
+
+# Sorted view key of the whole catalog
+ALL_VIEW = ('all', None)
+
+
+def _indexable(value: Any) -> bool:
+    return value is not None and isinstance(value, Hashable)
+
+
+def _tags_of(data: Dict[str, Any]) -> List[Any]:
+    tags = data.get(TAG_FIELD)
+    if not isinstance(tags, list):
+        return []
+    return [tag for tag in tags if _indexable(tag)]
+
+
+class ListingCatalog:
+    """
+    In-memory listings replica with secondary indexes
+
+    Thread-safety: snapshot callbacks run on the Firestore watch thread,
+    readers run on the event loop; every access holds the catalog lock.
+    Readers always get copies, never the stored dicts.
+    """
+
+    def __init__(self, collection: str = 'listings'):
+        self.collection = collection
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {
+            name: defaultdict(set) for name in INDEXED_FIELDS
+        }
+        self._tags: Dict[str, Set[str]] = defaultdict(set)
+
+        # (index, value) -> ID-sorted list of that bucket; never mutated,
+        # dropped when the bucket changes and rebuilt on the next query
+        self._sorted_views: Dict[Tuple[str, Any], List[str]] = {}
+
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._watch = None
+        self._change_listeners: List[Callable[[List[Any], Any], None]] = []
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lifecycle
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    @property
+    def ready(self) -> bool:
+        """True once the initial snapshot has been loaded and while the listener is still running"""
+        if not self._ready.is_set():
+            return False
+        return self._watch is None or getattr(self._watch, 'is_active', True)
+
+    def start(self, db, timeout: float = DEFAULT_START_TIMEOUT) -> bool:
+        """
+        Attach the snapshot listener and wait for the initial load
+
+        Blocking - call via run_blocking() from async code.
+
+        Returns:
+            True if the initial snapshot arrived within timeout
+        """
+        if self._watch is None:
+            self._watch = db.collection(self.collection).on_snapshot(self._on_snapshot)
+
+        if not self._ready.wait(timeout):
+            logger.warning(f"ListingCatalog: initial snapshot not received within {timeout}s - serving from Firestore")
+            return False
+        return True
+
+    def stop(self):
+        """Detach the snapshot listener (the replica stops updating)"""
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        self._ready.clear()
+
+    def add_change_listener(self, callback: Callable[[List[Any], Any], None]):
+        """
+        Call callback(changes, read_time) after each applied snapshot
+
+        The initial load is not reported. Callbacks run on the watch thread,
+        so other listeners can share this watch instead of opening their own.
+        """
+        self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback: Callable[[List[Any], Any], None]):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        """Firestore watch callback"""
+        was_ready = self._ready.is_set()
+        try:
+            self.apply_changes(changes)
+        except Exception as e:
+            logger.error(f"ListingCatalog: failed to apply snapshot: {e}")
+            return
+
+        if was_ready:
+            for callback in list(self._change_listeners):
+                try:
+                    callback(changes, read_time)
+                except Exception as e:
+                    logger.error(f"ListingCatalog: change listener failed: {e}")
+
+    def apply_changes(self, changes: Iterable[Any]):
+        """
+        Apply one snapshot's document changes and bump the version
+
+        Each change has `.type.name` (ADDED / MODIFIED / REMOVED) and
+        `.document` (a DocumentSnapshot).
+        """
+        changed = 0
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                self._remove(doc.id)
+                if change.type.name != 'REMOVED':
+                    data = doc.to_dict() or {}
+                    data['id'] = doc.id
+                    self._add(data)
+                changed += 1
+
+            self.version += 1
+            self.updated_at = datetime.utcnow()
+
+        if not self._ready.is_set():
+            self._ready.set()
+            logger.info(f"✓ ListingCatalog loaded {len(self._docs)} listings")
+        elif changed:
+            logger.debug(f"ListingCatalog applied {changed} changes (version {self.version})")
+
+    def _add(self, data: Dict[str, Any]):
+        listing_id = data['id']
+        self._docs[listing_id] = data
+        self._sorted_views.pop(ALL_VIEW, None)
+        for name, field_name in INDEXED_FIELDS.items():
+            value = data.get(field_name)
+            if _indexable(value):
+                self._indexes[name][value].add(listing_id)
+                self._sorted_views.pop((name, value), None)
+        for tag in _tags_of(data):
+            self._tags[tag].add(listing_id)
+            self._sorted_views.pop((TAG_FIELD, tag), None)
+
+    def _remove(self, listing_id: str):
+        data = self._docs.pop(listing_id, None)
+        if data is None:
+            return
+        self._sorted_views.pop(ALL_VIEW, None)
+        for name, field_name in INDEXED_FIELDS.items():
+            value = data.get(field_name)
+            if _indexable(value):
+                self._discard(self._indexes[name], value, listing_id)
+                self._sorted_views.pop((name, value), None)
+        for tag in _tags_of(data):
+            self._discard(self._tags, tag, listing_id)
+            self._sorted_views.pop((TAG_FIELD, tag), None)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, listing_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(listing_id)
+            if not ids:
+                del index[key]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lookups
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def get(self, listing_id: str) -> Optional[Dict[str, Any]]:
+        """Listing by ID (None if unknown)"""
+        with self._lock:
+            data = self._docs.get(listing_id)
+            return dict(data) if data is not None else None
+
+    def get_many(self, listing_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Listings by ID in input order (unknown IDs skipped)"""
+        with self._lock:
+            return [dict(self._docs[i]) for i in listing_ids if i in self._docs]
+
+    def by_partner(self, partner_id: str, statuses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return self._lookup('partner', partner_id, statuses)
+
+    def by_category(self, category: str, statuses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return self._lookup('category', category, statuses)
+
+    def by_location(self, location: str, statuses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        return self._lookup('location', location, statuses)
+
+    def by_tag(self, tag: str, statuses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._collect(self._tags.get(tag, ()), statuses)
+
+    def all(self, statuses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._collect(self._docs.keys(), statuses)
+
+    def _lookup(self, index: str, value: Any, statuses: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._collect(self._indexes[index].get(value, ()), statuses)
+
+    def _collect(self, ids: Iterable[str], statuses: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+        results = []
+        for listing_id in sorted(ids):
+            data = self._docs[listing_id]
+            if statuses is None or data.get('status') in statuses:
+                results.append(dict(data))
+        return results
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Queries
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def query(self, predicates: Sequence[Predicate]) -> List[Dict[str, Any]]:
+        """
+        All listings matching the predicates, ordered by ID
+
+        Narrows by the smallest matching secondary index, then evaluates
+        every predicate on the candidates.
+        """
+        return list(self.iter_query(predicates))
+
+    def iter_query(
+        self,
+        predicates: Sequence[Predicate],
+        after: Optional[str] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield the listings matching the predicates, ordered by ID
+
+        Holds the lock only while checking a chunk of candidates, so a slow
+        consumer (e.g. an NDJSON stream) never blocks snapshot updates and
+        memory stays bounded by the chunk. Listings changed mid-iteration
+        are seen in their current state; ones added after it began are not.
+
+        Args:
+            after: Only listings with an ID greater than this
+            where: Extra filter for conditions predicates can't express
+        """
+        with self._lock:
+            candidates = self._candidates(predicates)
+        start = bisect_right(candidates, after) if after is not None else 0
+
+        ids = islice(candidates, start, None)
+        while True:
+            chunk = list(islice(ids, ITER_CHUNK_SIZE))
+            if not chunk:
+                return
+            with self._lock:
+                matches = []
+                for listing_id in chunk:
+                    data = self._docs.get(listing_id)
+                    if data is not None and all(p.matches(data) for p in predicates):
+                        matches.append(dict(data))
+            for data in matches:
+                if where is None or where(data):
+                    yield data
+
+    def query_page(
+        self,
+        predicates: Sequence[Predicate],
+        page_size: int,
+        page_token: Optional[str] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        order_by: OrderBy = ()
+    ) -> Page:
+        """
+        One page of query() results
+
+        `where` is an extra filter for conditions predicates can't express.
+        Page tokens have the shape of the Firestore cursor for order_by (the
+        last listing's order_by values, then its ID), so a client keeps
+        paging when reads move between the catalog and Firestore. Pages
+        follow listing ID order and resume after the token's ID; with no
+        order_by fields that is exactly Firestore's order.
+
+        Raises:
+            InvalidPageToken: If page_token is malformed
+        """
+        page_size = clamp_page_size(page_size)
+        after = decode_page_token(page_token, expected_length=len(order_by) + 1)[-1] if page_token else None
+
+        matches = list(islice(self.iter_query(predicates, after=after, where=where), page_size + 1))
+
+        items = matches[:page_size]
+        next_token = None
+        if len(matches) > page_size:
+            last = items[-1]
+            next_token = encode_page_token([last.get(field_path) for field_path, _ in order_by] + [last['id']])
+        return Page(items=items, next_page_token=next_token)
+
+    def _candidates(self, predicates: Sequence[Predicate]) -> List[str]:
+        """ID-sorted view of the smallest index bucket the predicates select"""
+        best: Optional[Tuple[Tuple[str, Any], Set[str]]] = None
+        for p in predicates:
+            if p.op == '==':
+                index = next((name for name, f in INDEXED_FIELDS.items() if f == p.field), None)
+                if index is None:
+                    continue
+                view, ids = (index, p.value), self._indexes[index].get(p.value, set())
+            elif p.op == 'array_contains' and p.field == TAG_FIELD:
+                view, ids = (TAG_FIELD, p.value), self._tags.get(p.value, set())
+            else:
+                continue
+            if best is None or len(ids) < len(best[1]):
+                best = (view, ids)
+        if best is None:
+            best = (ALL_VIEW, self._docs.keys())
+
+        view, ids = best
+        if not ids:
+            return []
+        if not _indexable(view[1]):
+            return sorted(ids)
+        if view not in self._sorted_views:
+            self._sorted_views[view] = sorted(ids)
+        return self._sorted_views[view]
+
+    def stats(self) -> Dict[str, Any]:
+        """Replica status for health endpoints"""
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'listings': len(self._docs),
+                'version': self.version,
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            }
+
+
+# Singleton instance
+_catalog_instance: Optional[ListingCatalog] = None
+
+
+def get_listing_catalog() -> ListingCatalog:
+    """Get or create the process-wide listing catalog (not started)"""
+    global _catalog_instance
+    if _catalog_instance is None:
+        _catalog_instance = ListingCatalog()
+    return _catalog_instance
@@ -135,10 +135,11 @@ async def example_real_time_queries():
     print("-" * 60)
     
     stats = data_repo._get_cache_stats()
-    print(f"Cache hits: {stats['hits']}")
-    print(f"Cache misses: {stats['misses']}")
-    print(f"Hit rate: {stats['hit_rate']}")
-    print(f"Listing cache size: {stats['listing_cache_size']}")
+    print(f"Cache hits: {stats['totals']['hits']}")
+    print(f"Cache misses: {stats['totals']['misses']}")
+    print(f"Hit ratio: {stats['totals']['hit_ratio']:.2%}")
+    print(f"Listing cache: {stats['caches']['listing']['entries']} entries, "
+          f"{stats['caches']['listing']['bytes']} bytes")
     
     print("\n" + "="*60)
 
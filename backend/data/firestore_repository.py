@@ -3,15 +3,26 @@ Firestore Repository Implementation
 Real-time data fetcher for Firestore backend
 """
 
+import asyncio
 import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from config.firebase_admin import run_blocking
+
 from .repository import DataRepository
 from .models import (
     Listing, UserPreferences, Booking, AvailabilityCheck, 
     SearchFilters, BookingStatus
 )
+from .pagination import (
+    Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+    apply_cursor, build_page, clamp_page_size
+)
+from .catalog import ListingCatalog
+from .booking_index import BookingIndex
+from .projection import apply_projection
+from .query_planner import Predicate, QueryPlan, get_query_planner
 
 logger = logging.getLogger(__name__)
 
@@ -22,29 +33,52 @@ class FirestoreRepository(DataRepository):
     
     Features:
     - Direct Firestore queries (no caching at this level)
+    - Non-blocking: sync client calls run on the shared Firestore executor
     - Indexed queries for performance
+    - Listing reads served from the in-memory ListingCatalog when it is loaded
+    - Availability answered from the in-memory BookingIndex when it is loaded
     - Type-safe data models
     - Error handling with fallbacks
     """
     
-    def __init__(self, firestore_db):
+    def __init__(
+        self,
+        firestore_db,
+        catalog: Optional[ListingCatalog] = None,
+        booking_index: Optional[BookingIndex] = None,
+        verify_availability: bool = False
+    ):
         """
         Initialize repository with Firestore database
         
         Args:
             firestore_db: Firestore database instance
+            catalog: Optional listing replica; used only while catalog.ready
+            booking_index: Optional booking intervals; used only while booking_index.ready
+            verify_availability: Answer availability from Firestore and cross-check the index
         """
         self.db = firestore_db
+        self.catalog = catalog
+        self.booking_index = booking_index
+        self.verify_availability = verify_availability
         logger.info("✓ FirestoreRepository initialized")
     
+    def _use_catalog(self) -> bool:
+        return self.catalog is not None and self.catalog.ready
+    
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Listing Operations
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
     async def get_listing(self, listing_id: str) -> Optional[Listing]:
         """Get single listing by ID (real-time)"""
+        if self._use_catalog():
+            data = self.catalog.get(listing_id)
+            return Listing.from_dict(data) if data else None
+        
         try:
-            doc = self.db.collection('listings').document(listing_id).get()
+            doc_ref = self.db.collection('listings').document(listing_id)
+            doc = await run_blocking(doc_ref.get)
             
             if not doc.exists:
                 logger.warning(f"Listing {listing_id} not found")
@@ -67,56 +101,36 @@ class FirestoreRepository(DataRepository):
         """
         Get listings with filters (real-time)
         
-        Uses Firestore composite indexes for efficient querying
+        Uses Firestore composite indexes for efficient querying.
+        
+        NOTE: offset > 0 still makes Firestore read (and bill) every skipped
+        document - use get_listings_page() with a page token for deep pages.
+        A first page larger than MAX_PAGE_SIZE is not paginated, so it is
+        never cut short. limit <= 0 returns nothing.
         """
+        if limit <= 0:
+            return []
+        if offset <= 0 and limit <= MAX_PAGE_SIZE:
+            page = await self.get_listings_page(filters, page_size=limit)
+            return page.items
+        
+        if self._use_catalog():
+            matches = [
+                Listing.from_dict(data)
+                for data in self.catalog.query(self._listing_predicates(filters))
+            ]
+            matches = [l for l in matches if self._matches_filters(l, filters)]
+            return matches[offset:offset + limit]
+        
         try:
-            # Start with base query
-            query = self.db.collection('listings')
-            
-            # Filter by status (always approved for public)
-            if filters.available_only:
-                query = query.where('status', '==', 'approved')
-                query = query.where('available', '==', True)
-            
-            # Location filter (exact match)
-            if filters.location:
-                query = query.where('location', '==', filters.location)
-            
-            # Category filter
-            if filters.category:
-                query = query.where('category', '==', filters.category)
-            
-            # Price range (NOTE: Firestore limitation - can only use one inequality)
-            if filters.max_price is not None:
-                query = query.where('price', '<=', filters.max_price)
-            
-            # Rating filter
-            if filters.min_rating is not None:
-                query = query.where('rating', '>=', filters.min_rating)
-            
-            # Amenities filter (array-contains for single amenity)
-            # For multiple amenities, we fetch and filter in Python
-            if filters.amenities and len(filters.amenities) == 1:
-                query = query.where('amenities', 'array_contains', filters.amenities[0])
-            
-            # Pagination
-            if offset > 0:
-                query = query.offset(offset)
+            query, plan = self._build_listings_query(filters)
+            for field_path, direction in plan.order_by:
+                query = query.order_by(field_path, direction=direction)
+            query = query.offset(offset)
             
             # Execute query
-            docs = query.limit(limit).stream()
-            
-            listings = []
-            for doc in docs:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                listing = Listing.from_dict(data)
-                
-                # Post-filter for conditions Firestore can't handle
-                if not self._matches_filters(listing, filters):
-                    continue
-                
-                listings.append(listing)
+            docs = await run_blocking(query.limit(limit).get)
+            listings = self._docs_to_listings(docs, filters, plan)
             
             logger.info(f"✓ Fetched {len(listings)} listings with filters: {filters.to_dict()}")
             return listings
@@ -125,12 +139,137 @@ class FirestoreRepository(DataRepository):
             logger.error(f"Error fetching listings: {e}")
             return []
     
-    def _matches_filters(self, listing: Listing, filters: SearchFilters) -> bool:
-        """Post-query filtering for complex conditions"""
+    async def get_listings_page(
+        self,
+        filters: SearchFilters,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of listings using a start_after() cursor
+        
+        Cost is the same for every page (no skipped-document reads).
+        Pages can be shorter than page_size when post-filters drop rows;
+        next_page_token is still correct because it is taken from the last
+        document Firestore returned, not the last one kept.
+        
+        Raises:
+            InvalidPageToken: If page_token is malformed
+        """
+        page_size = clamp_page_size(page_size)
+        
+        if self._use_catalog():
+            # Same token shape as the Firestore query below, in case the catalog stops being ready
+            predicates = self._listing_predicates(filters)
+            page = self.catalog.query_page(
+                predicates,
+                page_size,
+                page_token,
+                where=lambda data: self._matches_filters(Listing.from_dict(data), filters),
+                order_by=get_query_planner().plan('listings', predicates).order_by
+            )
+            return Page(
+                items=[Listing.from_dict(data) for data in page.items],
+                next_page_token=page.next_page_token
+            )
+        
+        query, plan = self._build_listings_query(filters)
+        query = apply_cursor(query, page_size, page_token, plan.order_by)
         
-        # Min price (if max_price was used in query, can't use min_price there)
-        if filters.min_price is not None and listing.price < filters.min_price:
+        try:
+            docs = await run_blocking(query.get)
+        except Exception as e:
+            logger.error(f"Error fetching listings page: {e}")
+            return Page()
+        
+        page_docs, next_token = build_page(docs, page_size, plan.order_by)
+        listings = self._docs_to_listings(page_docs, filters, plan)
+        
+        logger.info(f"✓ Fetched page of {len(listings)} listings with filters: {filters.to_dict()}")
+        return Page(items=listings, next_page_token=next_token)
+    
+    def supports_range_reuse(self, filters: SearchFilters) -> bool:
+        """
+        True when no filter is applied after the limit
+        
+        The catalog filters before slicing. Firestore queries are only
+        prefix-stable if the planner pushes every predicate and
+        _matches_filters has nothing to drop.
+        """
+        if self._use_catalog():
+            return True
+        if len(filters.amenities) > 1 or filters.tags or filters.min_capacity is not None:
             return False
+        plan = get_query_planner().plan('listings', self._listing_predicates(filters))
+        return not plan.post_filters
+    
+    def _build_listings_query(self, filters: SearchFilters):
+        """
+        Translate SearchFilters into a Firestore query via the query planner
+        
+        Returns:
+            (query, plan) - plan.order_by matches the composite index chosen
+            (if any) and plan.post_filters holds what Firestore can't serve
+        """
+        plan = get_query_planner().plan('listings', self._listing_predicates(filters))
+        logger.debug(f"Listing query plan: {plan.describe()}")
+        
+        return plan.apply(self.db.collection('listings')), plan
+    
+    def _listing_predicates(self, filters: SearchFilters) -> List[Predicate]:
+        """SearchFilters as predicates (multi-amenity, tags and capacity stay in _matches_filters)"""
+        predicates = []
+        
+        # Filter by status (always approved for public)
+        if filters.available_only:
+            predicates.append(Predicate('status', '==', 'approved'))
+            predicates.append(Predicate('available', '==', True))
+        
+        # Location / category (exact match)
+        if filters.location:
+            predicates.append(Predicate('location', '==', filters.location))
+        if filters.category:
+            predicates.append(Predicate('category', '==', filters.category))
+        
+        # Ranges (Firestore allows inequality filters on one field only;
+        # the planner pushes the best one and post-filters the rest)
+        if filters.min_price is not None:
+            predicates.append(Predicate('price', '>=', filters.min_price))
+        if filters.max_price is not None:
+            predicates.append(Predicate('price', '<=', filters.max_price))
+        if filters.min_rating is not None:
+            predicates.append(Predicate('rating', '>=', filters.min_rating))
+        
+        # Amenities filter (array-contains for single amenity)
+        # For multiple amenities, we fetch and filter in Python
+        if filters.amenities and len(filters.amenities) == 1:
+            predicates.append(Predicate('amenities', 'array_contains', filters.amenities[0]))
+        
+        return predicates
+    
+    def _docs_to_listings(self, docs, filters: SearchFilters, plan: QueryPlan) -> List[Listing]:
+        """Convert snapshots to listings, applying post-filters"""
+        listings = []
+        for doc in docs:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            
+            # Predicates the chosen index could not serve
+            if not plan.matches(data):
+                continue
+            
+            listing = Listing.from_dict(data)
+            
+            # Post-filter for conditions Firestore can't handle
+            if not self._matches_filters(listing, filters):
+                continue
+            
+            listings.append(listing)
+        
+        return listings
+    
+    def _matches_filters(self, listing: Listing, filters: SearchFilters) -> bool:
+        """Post-query filtering for complex conditions"""
         
         # Multiple amenities (all must be present)
         if filters.amenities and len(filters.amenities) > 1:
@@ -162,11 +301,11 @@ class FirestoreRepository(DataRepository):
             # Simple text search (Firestore doesn't have full-text search)
             # In production, use Algolia or vector DB
             
-            all_docs = self.db.collection('listings')\
+            listings_query = self.db.collection('listings')\
                 .where('status', '==', 'approved')\
                 .where('available', '==', True)\
-                .limit(50)\
-                .stream()
+                .limit(50)
+            all_docs = await run_blocking(listings_query.get)
             
             listings = []
             query_lower = query.lower()
@@ -205,8 +344,9 @@ class FirestoreRepository(DataRepository):
         
         Algorithm:
         1. Check if listing exists and is active
-        2. Query all confirmed/pending bookings for listing
-        3. Check for date overlap
+        2. Find confirmed/pending bookings overlapping the dates - from the
+           BookingIndex when it is ready, otherwise by querying Firestore
+        3. In verify mode, always query Firestore and compare with the index
         """
         try:
             # Check listing exists
@@ -229,18 +369,17 @@ class FirestoreRepository(DataRepository):
                     reason="Listing is inactive"
                 )
             
-            # Get conflicting bookings
-            bookings = await self.get_bookings_for_listing(
-                listing_id=listing_id,
-                status_filter=[BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value]
-            )
-            
-            conflicts = []
-            for booking in bookings:
-                # Check for date overlap
-                # Overlap if: NOT (end_date < booking_start OR start_date > booking_end)
-                if not (end_date <= booking.start_date or start_date >= booking.end_date):
-                    conflicts.append(booking.id)
+            index_ready = self.booking_index is not None and self.booking_index.ready
+            if index_ready and not self.verify_availability:
+                conflicts = self.booking_index.overlapping(listing_id, start_date, end_date)
+            else:
+                conflicts = await self._query_conflicts(listing_id, start_date, end_date)
+                if index_ready:
+                    self.booking_index.record_verification(
+                        listing_id,
+                        self.booking_index.overlapping(listing_id, start_date, end_date),
+                        conflicts
+                    )
             
             available = len(conflicts) == 0
             
@@ -263,6 +402,26 @@ class FirestoreRepository(DataRepository):
                 reason=f"Error: {str(e)}"
             )
     
+    async def _query_conflicts(
+        self,
+        listing_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[str]:
+        """IDs of confirmed/pending bookings overlapping the dates (Firestore scan)"""
+        bookings = await self.get_bookings_for_listing(
+            listing_id=listing_id,
+            status_filter=[BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value]
+        )
+        
+        conflicts = []
+        for booking in bookings:
+            # Check for date overlap
+            # Overlap if: NOT (end_date <= booking_start OR start_date >= booking_end)
+            if not (end_date <= booking.start_date or start_date >= booking.end_date):
+                conflicts.append(booking.id)
+        return conflicts
+    
     async def get_listing_price(
         self,
         listing_id: str,
@@ -283,7 +442,8 @@ class FirestoreRepository(DataRepository):
     async def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
         """Get user preferences from traveler profile"""
         try:
-            doc = self.db.collection('travelers').document(user_id).get()
+            doc_ref = self.db.collection('travelers').document(user_id)
+            doc = await run_blocking(doc_ref.get)
             
             if not doc.exists:
                 logger.warning(f"User {user_id} not found")
@@ -303,7 +463,8 @@ class FirestoreRepository(DataRepository):
             saved_ref = self.db.collection('travelers').document(user_id)\
                 .collection('saved_listings')
             
-            docs = saved_ref.stream()
+            # Only the document IDs are needed
+            docs = await run_blocking(apply_projection(saved_ref, []).get)
             return [doc.id for doc in docs]
             
         except Exception as e:
@@ -329,7 +490,7 @@ class FirestoreRepository(DataRepository):
             if status_filter:
                 query = query.where('status', 'in', status_filter)
             
-            docs = query.stream()
+            docs = await run_blocking(query.get)
             
             bookings = []
             for doc in docs:
@@ -364,7 +525,7 @@ class FirestoreRepository(DataRepository):
             if status_filter:
                 query = query.where('status', 'in', status_filter)
             
-            docs = query.stream()
+            docs = await run_blocking(query.get)
             
             bookings = []
             for doc in docs:
@@ -382,25 +543,62 @@ class FirestoreRepository(DataRepository):
     # Batch Operations
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     
+    # Documents per multi-get round trip
+    BATCH_GET_CHUNK_SIZE = 100
+    
     async def get_listings_batch(self, listing_ids: List[str]) -> List[Listing]:
-        """Batch fetch listings (efficient)"""
+        """
+        Batch fetch listings with Firestore multi-get
+        
+        IDs are de-duplicated and split into chunks of BATCH_GET_CHUNK_SIZE;
+        each chunk is a single get_all() round trip and chunks run concurrently.
+        Results follow the order of listing_ids (missing documents are skipped).
+        """
         try:
             if not listing_ids:
                 return []
             
-            # Firestore batch get
-            listings = []
-            for listing_id in listing_ids:
-                listing = await self.get_listing(listing_id)
-                if listing:
-                    listings.append(listing)
+            if self._use_catalog():
+                return [Listing.from_dict(data) for data in self.catalog.get_many(listing_ids)]
             
-            return listings
+            unique_ids = list(dict.fromkeys(listing_ids))
+            chunks = [
+                unique_ids[i:i + self.BATCH_GET_CHUNK_SIZE]
+                for i in range(0, len(unique_ids), self.BATCH_GET_CHUNK_SIZE)
+            ]
+            
+            chunk_results = await asyncio.gather(
+                *[self._get_all_listings(chunk) for chunk in chunks]
+            )
+            
+            by_id: Dict[str, Listing] = {}
+            for chunk_listings in chunk_results:
+                by_id.update(chunk_listings)
+            
+            return [by_id[listing_id] for listing_id in listing_ids if listing_id in by_id]
             
         except Exception as e:
             logger.error(f"Error batch fetching listings: {e}")
             return []
     
+    async def _get_all_listings(self, listing_ids: List[str]) -> Dict[str, Listing]:
+        """Fetch one chunk of listings in a single multi-get round trip"""
+        collection = self.db.collection('listings')
+        refs = [collection.document(listing_id) for listing_id in listing_ids]
+        
+        # get_all() is a lazy generator - consume it on the worker thread
+        docs = await run_blocking(lambda: list(self.db.get_all(refs)))
+        
+        listings = {}
+        for doc in docs:
+            if not doc.exists:
+                continue
+            data = doc.to_dict()
+            data['id'] = doc.id
+            listings[doc.id] = Listing.from_dict(data)
+        
+        return listings
+    
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Aggregations
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -441,7 +639,7 @@ class FirestoreRepository(DataRepository):
         """Check Firestore connection"""
         try:
             # Try a simple query
-            self.db.collection('listings').limit(1).get()
+            await run_blocking(self.db.collection('listings').limit(1).get)
             return True
         except Exception as e:
             logger.error(f"Firestore health check failed: {e}")
@@ -0,0 +1,125 @@
+"""
+Change-Driven Cache Invalidation
+Evicts CachedRepository entries when Firestore reports a document change
+
+Why:
+- With only TTLs to go on, CachedRepository had to expire listings after
+  2 minutes and searches after 1, so most reads still went to Firestore
+- Snapshot listeners tell us exactly which documents changed, so the
+  affected keys are evicted within about a second and the TTLs can be
+  hours (they only bound staleness if a listener is down)
+
+Sources:
+- listings: reuses the ListingCatalog watch when the catalog is running,
+  otherwise attaches its own listener
+- travelers: own listener (preferences live on the traveler document)
+
+The first snapshot of a listener is the full initial result set, not a
+change, so it is skipped. Callbacks arrive on Firestore watch threads and
+are handed to the event loop, where the caches live.
+
+Usage:
+    repo = CachedRepository(base, ttls=CHANGE_DRIVEN_TTLS)
+    invalidator = CacheInvalidator(repo, catalog=get_listing_catalog())
+    invalidator.start(db, asyncio.get_running_loop())
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ('listings', 'travelers')
+
+
+@dataclass
+class ChangeEvent:
+    """One changed document"""
+    collection: str
+    document_id: str
+    data: Optional[Dict[str, Any]]  # None when the document was removed
+    committed_at: Optional[datetime] = None  # Firestore commit time, for lag
+
+
+def events_from_changes(collection: str, changes: Iterable[Any], read_time: Optional[datetime] = None) -> List[ChangeEvent]:
+    """Convert on_snapshot DocumentChanges into ChangeEvents"""
+    events = []
+    for change in changes:
+        doc = change.document
+        removed = change.type.name == 'REMOVED'
+        data = None if removed else (doc.to_dict() or {})
+        committed_at = read_time if removed else (getattr(doc, 'update_time', None) or read_time)
+        events.append(ChangeEvent(collection, doc.id, data, committed_at))
+    return events
+
+
+class CacheInvalidator:
+    """Feeds Firestore change events into CachedRepository.apply_change_events"""
+
+    def __init__(self, repository, catalog=None):
+        """
+        Args:
+            repository: CachedRepository to keep fresh
+            catalog: Running ListingCatalog whose watch can be shared (optional)
+        """
+        self.repository = repository
+        self.catalog = catalog
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watches: Dict[str, Any] = {}
+        self._primed: Dict[str, bool] = {}
+        self._using_catalog = False
+
+    @property
+    def active(self) -> bool:
+        """True while change events are being received"""
+        return self._using_catalog or bool(self._watches)
+
+    def start(self, db, loop: asyncio.AbstractEventLoop):
+        """Attach listeners; events are applied on loop"""
+        self._loop = loop
+
+        if self.catalog is not None and self.catalog.ready:
+            self.catalog.add_change_listener(self._on_catalog_changes)
+            self._using_catalog = True
+        else:
+            self._watch(db, 'listings')
+        self._watch(db, 'travelers')
+
+        source = "catalog" if self._using_catalog else "listener"
+        logger.info(f"✓ Change-driven cache invalidation active (listings via {source}, travelers via listener)")
+
+    def stop(self):
+        """Detach listeners"""
+        if self._using_catalog:
+            self.catalog.remove_change_listener(self._on_catalog_changes)
+            self._using_catalog = False
+        for watch in self._watches.values():
+            watch.unsubscribe()
+        self._watches.clear()
+        self._primed.clear()
+
+    def _watch(self, db, collection: str):
+        self._primed[collection] = False
+
+        def on_snapshot(docs, changes, read_time):
+            if not self._primed[collection]:
+                self._primed[collection] = True
+                return
+            self._dispatch(events_from_changes(collection, changes, read_time))
+
+        self._watches[collection] = db.collection(collection).on_snapshot(on_snapshot)
+
+    def _on_catalog_changes(self, changes, read_time):
+        self._dispatch(events_from_changes('listings', changes, read_time))
+
+    def _dispatch(self, events: List[ChangeEvent]):
+        """Hand events from a watch thread to the event loop"""
+        if not events or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.repository.apply_change_events(events), self._loop)
+        except Exception as e:
+            logger.error(f"CacheInvalidator: failed to dispatch {len(events)} changes: {e}")
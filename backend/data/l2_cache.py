@@ -0,0 +1,327 @@
+"""
+Shared Second-Tier (L2) Cache
+Cross-worker cache behind CachedRepository's per-process TTL caches
+
+Why:
+- Each uvicorn worker has its own L1 TTLCache, so with N workers every
+  popular key is fetched N times and the hit rate divides by N
+- invalidate_listing() on one worker never reached the others
+
+Lookup order is L1 (process) -> L2 (shared) -> base repository. Values are
+stored as JSON so any worker (or a redeploy) can read them back.
+
+Invalidation is broadcast on a pub/sub channel; every worker evicts the
+keys from its L1. Pub/sub is at-most-once: messages are lost while a
+worker's subscription is down (Redis also drops subscribers that fall
+behind). L1 TTLs can be hours (CHANGE_DRIVEN_TTLS), so a listener that
+resubscribes after an error calls on_resubscribe, and CachedRepository
+clears its L1 - a lost invalidation is stale only until the reconnect.
+
+Backends:
+- RedisL2Cache: any Redis-protocol server (Redis, Valkey, KeyDB, ...)
+- LocalL2Cache: in-process stand-in for tests and single-worker dev;
+  repositories sharing one instance behave like workers sharing Redis
+
+Configured with CACHE_L2_URL: empty (disabled), "local", or redis://...
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .models import Listing, UserPreferences
+from .pagination import Page
+
+logger = logging.getLogger(__name__)
+
+# Optional dependency (only needed for a real shared cache)
+try:
+    import redis.asyncio as aioredis  # type: ignore[import-not-found]
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+INVALIDATION_CHANNEL = "skyconnect:cache:invalidate"
+DEFAULT_KEY_PREFIX = "skyconnect:"
+
+InvalidationHandler = Callable[[List[str]], None]
+ResubscribeHandler = Callable[[], None]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Serialization
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_DATETIME_FIELDS = ('created_at', 'updated_at')
+
+
+def _listing_to_json(listing: Listing) -> Dict[str, Any]:
+    data = asdict(listing)
+    for name in _DATETIME_FIELDS:
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
+
+
+def _listing_from_json(data: Dict[str, Any]) -> Listing:
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            data[name] = datetime.fromisoformat(data[name])
+    return Listing(**data)
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serialize a cached value for L2
+
+    Supports Listing, UserPreferences, List[Listing] and Page of listings.
+    Raises TypeError for anything else (the value then stays L1-only).
+    """
+    if isinstance(value, Listing):
+        payload = {'t': 'listing', 'v': _listing_to_json(value)}
+    elif isinstance(value, UserPreferences):
+        payload = {'t': 'prefs', 'v': asdict(value)}
+    elif isinstance(value, Page) and all(isinstance(item, Listing) for item in value.items):
+        payload = {
+            't': 'page',
+            'v': [_listing_to_json(item) for item in value.items],
+            'next': value.next_page_token,
+        }
+    elif isinstance(value, list) and all(isinstance(item, Listing) for item in value):
+        payload = {'t': 'listings', 'v': [_listing_to_json(item) for item in value]}
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} in L2 cache")
+
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def decode_value(raw: bytes) -> Any:
+    """Inverse of encode_value"""
+    payload = json.loads(raw)
+    kind = payload['t']
+
+    if kind == 'listing':
+        return _listing_from_json(payload['v'])
+    if kind == 'prefs':
+        return UserPreferences(**payload['v'])
+    if kind == 'page':
+        return Page(items=[_listing_from_json(item) for item in payload['v']],
+                    next_page_token=payload.get('next'))
+    if kind == 'listings':
+        return [_listing_from_json(item) for item in payload['v']]
+
+    raise ValueError(f"Unknown L2 payload type: {kind}")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Backends
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class L2Cache(ABC):
+    """Shared byte-oriented cache with an invalidation channel"""
+
+    name = "l2"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes, or None on miss"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Batch get; result is aligned with keys"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float):
+        """Store bytes with a TTL in seconds"""
+        pass
+
+    @abstractmethod
+    async def delete(self, keys: List[str]):
+        """Remove keys (missing keys are ignored)"""
+        pass
+
+    @abstractmethod
+    async def publish_invalidation(self, keys: List[str]):
+        """Tell every subscribed worker to evict keys from its L1"""
+        pass
+
+    @abstractmethod
+    async def subscribe(self, handler: InvalidationHandler,
+                        on_resubscribe: Optional[ResubscribeHandler] = None):
+        """
+        Call handler(keys) for every invalidation broadcast
+
+        on_resubscribe() is called after the subscription was lost and
+        restored, since broadcasts in between were missed.
+        """
+        pass
+
+    async def close(self):
+        """Release connections and stop listeners"""
+        pass
+
+
+class LocalL2Cache(L2Cache):
+    """
+    In-process L2 stand-in
+
+    Shares state only between repositories holding the same instance, so it
+    is meant for tests and single-worker development, not production.
+    """
+
+    name = "local"
+
+    def __init__(self, timer: Callable[[], float] = time.monotonic):
+        self._timer = timer
+        self._store: Dict[str, tuple] = {}
+        self._handlers: List[InvalidationHandler] = []
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._timer():
+                del self._store[key]
+                return None
+            return value
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._store[key] = (self._timer() + ttl, value)
+
+    async def delete(self, keys: List[str]):
+        with self._lock:
+            for key in keys:
+                self._store.pop(key, None)
+
+    async def publish_invalidation(self, keys: List[str]):
+        for handler in list(self._handlers):
+            handler(list(keys))
+
+    async def subscribe(self, handler: InvalidationHandler,
+                        on_resubscribe: Optional[ResubscribeHandler] = None):
+        # In-process delivery never drops a message
+        self._handlers.append(handler)
+
+    async def close(self):
+        self._handlers.clear()
+
+
+class RedisL2Cache(L2Cache):
+    """
+    Redis-protocol L2 cache (requires `pip install -r requirements-redis.txt`)
+
+    Keys are namespaced with key_prefix so the server can be shared.
+    """
+
+    name = "redis"
+    resubscribe_delay = 1.0
+
+    def __init__(self, url: str, key_prefix: str = DEFAULT_KEY_PREFIX,
+                 channel: str = INVALIDATION_CHANNEL):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis is not installed. Install with: pip install -r requirements-redis.txt")
+
+        self._client = aioredis.from_url(url)
+        self._prefix = key_prefix
+        self._channel = channel
+        self._listener: Optional[asyncio.Task] = None
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._key(key))
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self._client.mget([self._key(key) for key in keys])
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(self._key(key), value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, keys: List[str]):
+        if keys:
+            await self._client.delete(*[self._key(key) for key in keys])
+
+    async def publish_invalidation(self, keys: List[str]):
+        await self._client.publish(self._channel, json.dumps(list(keys)))
+
+    async def subscribe(self, handler: InvalidationHandler,
+                        on_resubscribe: Optional[ResubscribeHandler] = None):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._channel)
+        self._listener = asyncio.ensure_future(self._listen(pubsub, handler, on_resubscribe))
+
+    async def _listen(self, pubsub, handler: InvalidationHandler,
+                      on_resubscribe: Optional[ResubscribeHandler] = None):
+        """Dispatch invalidations until cancelled, reconnecting on errors"""
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        handler(json.loads(message['data']))
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                logger.warning(f"L2 invalidation listener error, resubscribing: {e}")
+                await asyncio.sleep(self.resubscribe_delay)
+                try:
+                    await pubsub.subscribe(self._channel)
+                except Exception:
+                    continue
+                # Broadcasts sent while disconnected are gone
+                if on_resubscribe is not None:
+                    on_resubscribe()
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._client.close()
+
+
+def get_l2_cache(url: Optional[str] = None) -> Optional[L2Cache]:
+    """
+    Build the L2 backend from CACHE_L2_URL
+
+    Returns None (L1 only) when unset, or when Redis is requested but the
+    client library is missing.
+    """
+    url = (url if url is not None else os.getenv("CACHE_L2_URL", "")).strip()
+
+    if not url:
+        return None
+    if url == "local":
+        logger.info("✓ L2 cache: in-process stand-in")
+        return LocalL2Cache()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if not REDIS_AVAILABLE:
+            logger.warning("CACHE_L2_URL set but redis is not installed - L2 cache disabled")
+            return None
+        logger.info("✓ L2 cache: redis")
+        return RedisL2Cache(url)
+
+    logger.warning(f"Unsupported CACHE_L2_URL scheme '{url.split(':')[0]}' - L2 cache disabled")
+    return None
@@ -0,0 +1,354 @@
+"""
+In-Memory Data Repository
+Full DataRepository implementation with no Firebase dependency
+
+Built for offline benchmarking and tests:
+- Secondary indexes mirror the Firestore ones (category, location,
+  partner, bookings by listing and by user), so lookups cost what an
+  indexed query would rather than a scan
+- Optional LatencyModel adds a simulated round trip (base + jitter) to
+  every call, so caching and concurrency changes show realistic gains
+- `calls` counts backend calls per method, to measure cache hit rates
+
+Usage:
+    dataset = generate_dataset('100k', seed=42)
+    repo = InMemoryRepository.from_dataset(dataset, latency=LatencyModel(base_ms=8, jitter_ms=4))
+    cached = CachedRepository(repo)
+"""
+
+import asyncio
+import copy
+import logging
+import random
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Any, Set
+
+from .repository import DataRepository
+from .models import (
+    Listing, UserPreferences, Booking, AvailabilityCheck, SearchFilters, ListingStatus, BookingStatus
+)
+from .pagination import Page, DEFAULT_PAGE_SIZE, clamp_page_size, decode_page_token, encode_page_token
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyModel:
+    """
+    Simulated backend round trip: base_ms + uniform(0, jitter_ms)
+
+    Seeded so benchmark runs are repeatable.
+    """
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    def sample_ms(self) -> float:
+        return self.base_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+
+    async def wait(self):
+        delay = self.sample_ms()
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+class InMemoryRepository(DataRepository):
+    """
+    Dict-backed repository with Firestore-like indexes
+
+    Returned models are copies - callers can't mutate the stored data.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+        self._listings: Dict[str, Listing] = {}
+        self._by_category: Dict[str, Set[str]] = defaultdict(set)
+        self._by_location: Dict[str, Set[str]] = defaultdict(set)
+        self._by_partner: Dict[str, Set[str]] = defaultdict(set)
+
+        self._preferences: Dict[str, UserPreferences] = {}
+        self._saved: Dict[str, List[str]] = {}
+
+        self._bookings: Dict[str, Booking] = {}
+        self._bookings_by_listing: Dict[str, List[str]] = defaultdict(list)
+        self._bookings_by_user: Dict[str, List[str]] = defaultdict(list)
+
+        logger.info("✓ InMemoryRepository initialized")
+
+    @classmethod
+    def from_dataset(cls, dataset, latency: Optional[LatencyModel] = None) -> 'InMemoryRepository':
+        """Load a SyntheticDataset (see data/synthetic.py)"""
+        repo = cls(latency=latency)
+        for listing in dataset.listings:
+            repo.put_listing(listing)
+        for prefs in dataset.preferences:
+            repo.put_user_preferences(prefs)
+        for booking in dataset.bookings:
+            repo.add_booking(booking)
+        for user_id, listing_ids in dataset.saved_listings.items():
+            repo.set_saved_listings(user_id, listing_ids)
+        return repo
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Mutations (test / benchmark setup)
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def put_listing(self, listing: Listing):
+        """Insert or replace a listing and re-index it"""
+        self.remove_listing(listing.id)
+        self._listings[listing.id] = listing
+        self._by_category[listing.category].add(listing.id)
+        self._by_location[listing.location].add(listing.id)
+        self._by_partner[listing.partner_id].add(listing.id)
+
+    def remove_listing(self, listing_id: str):
+        listing = self._listings.pop(listing_id, None)
+        if listing is None:
+            return
+        self._by_category[listing.category].discard(listing_id)
+        self._by_location[listing.location].discard(listing_id)
+        self._by_partner[listing.partner_id].discard(listing_id)
+
+    def put_user_preferences(self, preferences: UserPreferences):
+        self._preferences[preferences.user_id] = preferences
+
+    def set_saved_listings(self, user_id: str, listing_ids: Iterable[str]):
+        self._saved[user_id] = list(listing_ids)
+
+    def add_booking(self, booking: Booking):
+        self._bookings[booking.id] = booking
+        self._bookings_by_listing[booking.listing_id].append(booking.id)
+        self._bookings_by_user[booking.user_id].append(booking.id)
+
+    async def _round_trip(self, method: str):
+        self.calls[method] += 1
+        if self.latency is not None:
+            await self.latency.wait()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Listing Operations
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def get_listing(self, listing_id: str) -> Optional[Listing]:
+        await self._round_trip('get_listing')
+        listing = self._listings.get(listing_id)
+        return copy.copy(listing) if listing else None
+
+    async def get_listings(
+        self,
+        filters: SearchFilters,
+        limit: int = 10,
+        offset: int = 0
+    ) -> List[Listing]:
+        await self._round_trip('get_listings')
+        matches = self._query(filters)
+        return [copy.copy(l) for l in matches[max(0, offset):max(0, offset) + limit]]
+
+    async def get_listings_page(
+        self,
+        filters: SearchFilters,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """Pages ordered by listing ID; tokens carry the last ID"""
+        await self._round_trip('get_listings_page')
+        page_size = clamp_page_size(page_size)
+        after = decode_page_token(page_token, expected_length=1)[0] if page_token else None
+
+        matches = [l for l in self._query(filters) if after is None or l.id > after]
+        items = [copy.copy(l) for l in matches[:page_size]]
+        next_token = encode_page_token([items[-1].id]) if len(matches) > page_size else None
+        return Page(items=items, next_page_token=next_token)
+
+    def supports_range_reuse(self, filters: SearchFilters) -> bool:
+        """Filters are applied before slicing, in ID order"""
+        return True
+
+    def _query(self, filters: SearchFilters) -> List[Listing]:
+        """Index-narrowed filter evaluation (same semantics as FirestoreRepository)"""
+        candidates: Optional[Set[str]] = None
+        if filters.category:
+            candidates = self._by_category.get(filters.category, set())
+        if filters.location:
+            by_location = self._by_location.get(filters.location, set())
+            candidates = by_location if candidates is None else candidates & by_location
+        if candidates is None:
+            candidates = self._listings.keys()
+
+        return [
+            self._listings[listing_id]
+            for listing_id in sorted(candidates)
+            if self._matches(self._listings[listing_id], filters)
+        ]
+
+    @staticmethod
+    def _matches(listing: Listing, filters: SearchFilters) -> bool:
+        if filters.available_only and (listing.status != ListingStatus.APPROVED.value or not listing.available):
+            return False
+        if filters.min_price is not None and listing.price < filters.min_price:
+            return False
+        if filters.max_price is not None and listing.price > filters.max_price:
+            return False
+        if filters.min_rating is not None and listing.rating < filters.min_rating:
+            return False
+        if filters.amenities and not all(a in listing.amenities for a in filters.amenities):
+            return False
+        if filters.tags and not any(t in listing.tags for t in filters.tags):
+            return False
+        if filters.min_capacity is not None and listing.capacity < filters.min_capacity:
+            return False
+        return True
+
+    async def search_listings_semantic(
+        self,
+        query: str,
+        limit: int = 10
+    ) -> List[Listing]:
+        """Keyword match on title/description/location (like the Firestore fallback)"""
+        await self._round_trip('search_listings_semantic')
+        query_lower = query.lower()
+
+        results = []
+        for listing in self._listings.values():
+            if listing.status != ListingStatus.APPROVED.value or not listing.available:
+                continue
+            if (query_lower in listing.title.lower()
+                    or query_lower in listing.description.lower()
+                    or query_lower in listing.location.lower()):
+                results.append(copy.copy(listing))
+                if len(results) >= limit:
+                    break
+        return results
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Availability Operations
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def check_availability(
+        self,
+        listing_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> AvailabilityCheck:
+        await self._round_trip('check_availability')
+
+        listing = self._listings.get(listing_id)
+        if not listing:
+            return AvailabilityCheck(listing_id, False, start_date, end_date, reason="Listing not found")
+        if not listing.available:
+            return AvailabilityCheck(listing_id, False, start_date, end_date, reason="Listing is inactive")
+
+        active = (BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value)
+        conflicts = [
+            booking.id
+            for booking in self._listing_bookings(listing_id)
+            if booking.status in active
+            and not (end_date <= booking.start_date or start_date >= booking.end_date)
+        ]
+
+        available = not conflicts
+        return AvailabilityCheck(
+            listing_id=listing_id,
+            available=available,
+            start_date=start_date,
+            end_date=end_date,
+            conflicting_bookings=conflicts,
+            reason=None if available else f"Conflicts with {len(conflicts)} booking(s)"
+        )
+
+    async def get_listing_price(
+        self,
+        listing_id: str,
+        date: Optional[datetime] = None
+    ) -> Optional[float]:
+        await self._round_trip('get_listing_price')
+        listing = self._listings.get(listing_id)
+        return listing.price if listing else None
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # User Preferences
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
+        await self._round_trip('get_user_preferences')
+        prefs = self._preferences.get(user_id)
+        return copy.deepcopy(prefs) if prefs else None
+
+    async def get_user_saved_listings(self, user_id: str) -> List[str]:
+        await self._round_trip('get_user_saved_listings')
+        return list(self._saved.get(user_id, []))
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Booking Operations
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def _listing_bookings(self, listing_id: str) -> List[Booking]:
+        return [self._bookings[i] for i in self._bookings_by_listing.get(listing_id, [])]
+
+    async def get_bookings_for_listing(
+        self,
+        listing_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status_filter: Optional[List[str]] = None
+    ) -> List[Booking]:
+        await self._round_trip('get_bookings_for_listing')
+
+        bookings = []
+        for booking in self._listing_bookings(listing_id):
+            if status_filter and booking.status not in status_filter:
+                continue
+            if start_date and booking.end_date < start_date:
+                continue
+            if end_date and booking.start_date > end_date:
+                continue
+            bookings.append(copy.copy(booking))
+        return bookings
+
+    async def get_user_bookings(
+        self,
+        user_id: str,
+        status_filter: Optional[List[str]] = None
+    ) -> List[Booking]:
+        await self._round_trip('get_user_bookings')
+        return [
+            copy.copy(self._bookings[i])
+            for i in self._bookings_by_user.get(user_id, [])
+            if not status_filter or self._bookings[i].status in status_filter
+        ]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Batch Operations
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def get_listings_batch(self, listing_ids: List[str]) -> List[Listing]:
+        await self._round_trip('get_listings_batch')
+        return [copy.copy(self._listings[i]) for i in listing_ids if i in self._listings]
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Aggregations
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def get_listing_stats(self, listing_id: str) -> Dict[str, Any]:
+        await self._round_trip('get_listing_stats')
+        listing = self._listings.get(listing_id)
+        if not listing:
+            return {}
+
+        bookings = self._listing_bookings(listing_id)
+        confirmed = [b for b in bookings if b.status == BookingStatus.CONFIRMED.value]
+        return {
+            'listing_id': listing_id,
+            'total_bookings': len(bookings),
+            'confirmed_bookings': len(confirmed),
+            'total_revenue': sum(b.total_price for b in confirmed),
+            'rating': listing.rating,
+            'review_count': listing.review_count,
+        }
+
+    async def health_check(self) -> bool:
+        return True
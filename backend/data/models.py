@@ -3,6 +3,8 @@ Data Models for Repository Pattern
 Type-safe data structures for real-time data
 """
 
+import hashlib
+import json
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -196,3 +198,30 @@ class SearchFilters:
             'min_rating': self.min_rating,
             'min_capacity': self.min_capacity,
         }
+    
+    def canonical(self) -> Dict[str, Any]:
+        """
+        Normalized form: filters that select the same listings compare equal
+        
+        Tag/amenity order and duplicates, None vs empty values and int vs
+        float numbers do not matter.
+        """
+        def number(value, cast):
+            return None if value is None else cast(value)
+        
+        return {
+            'location': self.location or None,
+            'category': self.category or None,
+            'min_price': number(self.min_price, float),
+            'max_price': number(self.max_price, float),
+            'amenities': sorted(set(self.amenities or [])),
+            'tags': sorted(set(self.tags or [])),
+            'available_only': bool(self.available_only),
+            'min_rating': number(self.min_rating, float),
+            'min_capacity': number(self.min_capacity, int),
+        }
+    
+    def digest(self) -> str:
+        """Stable key for caches (same in every process, unlike hash())"""
+        payload = json.dumps(self.canonical(), sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
@@ -0,0 +1,146 @@
+"""
+Cursor Pagination Helpers
+Opaque page tokens over Firestore start_after() cursors
+
+Why cursors instead of offset():
+- offset(n) still reads (and bills) every skipped document
+- Deep pages get slower as n grows
+- start_after(cursor) costs the same for page 1 and page 1000
+
+A page token encodes the order-by values of the last document on the
+previous page plus its document ID (always the final tie-breaker), so
+tokens are only valid for a query with the same order_by fields.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Page size bounds for all paginated reads
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Firestore direction strings (match google.cloud.firestore.Query constants)
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+DOCUMENT_ID_FIELD = "__name__"
+
+OrderBy = Sequence[Tuple[str, str]]
+
+
+class InvalidPageToken(ValueError):
+    """Raised when a page token is malformed or tampered with"""
+    pass
+
+
+@dataclass
+class Page:
+    """One page of results plus the token for the next page (None on the last page)"""
+    items: List[Any] = field(default_factory=list)
+    next_page_token: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'items': self.items,
+            'count': len(self.items),
+            'next_page_token': self.next_page_token,
+        }
+
+
+def clamp_page_size(page_size: Optional[int]) -> int:
+    """Normalize requested page size into [1, MAX_PAGE_SIZE]"""
+    if not page_size or page_size < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and '$dt' in value:
+        return datetime.fromisoformat(value['$dt'])
+    return value
+
+
+def encode_page_token(values: List[Any]) -> str:
+    """Encode cursor values as an opaque URL-safe token"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_page_token(token: str, expected_length: Optional[int] = None) -> List[Any]:
+    """
+    Decode a page token back into cursor values
+
+    Raises:
+        InvalidPageToken: If the token cannot be decoded or has the wrong shape
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidPageToken(f"Invalid page token: {e}") from e
+
+    if not isinstance(values, list) or not values:
+        raise InvalidPageToken("Invalid page token: unexpected payload")
+    if expected_length is not None and len(values) != expected_length:
+        raise InvalidPageToken("Invalid page token: does not match this query")
+
+    return [_decode_value(v) for v in values]
+
+
+def apply_cursor(query, page_size: int, page_token: Optional[str] = None, order_by: OrderBy = ()):
+    """
+    Add ordering, cursor and limit to a Firestore query
+
+    Fetches page_size + 1 documents so build_page() can tell whether
+    another page exists without a second round trip.
+
+    Args:
+        query: Firestore query (filters already applied)
+        page_size: Documents per page (already clamped)
+        page_token: Token from the previous page, if any
+        order_by: (field, direction) pairs; document ID is appended automatically
+    """
+    last_direction = ASCENDING
+    for field_path, direction in order_by:
+        query = query.order_by(field_path, direction=direction)
+        last_direction = direction
+    query = query.order_by(DOCUMENT_ID_FIELD, direction=last_direction)
+
+    if page_token:
+        cursor = decode_page_token(page_token, expected_length=len(order_by) + 1)
+        query = query.start_after(cursor)
+
+    return query.limit(page_size + 1)
+
+
+def build_page(docs: List[Any], page_size: int, order_by: OrderBy = ()) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the over-fetched result and compute the next page token
+
+    Returns:
+        (snapshots on this page, next_page_token or None)
+    """
+    docs = list(docs)
+    if len(docs) <= page_size:
+        return docs, None
+
+    page_docs = docs[:page_size]
+    return page_docs, cursor_token_for(page_docs[-1], order_by)
+
+
+def cursor_token_for(doc, order_by: OrderBy = ()) -> str:
+    """Page token that resumes immediately after the given snapshot"""
+    data = doc.to_dict() or {}
+    values = [data.get(field_path) for field_path, _ in order_by]
+    values.append(doc.id)
+    return encode_page_token(values)
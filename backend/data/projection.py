@@ -0,0 +1,124 @@
+"""
+Field Projections (sparse fieldsets)
+Firestore select() projections for list reads
+
+Why project:
+- Listing documents carry image arrays and long descriptions that list
+  screens and the embedding job never look at
+- Firestore only sends the selected fields over the wire, which cuts
+  egress and JSON encoding time for every document in the page
+
+A projection is a list of field paths. None means "whole document";
+the document ID is always returned as 'id' and is never a field path.
+
+Usage:
+    fields = parse_fields("card", LISTING_FIELDS, LISTING_PRESETS)
+    query = apply_projection(db.collection('listings'), fields)
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .pagination import DOCUMENT_ID_FIELD
+
+# Fields clients may request (mirrors the app's Firestore document shapes)
+LISTING_FIELDS = frozenset({
+    'partnerId', 'partnerName', 'title', 'description', 'category', 'location',
+    'price', 'currency', 'images', 'amenities', 'maxCapacity', 'duration',
+    'availability', 'status', 'tags', 'rating', 'reviewCount', 'createdAt', 'updatedAt',
+})
+
+PARTNER_FIELDS = frozenset({
+    'userId', 'businessName', 'businessCategory', 'description', 'businessAddress',
+    'email', 'contactPhone', 'websiteUrl', 'logo', 'status', 'createdAt', 'updatedAt',
+})
+
+# Browse-screen cards
+LISTING_CARD_FIELDS = ('title', 'category', 'location', 'price', 'currency', 'rating')
+PARTNER_CARD_FIELDS = ('businessName', 'businessCategory', 'businessAddress', 'logo')
+
+# Fields the knowledge base embeds (services/ai/embeddings.py)
+LISTING_TRAINING_FIELDS = (
+    'title', 'description', 'category', 'location', 'price', 'currency',
+    'amenities', 'duration', 'tags', 'partnerId',
+)
+PARTNER_TRAINING_FIELDS = (
+    'userId', 'businessName', 'businessCategory', 'description', 'businessAddress', 'websiteUrl',
+)
+
+# Named presets accepted in place of field names (?fields=card)
+LISTING_PRESETS = {'card': LISTING_CARD_FIELDS}
+PARTNER_PRESETS = {'card': PARTNER_CARD_FIELDS}
+
+
+class InvalidFieldSelection(ValueError):
+    """Raised when a fields= parameter names an unknown field"""
+    pass
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    presets: Optional[Mapping[str, Sequence[str]]] = None
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields= parameter into a projection
+
+    Returns None (whole document) when no fields are requested.
+
+    Raises:
+        InvalidFieldSelection: If a name is neither an allowed field nor a preset
+    """
+    if not fields or not fields.strip():
+        return None
+
+    allowed = set(allowed)
+    presets = presets or {}
+
+    selected: List[str] = []
+    for name in (part.strip() for part in fields.split(',')):
+        if not name or name == 'id':
+            continue
+        if name in presets:
+            expanded = presets[name]
+        elif name in allowed:
+            expanded = (name,)
+        else:
+            raise InvalidFieldSelection(f"Unknown field: {name}")
+
+        for field_path in expanded:
+            if field_path not in selected:
+                selected.append(field_path)
+
+    return selected
+
+
+def merge_fields(fields: Optional[Sequence[str]], *extra: Iterable[str]) -> Optional[List[str]]:
+    """Add fields the server needs itself (cursor, post-filters) to a projection"""
+    if fields is None:
+        return None
+
+    merged = list(fields)
+    for group in extra:
+        for field_path in group:
+            if field_path not in merged:
+                merged.append(field_path)
+    return merged
+
+
+def apply_projection(query, fields: Optional[Sequence[str]]):
+    """Restrict a Firestore query to the given fields (None leaves it unchanged)"""
+    if fields is None:
+        return query
+    # An empty projection means "all fields" to Firestore - ask for the name only
+    return query.select(list(fields) or [DOCUMENT_ID_FIELD])
+
+
+def project(data: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Trim a document dict to the requested fields (plus 'id')"""
+    if fields is None:
+        return data
+
+    projected = {field_path: data[field_path] for field_path in fields if field_path in data}
+    if 'id' in data:
+        projected['id'] = data['id']
+    return projected
@@ -0,0 +1,225 @@
+"""
+Firestore Query Planner
+Turns simple filter predicates into the best query the deployed indexes allow
+
+Firestore rules the planner works within:
+- Any set of equality filters can be served by merging single-field indexes
+- Equality filters + a range filter (or a custom sort) need a composite
+  index whose leading fields are exactly the equality fields, followed by
+  the range field, and the query must sort by the index's remaining fields
+- Only one field may carry range filters (<, <=, >, >=)
+
+Everything the chosen plan cannot push down becomes a post-filter that is
+evaluated in Python on the returned documents.
+
+Composite indexes are read from firestore.indexes.json (repo root), so the
+planner never produces a query that needs an index we have not deployed.
+
+Usage:
+    planner = get_query_planner()
+    plan = planner.plan('listings', [
+        Predicate('status', '==', 'approved'),
+        Predicate('price', '>=', 50),
+        Predicate('price', '<=', 200),
+    ])
+    query = plan.apply(db.collection('listings'))
+    # ...run query with plan.order_by, keep docs where plan.matches(doc)
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EQUALITY_OPS = ('==',)
+RANGE_OPS = ('<', '<=', '>', '>=')
+ARRAY_OPS = ('array_contains',)
+
+# Relative value of pushing a predicate down (equality filters are usually far
+# more selective than a price/rating range)
+EQUALITY_WEIGHT = 2
+RANGE_FIELD_WEIGHT = 1
+
+DEFAULT_INDEXES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'firestore.indexes.json'
+)
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """Single filter: field <op> value"""
+    field: str
+    op: str
+    value: Any
+
+    def matches(self, doc: Dict[str, Any]) -> bool:
+        """Evaluate the predicate against a document dict (post-filtering)"""
+        actual = doc.get(self.field)
+
+        if self.op == '==':
+            return actual == self.value
+        if self.op == 'array_contains':
+            return isinstance(actual, list) and self.value in actual
+        if actual is None:
+            return False
+
+        try:
+            if self.op == '<':
+                return actual < self.value
+            if self.op == '<=':
+                return actual <= self.value
+            if self.op == '>':
+                return actual > self.value
+            if self.op == '>=':
+                return actual >= self.value
+        except TypeError:
+            return False
+
+        raise ValueError(f"Unsupported operator: {self.op}")
+
+
+@dataclass(frozen=True)
+class CompositeIndex:
+    """Composite index definition from firestore.indexes.json"""
+    collection: str
+    fields: Tuple[Tuple[str, str], ...]
+
+    def describe(self) -> str:
+        return f"{self.collection}(" + ", ".join(
+            f"{name} {'desc' if order == 'DESCENDING' else 'asc'}" for name, order in self.fields
+        ) + ")"
+
+
+@dataclass
+class QueryPlan:
+    """Chosen execution plan for a filtered query"""
+    collection: str
+    pushed: List[Predicate] = field(default_factory=list)
+    post_filters: List[Predicate] = field(default_factory=list)
+    order_by: List[Tuple[str, str]] = field(default_factory=list)
+    index: Optional[CompositeIndex] = None
+
+    def apply(self, query):
+        """Add the pushed-down filters to a Firestore query"""
+        for predicate in self.pushed:
+            query = query.where(predicate.field, predicate.op, predicate.value)
+        return query
+
+    def matches(self, doc: Dict[str, Any]) -> bool:
+        """Check the predicates Firestore could not evaluate"""
+        return all(predicate.matches(doc) for predicate in self.post_filters)
+
+    def describe(self) -> str:
+        """Human-readable summary for logs"""
+        pushed = ", ".join(f"{p.field} {p.op} {p.value!r}" for p in self.pushed) or "none"
+        post = ", ".join(f"{p.field} {p.op} {p.value!r}" for p in self.post_filters) or "none"
+        index = self.index.describe() if self.index else "single-field indexes"
+        return f"pushed=[{pushed}] post=[{post}] index={index}"
+
+
+class QueryPlanner:
+    """
+    Chooses how to split predicates between Firestore and Python
+
+    Candidate plans:
+    1. All equality filters, served by single-field index merging
+    2. For each composite index: an equality prefix of the query, optionally
+       followed by a range filter on the next index field
+
+    The plan with the highest pushdown score wins; ties prefer the plan with
+    the fewest sort fields (plain single-field merges first), so an index is
+    only used when it actually lets Firestore evaluate more predicates.
+    """
+
+    def __init__(self, indexes: Optional[List[CompositeIndex]] = None):
+        self.indexes = indexes or []
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_INDEXES_PATH) -> 'QueryPlanner':
+        """Load composite indexes from a firestore.indexes.json file"""
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load Firestore indexes from {path}: {e} - planning with single-field indexes only")
+            return cls([])
+
+        indexes = []
+        for entry in config.get('indexes', []):
+            if entry.get('queryScope', 'COLLECTION') != 'COLLECTION':
+                continue
+            fields = tuple(
+                (f['fieldPath'], f['order'])
+                for f in entry.get('fields', [])
+                if 'order' in f
+            )
+            if len(fields) == len(entry.get('fields', [])):
+                indexes.append(CompositeIndex(entry['collectionGroup'], fields))
+
+        logger.info(f"✓ QueryPlanner loaded {len(indexes)} composite indexes")
+        return cls(indexes)
+
+    def plan(self, collection: str, predicates: List[Predicate]) -> QueryPlan:
+        """Pick the best plan for the given predicates"""
+        equalities = {p.field: p for p in predicates if p.op in EQUALITY_OPS}
+        ranges: Dict[str, List[Predicate]] = {}
+        for p in predicates:
+            if p.op in RANGE_OPS:
+                ranges.setdefault(p.field, []).append(p)
+        arrays = [p for p in predicates if p.op in ARRAY_OPS]
+
+        # Plan 1: equality-only via single-field index merge (always valid)
+        pushed = list(equalities.values()) + arrays[:1]
+        candidates = [QueryPlan(collection, pushed=pushed)]
+
+        # Plan 2: composite index prefixes
+        for index in self.indexes:
+            if index.collection != collection:
+                continue
+            for k, (field_name, _) in enumerate(index.fields):
+                prefix = [name for name, _ in index.fields[:k]]
+                if not all(name in equalities for name in prefix):
+                    break
+
+                pushed_eq = [equalities[name] for name in prefix]
+
+                # Equality prefix + range on the next index field
+                if field_name in ranges:
+                    pushed = pushed_eq + ranges[field_name]
+                    candidates.append(
+                        QueryPlan(collection, pushed=pushed, order_by=list(index.fields[k:]), index=index)
+                    )
+
+                # Equality prefix covering every equality filter, sorted by the rest
+                if k > 0 and len(prefix) == len(equalities):
+                    candidates.append(
+                        QueryPlan(collection, pushed=pushed_eq, order_by=list(index.fields[k:]), index=index)
+                    )
+
+        best = max(candidates, key=lambda plan: (self._score(plan.pushed), -len(plan.order_by)))
+        best.post_filters = [p for p in predicates if p not in best.pushed]
+
+        logger.debug(f"Query plan for {collection}: {best.describe()}")
+        return best
+
+    def _score(self, pushed: List[Predicate]) -> int:
+        equality_count = sum(1 for p in pushed if p.op in EQUALITY_OPS + ARRAY_OPS)
+        range_fields = {p.field for p in pushed if p.op in RANGE_OPS}
+        return equality_count * EQUALITY_WEIGHT + len(range_fields) * RANGE_FIELD_WEIGHT
+
+
+# Singleton instance
+_planner_instance: Optional[QueryPlanner] = None
+
+
+def get_query_planner() -> QueryPlanner:
+    """Get or create the planner (indexes loaded once per process)"""
+    global _planner_instance
+    if _planner_instance is None:
+        path = os.getenv('FIRESTORE_INDEXES_PATH', DEFAULT_INDEXES_PATH)
+        _planner_instance = QueryPlanner.from_file(path)
+    return _planner_instance
@@ -8,6 +8,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from .models import Listing, UserPreferences, Booking, AvailabilityCheck, SearchFilters
+from .pagination import Page, DEFAULT_PAGE_SIZE
 
 
 class DataRepository(ABC):
@@ -58,6 +59,29 @@ class DataRepository(ABC):
         """
         pass
     
+    @abstractmethod
+    async def get_listings_page(
+        self,
+        filters: SearchFilters,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of listings with cursor pagination (real-time)
+        
+        Args:
+            filters: Search filters
+            page_size: Maximum listings per page
+            page_token: Opaque token from the previous page (None for first page)
+            
+        Returns:
+            Page of listings with next_page_token (None on the last page)
+            
+        Raises:
+            InvalidPageToken: If page_token is malformed
+        """
+        pass
+    
     @abstractmethod
     async def search_listings_semantic(
         self,
@@ -244,3 +268,14 @@ class DataRepository(ABC):
             True if healthy, False otherwise
         """
         return True
+    
+    def supports_range_reuse(self, filters: SearchFilters) -> bool:
+        """
+        Whether get_listings(filters, limit, offset) returns rows
+        [offset, offset + limit) of one fixed result order
+        
+        If True, a cached result for a larger range can answer any range it
+        contains. Defaults to False (results filtered after the limit is
+        applied are not prefix-stable).
+        """
+        return False
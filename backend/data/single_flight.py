@@ -0,0 +1,52 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one upstream fetch
+
+Why:
+- When a hot cache entry expires, every concurrent request misses at once
+  and each one hits Firestore (a cache stampede)
+- With single-flight the first caller fetches, the rest await its result
+
+The fetch runs as its own task, so a cancelled caller (client disconnect)
+never cancels the fetch the other callers are waiting on. Errors are
+shared too - every waiter sees the same exception, and nothing is cached.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Per-key in-flight deduplication for async loaders"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        """Number of keys currently being fetched"""
+        return len(self._inflight)
+
+    def __contains__(self, key: str) -> bool:
+        """True if a fetch for key is in flight"""
+        return key in self._inflight
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run loader() for key, or join the fetch already in flight"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(loader())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
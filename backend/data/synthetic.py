@@ -0,0 +1,272 @@
+"""
+Synthetic Data Generator
+Seeded, realistic-looking SkyConnect data for offline benchmarks
+
+Scales (number of listings; other collections scale with it):
+    1k    ->     1,000 listings,    20 partners,    100 travelers,     2,000 bookings
+    100k  ->   100,000 listings, 2,000 partners, 10,000 travelers,   200,000 bookings
+    1m    -> 1,000,000 listings, 20,000 partners, 100,000 travelers, 2,000,000 bookings
+
+Realism that matters for performance work:
+- Listing popularity is Zipf-distributed, so bookings, saved items and
+  benchmark request streams have hot keys (cache hit rates look like prod)
+- Categories, locations, tags and amenities use the app's vocabularies
+- Booking dates overlap, so availability checks find real conflicts
+
+The same seed always produces the same dataset.
+
+Usage:
+    dataset = generate_dataset('100k', seed=42)
+    repo = InMemoryRepository.from_dataset(dataset)
+"""
+
+import random
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+from .models import Listing, UserPreferences, Booking, ListingStatus, BookingStatus
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# Collection sizes relative to the number of listings
+LISTINGS_PER_PARTNER = 50
+LISTINGS_PER_TRAVELER = 10
+BOOKINGS_PER_LISTING = 2
+
+# Zipf exponent for listing popularity
+POPULARITY_SKEW = 1.1
+
+DEFAULT_SEED = 42
+
+# Fixed reference point so datasets don't depend on the current date
+EPOCH = datetime(2026, 1, 1)
+
+CATEGORIES = ['tour', 'accommodation', 'transport', 'activity']
+
+LOCATIONS = [
+    'Colombo', 'Kandy', 'Galle', 'Ella', 'Sigiriya', 'Nuwara Eliya', 'Mirissa',
+    'Bentota', 'Trincomalee', 'Jaffna', 'Anuradhapura', 'Polonnaruwa', 'Dambulla',
+    'Arugam Bay', 'Negombo', 'Hikkaduwa', 'Unawatuna', 'Yala', 'Haputale', 'Kalpitiya',
+]
+
+TAGS = [
+    'Beach', 'Adventure', 'Cultural', 'Wildlife', 'Hiking', 'Surfing', 'Tea',
+    'History', 'Food', 'Family', 'Luxury', 'Budget', 'Romantic', 'Photography',
+]
+
+AMENITIES = [
+    'wifi', 'pool', 'parking', 'breakfast', 'air_conditioning', 'guide',
+    'transport', 'spa', 'gym', 'kitchen', 'pet_friendly', 'airport_pickup',
+]
+
+# (low, high) price range per category
+PRICE_RANGES = {
+    'tour': (20, 400),
+    'accommodation': (15, 800),
+    'transport': (5, 150),
+    'activity': (10, 250),
+}
+
+LISTING_STATUS_WEIGHTS = [
+    (ListingStatus.APPROVED.value, 0.85),
+    (ListingStatus.PENDING.value, 0.10),
+    (ListingStatus.REJECTED.value, 0.05),
+]
+
+BOOKING_STATUS_WEIGHTS = [
+    (BookingStatus.CONFIRMED.value, 0.55),
+    (BookingStatus.PENDING.value, 0.20),
+    (BookingStatus.COMPLETED.value, 0.15),
+    (BookingStatus.CANCELLED.value, 0.10),
+]
+
+ADJECTIVES = ['Scenic', 'Cozy', 'Hidden', 'Classic', 'Sunset', 'Private', 'Guided', 'Boutique']
+
+
+@dataclass
+class SyntheticDataset:
+    """Everything a repository needs, plus the popularity model used to build it"""
+    seed: int
+    listings: List[Listing] = field(default_factory=list)
+    partners: List[Dict[str, Any]] = field(default_factory=list)
+    preferences: List[UserPreferences] = field(default_factory=list)
+    bookings: List[Booking] = field(default_factory=list)
+    saved_listings: Dict[str, List[str]] = field(default_factory=dict)
+    popularity: List[float] = field(default_factory=list)  # cumulative weights by listing index
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'listings': len(self.listings),
+            'partners': len(self.partners),
+            'travelers': len(self.preferences),
+            'bookings': len(self.bookings),
+            'saved_listings': sum(len(ids) for ids in self.saved_listings.values()),
+        }
+
+    def sample_listing_ids(self, count: int, seed: int = DEFAULT_SEED) -> List[str]:
+        """Popularity-weighted listing IDs, e.g. for benchmark request streams"""
+        rng = random.Random(seed)
+        return [self.listings[i].id for i in _weighted_indexes(rng, self.popularity, count)]
+
+
+def resolve_scale(scale) -> int:
+    """'1k' / '100k' / '1m' or a plain number of listings"""
+    if isinstance(scale, int):
+        return scale
+    key = str(scale).lower()
+    if key not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}' (expected one of {', '.join(SCALES)} or an integer)")
+    return SCALES[key]
+
+
+def generate_dataset(scale='1k', seed: int = DEFAULT_SEED) -> SyntheticDataset:
+    """Generate a complete dataset at the given scale"""
+    listing_count = resolve_scale(scale)
+    rng = random.Random(seed)
+
+    dataset = SyntheticDataset(seed=seed)
+    dataset.partners = _generate_partners(rng, max(1, listing_count // LISTINGS_PER_PARTNER))
+    dataset.listings = _generate_listings(rng, listing_count, dataset.partners)
+    dataset.popularity = _popularity_weights(listing_count)
+    dataset.preferences = _generate_preferences(rng, max(1, listing_count // LISTINGS_PER_TRAVELER))
+    dataset.bookings = _generate_bookings(
+        rng, listing_count * BOOKINGS_PER_LISTING, dataset.listings, dataset.preferences, dataset.popularity
+    )
+    dataset.saved_listings = _generate_saved(rng, dataset.listings, dataset.preferences, dataset.popularity)
+    return dataset
+
+
+def _weighted(rng: random.Random, weights: Sequence) -> str:
+    roll = rng.random()
+    cumulative = 0.0
+    for value, weight in weights:
+        cumulative += weight
+        if roll < cumulative:
+            return value
+    return weights[-1][0]
+
+
+def _popularity_weights(count: int) -> List[float]:
+    """Cumulative Zipf weights (listing 0 is the most popular)"""
+    cumulative = []
+    total = 0.0
+    for rank in range(count):
+        total += 1.0 / (rank + 1) ** POPULARITY_SKEW
+        cumulative.append(total)
+    return cumulative
+
+
+def _weighted_indexes(rng: random.Random, cumulative: List[float], count: int) -> List[int]:
+    total = cumulative[-1]
+    last = len(cumulative) - 1
+    return [min(bisect_left(cumulative, rng.random() * total), last) for _ in range(count)]
+
+
+def _generate_partners(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    partners = []
+    for i in range(count):
+        partners.append({
+            'userId': f"partner_{i:06d}",
+            'businessName': f"{rng.choice(ADJECTIVES)} {rng.choice(LOCATIONS)} {rng.choice(['Tours', 'Stays', 'Travels', 'Adventures'])}",
+            'businessCategory': rng.choice(CATEGORIES),
+            'businessAddress': rng.choice(LOCATIONS),
+            'description': 'Local travel business',
+            'status': 'approved' if rng.random() < 0.9 else 'pending',
+            'createdAt': EPOCH - timedelta(days=rng.randint(0, 730)),
+        })
+    return partners
+
+
+def _generate_listings(rng: random.Random, count: int, partners: List[Dict[str, Any]]) -> List[Listing]:
+    listings = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        location = rng.choice(LOCATIONS)
+        low, high = PRICE_RANGES[category]
+        # Skew prices towards the cheap end like real inventory
+        price = round(low + (high - low) * rng.random() ** 2, 2)
+        created_at = EPOCH - timedelta(days=rng.randint(0, 730))
+
+        listings.append(Listing(
+            id=f"listing_{i:07d}",
+            title=f"{rng.choice(ADJECTIVES)} {category} in {location}",
+            description=f"A {category} experience in {location}. " * rng.randint(2, 8),
+            location=location,
+            price=price,
+            category=category,
+            partner_id=rng.choice(partners)['userId'],
+            status=_weighted(rng, LISTING_STATUS_WEIGHTS),
+            available=rng.random() < 0.95,
+            tags=rng.sample(TAGS, rng.randint(1, 4)),
+            amenities=rng.sample(AMENITIES, rng.randint(0, 6)),
+            images=[f"https://img.example.com/{i}/{n}.jpg" for n in range(rng.randint(1, 8))],
+            rating=round(rng.uniform(3.0, 5.0), 1),
+            review_count=rng.randint(0, 500),
+            capacity=rng.randint(1, 12),
+            created_at=created_at,
+            updated_at=created_at + timedelta(days=rng.randint(0, 60)),
+        ))
+    return listings
+
+
+def _generate_preferences(rng: random.Random, count: int) -> List[UserPreferences]:
+    preferences = []
+    for i in range(count):
+        budget_min = rng.choice([0, 20, 50, 100])
+        preferences.append(UserPreferences(
+            user_id=f"traveler_{i:06d}",
+            interests=rng.sample(TAGS, rng.randint(1, 4)),
+            preferred_locations=rng.sample(LOCATIONS, rng.randint(0, 3)),
+            budget_min=float(budget_min),
+            budget_max=float(budget_min + rng.choice([100, 250, 500, 1000])),
+            preferred_amenities=rng.sample(AMENITIES, rng.randint(0, 3)),
+        ))
+    return preferences
+
+
+def _generate_bookings(
+    rng: random.Random,
+    count: int,
+    listings: List[Listing],
+    travelers: List[UserPreferences],
+    popularity: List[float]
+) -> List[Booking]:
+    bookings = []
+    for i, index in enumerate(_weighted_indexes(rng, popularity, count)):
+        listing = listings[index]
+        start = EPOCH + timedelta(days=rng.randint(-180, 180))
+        nights = rng.randint(1, 7)
+        guests = rng.randint(1, max(1, listing.capacity))
+        created_at = start - timedelta(days=rng.randint(1, 90))
+
+        bookings.append(Booking(
+            id=f"booking_{i:07d}",
+            listing_id=listing.id,
+            user_id=rng.choice(travelers).user_id,
+            start_date=start,
+            end_date=start + timedelta(days=nights),
+            status=_weighted(rng, BOOKING_STATUS_WEIGHTS),
+            total_price=round(listing.price * nights, 2),
+            guests=guests,
+            created_at=created_at,
+        ))
+    return bookings
+
+
+def _generate_saved(
+    rng: random.Random,
+    listings: List[Listing],
+    travelers: List[UserPreferences],
+    popularity: List[float]
+) -> Dict[str, List[str]]:
+    saved = {}
+    for traveler in travelers:
+        indexes = _weighted_indexes(rng, popularity, rng.randint(0, 10))
+        saved[traveler.user_id] = list(dict.fromkeys(listings[i].id for i in indexes))
+    return saved
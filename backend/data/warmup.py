@@ -0,0 +1,202 @@
+"""
+Startup Cache Warm-Up
+Preloads CachedRepository so the first requests after a deploy hit cache
+
+Why:
+- After a restart every cache is empty and the first minutes of traffic
+  all go to Firestore with cold-start latency
+
+What is preloaded (the WarmupPlan):
+- the top-N approved listings by popularity (reviewCount)
+- the default browse searches: unfiltered, and one per category among
+  the popular listings
+- preferences of the most recently active travelers (updatedAt)
+
+Loads run concurrently behind a semaphore. startup waits at most
+`deadline` seconds; anything left keeps loading in the background, so
+readiness is never blocked. Progress is kept in a WarmupReport, shown on
+the health endpoint.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.firebase_admin import run_blocking
+from .models import SearchFilters
+from .pagination import DESCENDING
+from .projection import apply_projection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_LISTINGS = 200
+DEFAULT_RECENT_USERS = 100
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DEADLINE = 10.0
+LISTING_CHUNK = 100
+
+# The travel assistant searches with get_listings' default limit
+ASSISTANT_SEARCH_LIMIT = 10
+
+
+@dataclass
+class WarmupPlan:
+    """What to preload"""
+    listing_ids: List[str] = field(default_factory=list)
+    searches: List[SearchFilters] = field(default_factory=list)
+    user_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class WarmupReport:
+    """Warm-up progress, per kind of entry"""
+    planned: Dict[str, int] = field(default_factory=lambda: {'listings': 0, 'searches': 0, 'preferences': 0})
+    loaded: Dict[str, int] = field(default_factory=lambda: {'listings': 0, 'searches': 0, 'preferences': 0})
+    errors: int = 0
+    state: str = "pending"  # pending / running / complete / failed
+    deadline_exceeded: bool = False  # startup stopped waiting; loading continued
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+
+    @property
+    def coverage(self) -> float:
+        planned = sum(self.planned.values())
+        return sum(self.loaded.values()) / planned if planned else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'coverage': round(self.coverage, 4),
+            'planned': dict(self.planned),
+            'loaded': dict(self.loaded),
+            'errors': self.errors,
+            'deadline_exceeded': self.deadline_exceeded,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'duration_ms': self.duration_ms,
+        }
+
+
+def _popularity(data: Dict[str, Any]) -> Tuple[float, float]:
+    return (float(data.get('reviewCount') or 0), float(data.get('rating') or 0))
+
+
+async def build_warmup_plan(
+    db,
+    catalog=None,
+    top_listings: int = DEFAULT_TOP_LISTINGS,
+    recent_users: int = DEFAULT_RECENT_USERS
+) -> WarmupPlan:
+    """
+    Decide what to preload
+
+    Popular listings come from the catalog when it is loaded (no reads),
+    otherwise from an id/category-only Firestore query.
+    """
+    if catalog is not None and catalog.ready:
+        popular = sorted(catalog.all(statuses=('approved',)), key=_popularity, reverse=True)[:top_listings]
+    else:
+        query = db.collection('listings')\
+            .where('status', '==', 'approved')\
+            .order_by('reviewCount', direction=DESCENDING)\
+            .limit(top_listings)
+        docs = await run_blocking(apply_projection(query, ['category']).get)
+        popular = [{**(doc.to_dict() or {}), 'id': doc.id} for doc in docs]
+
+    categories = list(dict.fromkeys(data['category'] for data in popular if data.get('category')))
+
+    users_query = db.collection('travelers')\
+        .order_by('updatedAt', direction=DESCENDING)\
+        .limit(recent_users)
+    user_docs = await run_blocking(apply_projection(users_query, []).get)
+
+    return WarmupPlan(
+        listing_ids=[data['id'] for data in popular],
+        searches=[SearchFilters()] + [SearchFilters(category=category) for category in categories],
+        user_ids=[doc.id for doc in user_docs],
+    )
+
+
+async def warm_cache(
+    repository,
+    plan: WarmupPlan,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    report: Optional[WarmupReport] = None
+) -> WarmupReport:
+    """
+    Load every planned entry through the repository (which caches it)
+
+    At most `concurrency` loads run at once. Failures are counted, not
+    raised - warm-up is best effort.
+    """
+    report = report or WarmupReport()
+    report.state = "running"
+    report.started_at = datetime.utcnow()
+    started = time.perf_counter()
+
+    chunks = [plan.listing_ids[i:i + LISTING_CHUNK] for i in range(0, len(plan.listing_ids), LISTING_CHUNK)]
+    report.planned = {
+        'listings': len(plan.listing_ids),
+        'searches': len(plan.searches),
+        'preferences': len(plan.user_ids),
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(kind: str, load, count: int = 1):
+        async with semaphore:
+            try:
+                await load()
+                report.loaded[kind] += count
+            except Exception as e:
+                report.errors += 1
+                logger.debug(f"Warm-up {kind} load failed: {e}")
+
+    await asyncio.gather(
+        *[run('listings', lambda chunk=chunk: repository.get_listings_batch(chunk), len(chunk)) for chunk in chunks],
+        *[run('searches', lambda filters=filters: repository.get_listings(filters, limit=ASSISTANT_SEARCH_LIMIT))
+          for filters in plan.searches],
+        *[run('preferences', lambda user_id=user_id: repository.get_user_preferences(user_id)) for user_id in plan.user_ids],
+    )
+
+    report.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    report.state = "complete"
+    return report
+
+
+async def start_warmup(
+    repository,
+    db,
+    catalog=None,
+    deadline: float = DEFAULT_DEADLINE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    top_listings: int = DEFAULT_TOP_LISTINGS,
+    recent_users: int = DEFAULT_RECENT_USERS
+) -> Tuple[WarmupReport, Optional[asyncio.Task]]:
+    """
+    Plan and run the warm-up, waiting at most `deadline` seconds
+
+    Returns:
+        (report, task) - task is still running if the deadline passed
+        (the report keeps updating), None if warm-up finished in time
+    """
+    report = WarmupReport()
+
+    async def run():
+        try:
+            plan = await build_warmup_plan(db, catalog, top_listings, recent_users)
+            await warm_cache(repository, plan, concurrency, report)
+            logger.info(f"✓ Cache warm-up complete: {report.coverage:.0%} in {report.duration_ms}ms")
+        except Exception as e:
+            report.state = "failed"
+            logger.warning(f"Cache warm-up failed: {e}")
+
+    task = asyncio.ensure_future(run())
+    done, _ = await asyncio.wait({task}, timeout=deadline)
+    if done:
+        return report, None
+
+    report.deadline_exceeded = True
+    logger.warning(f"Cache warm-up passed its {deadline}s deadline at {report.coverage:.0%} - continuing in background")
+    return report, task
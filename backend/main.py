@@ -24,11 +24,13 @@ To make production-ready: Implement security measures first!
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
+import asyncio
+import functools
 import os
 import logging
 
@@ -40,8 +42,9 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Import configurations
-from config.firebase_admin import initialize_firebase, get_firestore_client
+from config.firebase_admin import initialize_firebase, get_firestore_client, run_blocking
 from services.firestore_service import firestore_service
+from services.ndjson import wants_ndjson, ndjson_response
 
 # Import AI services
 from services.ai.llm_provider import get_llm_provider
@@ -50,7 +53,20 @@ from services.ai.partner_analytics_service import get_analytics_service
 from services.ai.admin_moderation_service import get_moderation_service
 
 # Import data layer
-from data import FirestoreRepository, CachedRepository
+from data import FirestoreRepository, CachedRepository, InvalidPageToken
+from data.catalog import get_listing_catalog
+from data.booking_index import get_booking_index
+from data.l2_cache import get_l2_cache
+from data.cached_repository import CHANGE_DRIVEN_TTLS
+from data.invalidation import CacheInvalidator
+from data.warmup import start_warmup
+from data.bulk_writes import summarize
+from firebase_admin import firestore as firebase_firestore
+from data.pagination import DEFAULT_PAGE_SIZE
+from data.projection import (
+    InvalidFieldSelection, parse_fields,
+    LISTING_FIELDS, LISTING_PRESETS, PARTNER_FIELDS, PARTNER_PRESETS
+)
 
 # Import hybrid AI system
 from services.ai.hybrid.api_endpoint import router as hybrid_ai_router
@@ -97,21 +113,81 @@ async def startup_event():
         # Initialize Firebase
         initialize_firebase()
         
-        # Initialize real-time data repository
+        # Load the in-memory listing replica (kept current by a snapshot listener)
         db = get_firestore_client()
-        base_repo = FirestoreRepository(firestore_db=db)
-        cached_repo = CachedRepository(base_repository=base_repo)
+        catalog = get_listing_catalog()
+        catalog_enabled = os.getenv("LISTING_CATALOG_ENABLED", "true").lower() == "true"
+        if catalog_enabled:
+            await run_blocking(catalog.start, db)
+        
+        # Active booking intervals per listing for availability checks (snapshot listener)
+        booking_index = get_booking_index()
+        if os.getenv("BOOKING_INDEX_ENABLED", "true").lower() == "true":
+            await run_blocking(booking_index.start, db)
+        
+        # Initialize real-time data repository
+        # With change-driven invalidation the caches can hold entries for hours
+        base_repo = FirestoreRepository(
+            firestore_db=db,
+            catalog=catalog,
+            booking_index=booking_index,
+            verify_availability=os.getenv("BOOKING_INDEX_VERIFY", "false").lower() == "true"
+        )
+        change_feed_enabled = os.getenv("CACHE_CHANGE_FEED_ENABLED", "true").lower() == "true"
+        cached_repo = CachedRepository(
+            base_repository=base_repo,
+            l2=get_l2_cache(),
+            ttls=CHANGE_DRIVEN_TTLS if change_feed_enabled else None
+        )
+        await cached_repo.start_invalidation_listener()
+        if change_feed_enabled:
+            app.state.cache_invalidator = CacheInvalidator(cached_repo, catalog=catalog)
+            app.state.cache_invalidator.start(db, asyncio.get_running_loop())
         
         # Initialize travel assistant with repository
         app.state.data_repository = cached_repo
         get_travel_assistant(data_repository=cached_repo)
         
+        # Load the embedding model and open Chroma once, before the first request
+        knowledge_base_error = None
+        knowledge_base_preload = os.getenv("KNOWLEDGE_BASE_PRELOAD", "true").lower() == "true"
+        if knowledge_base_preload:
+            try:
+                from services.ai.embeddings import get_knowledge_base
+                await asyncio.get_running_loop().run_in_executor(None, get_knowledge_base)
+            except Exception as e:
+                knowledge_base_error = str(e)
+        
+        # Preload popular listings, browse searches and active users' preferences;
+        # waits at most CACHE_WARMUP_DEADLINE seconds, the rest loads in the background
+        app.state.cache_warmup = None
+        app.state.cache_warmup_task = None
+        if os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true":
+            app.state.cache_warmup, app.state.cache_warmup_task = await start_warmup(
+                cached_repo, db, catalog=catalog,
+                deadline=float(os.getenv("CACHE_WARMUP_DEADLINE", "10"))
+            )
+        
         print("\n" + "="*60)
         print("🚀 SkyConnect AI Backend [DEMO] - Server Started")
         print("="*60)
         print("✅ Firebase initialized")
         print("✅ Real-time data repository initialized (with caching)")
+        if cached_repo.l2 is not None:
+            print(f"✅ Shared L2 cache enabled ({cached_repo.l2.name})")
+        if change_feed_enabled:
+            print("✅ Change-driven cache invalidation (listings, travelers)")
+        if app.state.cache_warmup is not None:
+            print(f"✅ Cache warm-up: {app.state.cache_warmup.coverage:.0%} loaded ({app.state.cache_warmup.state})")
+        if catalog.ready:
+            print(f"✅ Listing catalog loaded ({len(catalog)} listings, live updates)")
+        if booking_index.ready:
+            print(f"✅ Booking index loaded ({len(booking_index)} active bookings, live updates)")
         print("✅ AI Travel Assistant ready")
+        if knowledge_base_error:
+            print(f"⚠️  Knowledge base not preloaded: {knowledge_base_error}")
+        elif knowledge_base_preload:
+            print("✅ Knowledge base preloaded (embedding model + vector store)")
         print("="*60)
         print("⚠️  WARNING: This is a DEMO version - NOT production ready!")
         print("   Missing: Auth, Rate Limiting, Validation, Testing")
@@ -121,6 +197,21 @@ async def startup_event():
         print(f"❌ Error during startup: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop warm-up, detach Firestore listeners and close the shared cache"""
+    warmup_task = getattr(app.state, "cache_warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    invalidator = getattr(app.state, "cache_invalidator", None)
+    if invalidator is not None:
+        invalidator.stop()
+    get_listing_catalog().stop()
+    get_booking_index().stop()
+    data_repository = getattr(app.state, "data_repository", None)
+    if data_repository is not None:
+        await data_repository.close()
+
 # ============================================================
 # Health Check & Status Endpoints
 # ============================================================
@@ -128,13 +219,16 @@ async def startup_event():
 @app.get("/")
 async def root():
     """Health check endpoint"""
+    cache_warmup = getattr(app.state, "cache_warmup", None)
     return {
         "status": "online",
         "service": "SkyConnect AI Backend",
         "version": "1.0.0-DEMO",
         "warning": "⚠️  DEMO VERSION - Not production ready",
         "documentation": "/docs",
-        "production_status": "/api/production-status"
+        "production_status": "/api/production-status",
+        "cache_warmup": cache_warmup.to_dict() if cache_warmup is not None else None,
+        "booking_index": get_booking_index().stats()
     }
 
 @app.get("/api/production-status")
@@ -176,6 +270,18 @@ async def production_status():
         "estimated_production_ready": "4-8 weeks with proper security implementation"
     }
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Per-cache hits, misses, evictions, bytes and hit ratio of the data repository"""
+    data_repository = getattr(app.state, "data_repository", None)
+    if data_repository is None:
+        raise HTTPException(status_code=503, detail="Data repository not initialized")
+    
+    return {
+        "status": "success",
+        "cache": data_repository._get_cache_stats()
+    }
+
 # Test Firebase connection
 @app.get("/api/test/firebase")
 async def test_firebase():
@@ -196,30 +302,59 @@ async def test_firebase():
 
 @app.get("/api/listings")
 async def get_listings(
+    request: Request,
     category: str = None,
     location: str = None,
     min_price: float = None,
-    max_price: float = None
+    max_price: float = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """Get all listings with optional filters"""
+    """
+    Get approved listings with optional filters (cursor paginated)
+    
+    Filters run as an indexed Firestore query (see data/query_planner.py);
+    only predicates the deployed indexes cannot serve are applied in Python.
+    Pass `next_page_token` from the response as `page_token` to fetch the next page.
+    
+    `fields` is a comma-separated sparse fieldset (e.g. `title,price` or the
+    `card` preset); only those fields are read from Firestore. `id` is always included.
+    
+    With `Accept: application/x-ndjson` every matching listing is streamed
+    as one JSON object per line (no paging).
+    """
     try:
-        listings = await firestore_service.get_all_listings()
+        selected_fields = parse_fields(fields, LISTING_FIELDS, LISTING_PRESETS)
         
-        # Apply filters
-        if category:
-            listings = [l for l in listings if l.get("category") == category]
-        if location:
-            listings = [l for l in listings if l.get("location") == location]
-        if min_price is not None:
-            listings = [l for l in listings if l.get("price", 0) >= min_price]
-        if max_price is not None:
-            listings = [l for l in listings if l.get("price", 0) <= max_price]
+        if wants_ndjson(request):
+            return ndjson_response(firestore_service.stream_listings(
+                category=category,
+                location=location,
+                min_price=min_price,
+                max_price=max_price,
+                fields=selected_fields
+            ))
+        
+        page = await firestore_service.search_listings_page(
+            category=category,
+            location=location,
+            min_price=min_price,
+            max_price=max_price,
+            page_size=page_size,
+            page_token=page_token,
+            fields=selected_fields
+        )
+        listings = page.items
         
         return {
             "status": "success",
             "count": len(listings),
-            "listings": listings
+            "listings": listings,
+            "next_page_token": page.next_page_token
         }
+    except (InvalidPageToken, InvalidFieldSelection) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -244,28 +379,134 @@ async def get_listing(listing_id: str):
 # ============================================================
 
 @app.get("/api/partners")
-async def get_partners():
-    """Get all partner profiles"""
+async def get_partners(
+    request: Request,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Get approved partner profiles (cursor paginated)
+    
+    `fields` is a comma-separated sparse fieldset (e.g. `businessName,logo`
+    or the `card` preset). `id` is always included.
+    
+    With `Accept: application/x-ndjson` all partners are streamed as NDJSON.
+    """
     try:
-        partners = await firestore_service.get_all_partners()
+        selected_fields = parse_fields(fields, PARTNER_FIELDS, PARTNER_PRESETS)
+        
+        if wants_ndjson(request):
+            return ndjson_response(firestore_service.stream_partners(
+                status="approved",
+                fields=selected_fields
+            ))
+        
+        page = await firestore_service.get_partners_page(
+            status="approved",
+            page_size=page_size,
+            page_token=page_token,
+            fields=selected_fields
+        )
         return {
             "status": "success",
-            "count": len(partners),
-            "partners": partners
+            "count": len(page.items),
+            "partners": page.items,
+            "next_page_token": page.next_page_token
         }
+    except (InvalidPageToken, InvalidFieldSelection) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/partners/{partner_id}/listings")
-async def get_partner_listings(partner_id: str):
-    """Get all listings for a specific partner"""
+async def get_partner_listings(
+    request: Request,
+    partner_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None
+):
+    """
+    Get listings for a specific partner (cursor paginated)
+    
+    With `Accept: application/x-ndjson` all of the partner's listings are streamed as NDJSON.
+    """
     try:
-        listings = await firestore_service.get_partner_listings(partner_id)
+        if wants_ndjson(request):
+            return ndjson_response(firestore_service.stream_partner_listings(partner_id))
+        
+        page = await firestore_service.get_partner_listings_page(
+            partner_id,
+            page_size=page_size,
+            page_token=page_token
+        )
         return {
             "status": "success",
-            "count": len(listings),
-            "listings": listings
+            "count": len(page.items),
+            "listings": page.items,
+            "next_page_token": page.next_page_token
         }
+    except InvalidPageToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================================
+# Booking & Review Endpoints
+# ============================================================
+
+@app.get("/api/users/{user_id}/bookings")
+async def get_user_bookings(
+    user_id: str,
+    role: str = "traveler",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    """Get bookings for a traveler or partner (cursor paginated, own bookings or admin)"""
+    if user.get('user_id') != user_id and user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Access denied. You can only view your own bookings")
+    if role not in ("traveler", "partner"):
+        raise HTTPException(status_code=400, detail="role must be 'traveler' or 'partner'")
+    try:
+        page = await firestore_service.get_user_bookings_page(
+            user_id,
+            role=role,
+            page_size=page_size,
+            page_token=page_token
+        )
+        return {
+            "status": "success",
+            "count": len(page.items),
+            "bookings": page.items,
+            "next_page_token": page.next_page_token
+        }
+    except InvalidPageToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/listings/{listing_id}/reviews")
+async def get_listing_reviews(
+    listing_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None
+):
+    """Get reviews for a listing (cursor paginated)"""
+    try:
+        page = await firestore_service.get_reviews_page(
+            listing_id=listing_id,
+            page_size=page_size,
+            page_token=page_token
+        )
+        return {
+            "status": "success",
+            "count": len(page.items),
+            "reviews": page.items,
+            "next_page_token": page.next_page_token
+        }
+    except InvalidPageToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -343,14 +584,18 @@ async def semantic_search(request: SearchRequest):
     ⚠️  WARNING: No authentication - anyone can search!
     """
     try:
-        from services.ai.embeddings import KnowledgeBaseTrainer
+        from services.ai.embeddings import get_knowledge_base
         
-        trainer = KnowledgeBaseTrainer()
-        results = trainer.search(
+        # Shared instance: its semantic cache reuses results of near-identical queries.
+        # Loading the model and encoding the query are CPU-bound - keep them off the event loop
+        loop = asyncio.get_running_loop()
+        trainer = await loop.run_in_executor(None, get_knowledge_base)
+        results = await loop.run_in_executor(None, functools.partial(
+            trainer.search,
             query=request.query,
             k=request.limit,
-            collection_name="listings"
-        )
+            filter_type="listing"
+        ))
         
         return {
             "status": "success",
@@ -362,6 +607,32 @@ async def semantic_search(request: SearchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
+@app.get("/api/search/semantic/cache")
+async def semantic_cache_stats():
+    """Hit ratio and measured false hits of the semantic search result cache"""
+    from services.ai import embeddings
+    
+    if embeddings.knowledge_base is None:
+        raise HTTPException(status_code=503, detail="Knowledge base not loaded")
+    
+    return {
+        "status": "success",
+        "semantic_cache": embeddings.knowledge_base.semantic_cache.stats()
+    }
+
+@app.get("/api/knowledge-base/status")
+async def knowledge_base_status():
+    """Embedding model load time, memory and index size (does not trigger a load)"""
+    from services.ai import embeddings
+    
+    if embeddings.knowledge_base is None:
+        return {"status": "success", "knowledge_base": {"loaded": False}}
+    
+    return {
+        "status": "success",
+        "knowledge_base": embeddings.knowledge_base.status()
+    }
+
 @app.post("/api/recommend")
 async def get_recommendations(request: RecommendRequest):
     """
@@ -370,7 +641,7 @@ async def get_recommendations(request: RecommendRequest):
     ⚠️  WARNING: No user verification - anyone can access any user's data!
     """
     try:
-        from services.ai.embeddings import KnowledgeBaseTrainer
+        from services.ai.embeddings import get_knowledge_base
         
         # Get user preferences
         user_profile = await firestore_service.get_traveler_profile(request.user_id)
@@ -382,13 +653,15 @@ async def get_recommendations(request: RecommendRequest):
         preferences = request.preferences or user_profile.get("preferences", {})
         query = f"I like {preferences.get('interests', [])} in {preferences.get('preferredDestinations', [])}"
         
-        # Search using embeddings
-        trainer = KnowledgeBaseTrainer()
-        results = trainer.search(
+        # Search using embeddings (off the event loop, like /api/search/semantic)
+        loop = asyncio.get_running_loop()
+        trainer = await loop.run_in_executor(None, get_knowledge_base)
+        results = await loop.run_in_executor(None, functools.partial(
+            trainer.search,
             query=query,
             k=request.limit,
-            collection_name="listings"
-        )
+            filter_type="listing"
+        ))
         
         return {
             "status": "success",
@@ -412,9 +685,9 @@ async def train_knowledge_base():
     Anyone can trigger expensive embedding operations!
     """
     try:
-        from services.ai.embeddings import KnowledgeBaseTrainer
+        from services.ai.embeddings import get_knowledge_base
         
-        trainer = KnowledgeBaseTrainer()
+        trainer = await asyncio.get_running_loop().run_in_executor(None, get_knowledge_base)
         
         # Train on latest data
         listings_count = await trainer.train_listings()
@@ -455,6 +728,18 @@ class ModerationRequest(BaseModel):
     subject_id: str  # partner_id or listing_id
     subject_type: str  # "partner" or "listing"
 
+class BulkModerationRequest(BaseModel):
+    """Bulk approve/reject/update request"""
+    subject_type: str  # "partner" or "listing"
+    action: str  # "approve", "reject" or "update"
+    subject_ids: List[str]
+    reason: Optional[str] = None  # reject only
+    updates: Optional[Dict[str, Any]] = None  # update only, MODERATION_FIELDS
+
+# Fields the bulk "update" action may set - anything else (price, partnerId,
+# rating, ...) is edited through the owning endpoints, one document at a time
+MODERATION_FIELDS = ("status", "rejectionReason", "moderationNotes", "flagged", "flagReason")
+
 @app.post("/api/ai/travel-assistant")
 async def travel_assistant_chat(request: TravelAssistantRequest):
     """
@@ -571,6 +856,58 @@ async def moderate_content(request: ModerationRequest):
         logger.error(f"Moderation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/admin/bulk-moderation")
+async def bulk_moderation(
+    request: BulkModerationRequest,
+    user: dict = Depends(require_role("admin"))
+):
+    """
+    Approve, reject or update many partners/listings in one call
+    
+    Writes go through Firestore's BulkWriter (parallel batches, retries on
+    transient errors). The response has one result per subject ID.
+    """
+    collections = {"partner": "partners", "listing": "listings"}
+    if request.subject_type not in collections:
+        raise HTTPException(status_code=400, detail="subject_type must be 'partner' or 'listing'")
+    if not request.subject_ids:
+        raise HTTPException(status_code=400, detail="subject_ids must not be empty")
+    
+    now = firebase_firestore.SERVER_TIMESTAMP
+    if request.action == "approve":
+        data = {"status": "approved", "approvedAt": now, "approvedBy": user["user_id"], "updatedAt": now}
+    elif request.action == "reject":
+        data = {"status": "rejected", "rejectionReason": request.reason or "", "updatedAt": now}
+    elif request.action == "update":
+        if not request.updates:
+            raise HTTPException(status_code=400, detail="updates is required for action 'update'")
+        disallowed = sorted(set(request.updates) - set(MODERATION_FIELDS))
+        if disallowed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"updates may only set {', '.join(MODERATION_FIELDS)} (got {', '.join(disallowed)})"
+            )
+        data = {**request.updates, "updatedAt": now}
+    else:
+        raise HTTPException(status_code=400, detail="action must be 'approve', 'reject' or 'update'")
+    
+    try:
+        results = await firestore_service.bulk_update(
+            collections[request.subject_type],
+            request.subject_ids,
+            data
+        )
+        return {
+            "status": "success",
+            **summarize(results),
+            "results": [result.to_dict() for result in results]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Bulk moderation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/ai/llm-status")
 async def get_llm_status():
     """
@@ -3,6 +3,8 @@ LangChain Tools for AI Agents
 Defines custom tools that agents can use to interact with the system
 """
 
+import asyncio
+import functools
 from typing import Optional, List, Dict, Any
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
@@ -98,8 +100,9 @@ class SearchListingsTool(BaseTool):
             return f"Error searching listings: {str(e)}"
     
     async def _arun(self, *args, **kwargs):
-        """Async version"""
-        return self._run(*args, **kwargs)
+        """Async version (the model load and query encoding run in an executor)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._run, *args, **kwargs))
 
 
 class GetListingDetailsTool(BaseTool):
@@ -192,8 +195,9 @@ class TravelGuideTool(BaseTool):
             return f"Error accessing travel guide: {str(e)}"
     
     async def _arun(self, *args, **kwargs):
-        """Async version"""
-        return self._run(*args, **kwargs)
+        """Async version (the model load and query encoding run in an executor)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._run, *args, **kwargs))
 
 
 class GetUserPreferencesTool(BaseTool):
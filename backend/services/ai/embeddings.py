@@ -1,21 +1,58 @@
 """
 Knowledge Base Embeddings Manager
 Handles ChromaDB vector database operations for semantic search
+
+One instance per process: get_knowledge_base() is the only entry point.
+The server preloads it at startup, so requests never pay for loading the
+embedding model or opening Chroma.
 """
 
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, Callable, List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
-import chromadb
-from chromadb.config import Settings
 
 # Import Firestore service
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from services.firestore_service import firestore_service
+from services.semantic_cache import SemanticCache, DEFAULT_MAX_DISTANCE, DEFAULT_VERIFY_RATE
+from services.index_sync import IndexManifest, IndexedDocument, SyncPlan, LISTING_PREFIX, newest_update
+from services.embedding_cache import get_embedding_cache
+from services.onnx_embeddings import get_onnx_embeddings
+from services.embedding_pipeline import (
+    EmbeddingPipeline, PipelineStats, DEFAULT_BATCH_SIZE, default_workers, iterate_documents
+)
+from data.projection import LISTING_TRAINING_FIELDS, PARTNER_TRAINING_FIELDS
+
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+COLLECTION_NAME = "skyconnect_knowledge"
+# The cache key covers the encode settings, since they change the vectors
+EMBEDDING_CACHE_NAME = f"{EMBEDDING_MODEL_NAME}+normalized"
+LISTING_MANIFEST_FILE = "listing_index_manifest.json"
+PROGRESS_EVERY_BATCHES = 10
+
+
+def _rss_bytes() -> int:
+    """Resident memory of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of search results, so callers never mutate the cached ones"""
+    return [{**result, 'metadata': dict(result['metadata'])} for result in results]
 
 
 class KnowledgeBaseTrainer:
@@ -25,38 +62,125 @@ class KnowledgeBaseTrainer:
         """
         Initialize the knowledge base trainer
         
+        Use get_knowledge_base() instead - each instance loads the
+        embedding model (seconds, hundreds of MB).
+        
         Args:
             persist_directory: Directory to persist ChromaDB data
         """
         self.persist_directory = persist_directory
+        rss_before = _rss_bytes()
         
-        # Use free Hugging Face embeddings (no API key needed)
+        # Use free Hugging Face embeddings (no API key needed);
+        # EMBEDDING_BACKEND=onnx runs the quantized export instead of PyTorch
         print("📦 Loading embedding model...")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        print("✅ Embedding model loaded")
-        
-        # Initialize ChromaDB client
-        self.chroma_client = chromadb.Client(Settings(
-            persist_directory=persist_directory,
-            anonymized_telemetry=False
-        ))
+        started = time.perf_counter()
+        self.embeddings = get_onnx_embeddings(EMBEDDING_MODEL_NAME)
+        self.embedding_backend = self.embeddings.variant if self.embeddings else 'torch'
+        if self.embeddings is None:
+            self.embeddings = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL_NAME,
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            )
+        model_load_ms = (time.perf_counter() - started) * 1000
+        print(f"✅ Embedding model loaded ({self.embedding_backend}, {model_load_ms:.0f}ms)")
         
         # Initialize vector store
+        started = time.perf_counter()
         self.vectorstore = Chroma(
-            collection_name="skyconnect_knowledge",
+            collection_name=COLLECTION_NAME,
             embedding_function=self.embeddings,
             persist_directory=persist_directory
         )
+        vectorstore_open_ms = (time.perf_counter() - started) * 1000
         
         self.last_sync = None
+        self.load_stats = {
+            'model_load_ms': round(model_load_ms, 1),
+            'vectorstore_open_ms': round(vectorstore_open_ms, 1),
+            'memory_delta_mb': round((_rss_bytes() - rss_before) / (1024 * 1024), 1),
+            'loaded_at': datetime.now().isoformat(),
+        }
+        
+        # Reindexing: batch size and CPU workers of the embedding pipeline
+        self.embedding_batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        self.embedding_workers = int(os.getenv('EMBEDDING_WORKERS', 0)) or default_workers()
+        self._embed_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Texts embedded before (by any run) are not encoded again
+        cache_name = EMBEDDING_CACHE_NAME if self.embedding_backend == 'torch' else f"{EMBEDDING_CACHE_NAME}+{self.embedding_backend}"
+        self.embedding_cache = get_embedding_cache(cache_name)
+        
+        # Results of near-identical queries are reused until the index changes
+        self.index_version = 0
+        self.semantic_cache = SemanticCache(
+            max_distance=float(os.getenv('SEMANTIC_CACHE_MAX_DISTANCE', DEFAULT_MAX_DISTANCE)),
+            verify_rate=float(os.getenv('SEMANTIC_CACHE_VERIFY_RATE', DEFAULT_VERIFY_RATE))
+        )
+    
+    def _write_batch(self, documents: List[IndexedDocument], vectors: List[List[float]]):
+        """Upsert already encoded documents; cached search results become stale"""
+        self.vectorstore._collection.upsert(
+            ids=[document.doc_id for document in documents],
+            embeddings=vectors,
+            metadatas=[document.metadata for document in documents],
+            documents=[document.text for document in documents]
+        )
+        self.index_version += 1
+    
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Encode documents, reusing cached vectors of unchanged texts"""
+        if self.embedding_cache is None:
+            return self.embeddings.embed_documents(texts)
+        return self.embedding_cache.embed(texts, self.embeddings.embed_documents).tolist()
+    
+    async def _embed_documents(
+        self,
+        documents: AsyncIterable[IndexedDocument],
+        label: str,
+        on_written: Optional[Callable[[List[IndexedDocument]], None]] = None
+    ) -> PipelineStats:
+        """
+        Encode and store documents through the batched, parallel pipeline
+        
+        All pipelines share one worker pool, so running several at once
+        (train_all) divides the cores instead of oversubscribing them.
+        """
+        if self._embed_executor is None:
+            self._embed_executor = ThreadPoolExecutor(self.embedding_workers, thread_name_prefix='embed')
+        
+        def write(batch: List[IndexedDocument], vectors: List[List[float]]):
+            self._write_batch(batch, vectors)
+            if on_written is not None:
+                on_written(batch)
+        
+        def progress(stats: PipelineStats):
+            if stats.batches % PROGRESS_EVERY_BATCHES == 0:
+                print(f"   … {label}: {stats.documents} embedded ({stats.docs_per_second:.0f}/s)")
+        
+        pipeline = EmbeddingPipeline(
+            embed=self._encode,
+            write=write,
+            batch_size=self.embedding_batch_size,
+            workers=self.embedding_workers,
+            executor=self._embed_executor,
+            progress=progress
+        )
+        try:
+            return await pipeline.run(documents)
+        finally:
+            if self.embedding_cache is not None:
+                self.embedding_cache.save()
     
     async def train_listings(self) -> int:
         """
-        Embed all approved listings into vector database
+        Sync all approved listings into the vector database
+        
+        Listings are streamed from Firestore and encoded while the next
+        page is fetched. Only listings whose content changed since they
+        were last embedded are re-embedded; indexed listings that are no
+        longer approved are deleted.
         
         Returns:
             Number of listings embedded
@@ -64,70 +188,72 @@ class KnowledgeBaseTrainer:
         print("📚 Training on listings...")
         
         try:
-            listings = await firestore_service.get_all_listings(status="approved")
+            manifest = self._load_manifest()
+            seen = set()
+            unchanged = 0
+            newest = None
             
-            if not listings:
-                print("⚠️  No approved listings found")
-                return 0
+            async def changed_listings():
+                nonlocal unchanged, newest
+                async for listing in firestore_service.stream_listings(fields=[*LISTING_TRAINING_FIELDS, 'updatedAt']):
+                    seen.add(LISTING_PREFIX + listing['id'])
+                    updated_at = newest_update([listing])
+                    if updated_at is not None and (newest is None or updated_at > newest):
+                        newest = updated_at
+                    document = manifest.diff(listing)
+                    if document is None:
+                        unchanged += 1
+                    else:
+                        yield document
             
-            documents = []
-            metadatas = []
-            ids = []
+            def record(documents: List[IndexedDocument]):
+                manifest.commit(SyncPlan(upserts=documents))
             
-            for listing in listings:
-                # Create rich text representation for semantic search
-                text_parts = [
-                    f"Title: {listing.get('title', 'N/A')}",
-                    f"Description: {listing.get('description', 'N/A')}",
-                    f"Category: {listing.get('category', 'N/A')}",
-                    f"Location: {listing.get('location', 'N/A')}",
-                    f"Price: ${listing.get('price', 0)} {listing.get('currency', 'USD')}",
-                ]
-                
-                # Add amenities if available
-                if listing.get('amenities'):
-                    text_parts.append(f"Amenities: {', '.join(listing['amenities'])}")
-                
-                # Add duration if available
-                if listing.get('duration'):
-                    text_parts.append(f"Duration: {listing['duration']}")
-                
-                # Add tags if available
-                if listing.get('tags'):
-                    text_parts.append(f"Tags: {', '.join(listing['tags'])}")
-                
-                # Combine all parts
-                full_text = "\n".join(text_parts)
-                
-                documents.append(full_text)
-                metadatas.append({
-                    'id': listing.get('id', ''),
-                    'title': listing.get('title', ''),
-                    'category': listing.get('category', ''),
-                    'location': listing.get('location', ''),
-                    'price': listing.get('price', 0),
-                    'partnerId': listing.get('partnerId', ''),
-                    'type': 'listing'
-                })
-                ids.append(f"listing_{listing.get('id', '')}")
+            try:
+                stats = await self._embed_documents(changed_listings(), "listings", on_written=record)
+            finally:
+                # Keep the hashes of batches already written, even if the sync failed
+                manifest.save()
+            
+            if not seen:
+                # Also what a failed read looks like - never treat it as "delete everything"
+                print("⚠️  No approved listings found")
+                return 0
             
-            # Add documents to vector store
-            if documents:
-                self.vectorstore.add_texts(
-                    texts=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
-                
-                print(f"✅ Embedded {len(documents)} listings")
-                return len(documents)
+            plan = SyncPlan(deletes=manifest.stale(seen), unchanged=unchanged)
+            if plan.deletes:
+                self.vectorstore.delete(ids=plan.deletes)
+                self.index_version += 1
+            manifest.commit(plan, newest)
+            manifest.save()
             
-            return 0
+            print(f"✅ Listings synced: {stats.documents} embedded, {len(plan.deletes)} deleted, "
+                  f"{unchanged} unchanged ({stats.docs_per_second:.0f} docs/s)")
+            return stats.documents
             
         except Exception as e:
             print(f"❌ Error training listings: {e}")
             return 0
     
+    def _load_manifest(self) -> IndexManifest:
+        """Listing manifest; the first one is seeded with what the store already holds"""
+        path = os.path.join(self.persist_directory, LISTING_MANIFEST_FILE)
+        manifest = IndexManifest.load(path)
+        if not os.path.exists(path):
+            existing = self.vectorstore.get(where={"type": "listing"}, include=[])
+            manifest.seed(existing.get('ids', []))
+        return manifest
+    
+    async def _apply_sync(self, manifest: IndexManifest, plan: SyncPlan, high_water_mark: Optional[datetime]):
+        """Delete and embed what the plan says, then persist the manifest"""
+        if plan.deletes:
+            self.vectorstore.delete(ids=plan.deletes)
+            self.index_version += 1
+        if plan.upserts:
+            await self._embed_documents(iterate_documents(plan.upserts), "listings")
+        manifest.commit(plan, high_water_mark)
+        manifest.save()
+    
     async def train_partners(self) -> int:
         """
         Embed approved partner profiles into vector database
@@ -138,49 +264,41 @@ class KnowledgeBaseTrainer:
         print("📚 Training on partner profiles...")
         
         try:
-            partners = await firestore_service.get_all_partners(status="approved")
+            async def partner_documents():
+                async for partner in firestore_service.stream_partners(
+                    status="approved",
+                    fields=list(PARTNER_TRAINING_FIELDS)
+                ):
+                    text_parts = [
+                        f"Business: {partner.get('businessName', 'N/A')}",
+                        f"Category: {partner.get('businessCategory', 'N/A')}",
+                        f"Description: {partner.get('description', 'N/A')}",
+                        f"Location: {partner.get('businessAddress', 'N/A')}",
+                    ]
+                    
+                    if partner.get('websiteUrl'):
+                        text_parts.append(f"Website: {partner['websiteUrl']}")
+                    
+                    yield IndexedDocument(
+                        doc_id=f"partner_{partner.get('userId', '')}",
+                        text="\n".join(text_parts),
+                        metadata={
+                            'id': partner.get('userId', ''),
+                            'businessName': partner.get('businessName', ''),
+                            'category': partner.get('businessCategory', ''),
+                            'type': 'partner'
+                        },
+                        hash=''
+                    )
+            
+            stats = await self._embed_documents(partner_documents(), "partners")
             
-            if not partners:
+            if not stats.documents:
                 print("⚠️  No approved partners found")
                 return 0
             
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for partner in partners:
-                text_parts = [
-                    f"Business: {partner.get('businessName', 'N/A')}",
-                    f"Category: {partner.get('businessCategory', 'N/A')}",
-                    f"Description: {partner.get('description', 'N/A')}",
-                    f"Location: {partner.get('businessAddress', 'N/A')}",
-                ]
-                
-                if partner.get('websiteUrl'):
-                    text_parts.append(f"Website: {partner['websiteUrl']}")
-                
-                full_text = "\n".join(text_parts)
-                
-                documents.append(full_text)
-                metadatas.append({
-                    'id': partner.get('userId', ''),
-                    'businessName': partner.get('businessName', ''),
-                    'category': partner.get('businessCategory', ''),
-                    'type': 'partner'
-                })
-                ids.append(f"partner_{partner.get('userId', '')}")
-            
-            if documents:
-                self.vectorstore.add_texts(
-                    texts=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
-                
-                print(f"✅ Embedded {len(documents)} partners")
-                return len(documents)
-            
-            return 0
+            print(f"✅ Embedded {stats.documents} partners ({stats.docs_per_second:.0f} docs/s)")
+            return stats.documents
             
         except Exception as e:
             print(f"❌ Error training partners: {e}")
@@ -480,32 +598,24 @@ ATMs and Money:
             }
         ]
         
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, section in enumerate(guide_sections):
-            full_text = f"{section['title']}\n\n{section['content']}"
-            
-            documents.append(full_text)
-            metadatas.append({
-                'title': section['title'],
-                'type': 'travel_guide',
-                'section_id': idx
-            })
-            ids.append(f"guide_{idx}")
-        
-        if documents:
-            self.vectorstore.add_texts(
-                texts=documents,
-                metadatas=metadatas,
-                ids=ids
+        documents = [
+            IndexedDocument(
+                doc_id=f"guide_{idx}",
+                text=f"{section['title']}\n\n{section['content']}",
+                metadata={
+                    'title': section['title'],
+                    'type': 'travel_guide',
+                    'section_id': idx
+                },
+                hash=''
             )
-            
-            print(f"✅ Embedded {len(documents)} travel guide sections")
-            return len(documents)
+            for idx, section in enumerate(guide_sections)
+        ]
         
-        return 0
+        stats = await self._embed_documents(iterate_documents(documents), "travel guide")
+        
+        print(f"✅ Embedded {stats.documents} travel guide sections")
+        return stats.documents
     
     async def train_all(self) -> Dict[str, int]:
         """
@@ -515,11 +625,18 @@ ATMs and Money:
             Dictionary with counts of embedded documents by type
         """
         print("🚀 Starting knowledge base training...\n")
+        print(f"⚙️  {self.embedding_workers} embedding workers, batches of {self.embedding_batch_size}")
         
+        # The three sources share the embedding worker pool
+        listings, partners, travel_guide = await asyncio.gather(
+            self.train_listings(),
+            self.train_partners(),
+            self.train_travel_guide()
+        )
         results = {
-            'listings': await self.train_listings(),
-            'partners': await self.train_partners(),
-            'travel_guide': await self.train_travel_guide()
+            'listings': listings,
+            'partners': partners,
+            'travel_guide': travel_guide
         }
         
         # Persist to disk
@@ -537,6 +654,9 @@ ATMs and Money:
         """
         Search the knowledge base
         
+        Near-identical queries (within SEMANTIC_CACHE_MAX_DISTANCE cosine
+        distance) reuse cached results until the index is retrained.
+        
         Args:
             query: Search query
             k: Number of results
@@ -551,63 +671,131 @@ ATMs and Money:
             if filter_type:
                 where_filter = {"type": filter_type}
             
-            # Search
-            results = self.vectorstore.similarity_search(
-                query=query,
-                k=k,
-                filter=where_filter
-            )
+            scope = (filter_type, k)
+            version = self.index_version
             
-            return [
-                {
-                    'content': doc.page_content,
-                    'metadata': doc.metadata
-                }
-                for doc in results
-            ]
+            cached = self.semantic_cache.get_text(query, scope, version)
+            if cached is not None:
+                return _copy_results(cached)
+            
+            # Embed once; the vector serves both the cache lookup and the search
+            vector = self.embeddings.embed_query(query)
+            cached = self.semantic_cache.get(vector, scope, version)
+            if cached is not None:
+                if self.semantic_cache.should_verify():
+                    actual = self._search_by_vector(vector, k, where_filter)
+                    false_hit = self.semantic_cache.record_verification(
+                        [r['metadata'].get('id', r['content']) for r in cached],
+                        [r['metadata'].get('id', r['content']) for r in actual]
+                    )
+                    if false_hit:
+                        # Serve the real results and cache them under this query
+                        self.semantic_cache.put(query, vector, scope, version, _copy_results(actual))
+                        return actual
+                return _copy_results(cached)
+            
+            results = self._search_by_vector(vector, k, where_filter)
+            self.semantic_cache.put(query, vector, scope, version, _copy_results(results))
+            return results
             
         except Exception as e:
             print(f"❌ Error searching: {e}")
             return []
     
+    def _search_by_vector(self, vector: List[float], k: int, where_filter: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vector search with an already computed query embedding"""
+        results = self.vectorstore.similarity_search_by_vector(
+            embedding=vector,
+            k=k,
+            filter=where_filter
+        )
+        
+        return [
+            {
+                'content': doc.page_content,
+                'metadata': doc.metadata
+            }
+            for doc in results
+        ]
+    
     async def incremental_update(self, since_minutes: int = 15) -> int:
         """
         Update only recently changed listings
         
+        Resumes from the persisted high-water mark; without a manifest this
+        is a full sync. Changed listings are re-embedded if their content
+        hash changed, and indexed listings that were deleted or un-approved
+        are removed.
+        
         Args:
-            since_minutes: Get listings updated in last N minutes
+            since_minutes: Look-back when no high-water mark has been stored yet
             
         Returns:
-            Number of documents updated
+            Number of documents updated (embedded or deleted)
         """
         try:
-            since_date = datetime.now() - timedelta(minutes=since_minutes)
-            new_listings = await firestore_service.get_listings_since(since_date)
+            manifest = self._load_manifest()
+            if not manifest.synced:
+                return await self.train_listings()
             
-            if not new_listings:
-                return 0
+            since_date = manifest.high_water_mark or datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
+            changed = await firestore_service.get_listings_since(
+                since_date,
+                fields=[*LISTING_TRAINING_FIELDS, 'status', 'updatedAt']
+            )
+            approved = await firestore_service.get_all_listings(status="approved", fields=[])
             
-            print(f"🔄 Updating {len(new_listings)} recently changed listings...")
+            # An empty result may be a failed read; skip the hard-delete sweep then
+            live_ids = {listing['id'] for listing in approved} if approved else None
+            plan = manifest.plan(changed, live_ids=live_ids)
+            if plan.missing:
+                fetched = await asyncio.gather(*[firestore_service.get_listing_by_id(i) for i in plan.missing])
+                plan.upserts.extend(manifest.plan([l for l in fetched if l]).upserts)
             
-            # Re-embed updated listings
-            # (In production, you'd want to delete old versions first)
-            count = await self.train_listings()
+            await self._apply_sync(manifest, plan, newest_update(changed))
+            if plan.upserts or plan.deletes:
+                print(f"🔄 Incremental listing sync: {plan.summary()}")
             
             self.last_sync = datetime.now()
-            return count
+            return len(plan.upserts) + len(plan.deletes)
             
         except Exception as e:
             print(f"❌ Error in incremental update: {e}")
             return 0
 
 
+    def status(self) -> Dict[str, Any]:
+        """Load cost, index size and cache telemetry for the status endpoint"""
+        try:
+            documents = self.vectorstore._collection.count()
+        except Exception:
+            documents = None
+        
+        return {
+            'loaded': True,
+            'model': EMBEDDING_MODEL_NAME,
+            'embedding_backend': self.embedding_backend,
+            'persist_directory': self.persist_directory,
+            **self.load_stats,
+            'process_rss_mb': round(_rss_bytes() / (1024 * 1024), 1),
+            'documents': documents,
+            'index_version': self.index_version,
+            'last_sync': self.last_sync.isoformat() if self.last_sync else None,
+            'semantic_cache': self.semantic_cache.stats(),
+            'embedding_cache': self.embedding_cache.stats() if self.embedding_cache else None,
+        }
+
+
 # Singleton instance
 knowledge_base = None
+_knowledge_base_lock = threading.Lock()
 
 def get_knowledge_base() -> KnowledgeBaseTrainer:
-    """Get or create knowledge base instance"""
+    """Get or create the process-wide knowledge base (loads the model once)"""
     global knowledge_base
     if knowledge_base is None:
-        persist_dir = os.getenv('CHROMA_PERSIST_DIRECTORY', './chroma_data')
-        knowledge_base = KnowledgeBaseTrainer(persist_directory=persist_dir)
+        with _knowledge_base_lock:
+            if knowledge_base is None:
+                persist_dir = os.getenv('CHROMA_PERSIST_DIRECTORY', './chroma_data')
+                knowledge_base = KnowledgeBaseTrainer(persist_directory=persist_dir)
     return knowledge_base
@@ -20,6 +20,8 @@ Performance Optimizations:
 2. **Time Range Filters**: Default to recent data (last 30 days) to avoid full scans
 3. **Pagination**: Limit results to prevent memory issues
 4. **Aggregation Caching**: Cache common aggregations (e.g., monthly revenue)
+   System counters use server-side count()/sum() aggregation queries (no
+   document reads) and are cached for ANALYTICS_CACHE_TTL seconds per time range
 5. **Read Replicas**: Use Firestore read replicas for analytics (future optimization)
 
 Supported Operations:
@@ -49,13 +51,24 @@ Error Handling:
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from enum import Enum
+import asyncio
 import logging
+import os
 
+from cachetools import TTLCache
+
+from config.firebase_admin import run_blocking
 from .intent_classifier import Intent
 from .role_validator import UserRole
 
 logger = logging.getLogger(__name__)
 
+# System metrics are cached briefly - admin dashboards poll constantly
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+
+# Booking statuses that count towards revenue
+REVENUE_STATUSES = ["confirmed", "completed"]
+
 
 class TimeRange(str, Enum):
     """Time range options for analytics queries"""
@@ -97,6 +110,10 @@ class DeterministicDataEngine:
             firestore_service: Firestore service instance for database operations
         """
         self.db = firestore_service
+        
+        # time_range -> (metrics, start_date, end_date)
+        self._metrics_cache = TTLCache(maxsize=len(TimeRange) * 2, ttl=ANALYTICS_CACHE_TTL)
+        
         logger.info("DeterministicDataEngine initialized")
     
     async def execute(
@@ -359,16 +376,7 @@ class DeterministicDataEngine:
         - Platform activity metrics
         """
         try:
-            start_date, end_date = self._get_date_range(time_range)
-            
-            # Aggregate system metrics
-            metrics = {
-                "total_users": await self._count_users(),
-                "total_partners": await self._count_partners(),
-                "total_listings": await self._count_listings(),
-                "total_bookings": await self._count_bookings(start_date, end_date),
-                "total_revenue": await self._sum_revenue(start_date, end_date),
-            }
+            metrics, start_date, end_date = await self._get_system_metrics(time_range)
             
             return {
                 "success": True,
@@ -391,16 +399,13 @@ class DeterministicDataEngine:
     ) -> Dict[str, Any]:
         """Get system-wide revenue (admin only)"""
         try:
-            start_date, end_date = self._get_date_range(time_range)
-            
-            total_revenue = await self._sum_revenue(start_date, end_date)
-            total_bookings = await self._count_bookings(start_date, end_date)
+            metrics, start_date, end_date = await self._get_system_metrics(time_range)
             
             return {
                 "success": True,
                 "data": {
-                    "total_revenue": total_revenue,
-                    "total_bookings": total_bookings,
+                    "total_revenue": metrics["total_revenue"],
+                    "total_bookings": metrics["total_bookings"],
                     "currency": "USD"
                 },
                 "time_range": {
@@ -442,6 +447,41 @@ class DeterministicDataEngine:
             logger.error(f"Error fetching moderation queue: {e}")
             return self._error_response(str(e))
     
+    async def _get_system_metrics(self, time_range: TimeRange) -> tuple:
+        """
+        Aggregate system metrics (cached per time range)
+        
+        The five aggregation queries run concurrently.
+        
+        Returns:
+            (metrics, start_date, end_date)
+        """
+        cached = self._metrics_cache.get(time_range.value)
+        if cached is not None:
+            return cached
+        
+        start_date, end_date = self._get_date_range(time_range)
+        
+        users, partners, listings, bookings, revenue = await asyncio.gather(
+            self._count_users(),
+            self._count_partners(),
+            self._count_listings(),
+            self._count_bookings(start_date, end_date),
+            self._sum_revenue(start_date, end_date),
+        )
+        
+        metrics = {
+            "total_users": users,
+            "total_partners": partners,
+            "total_listings": listings,
+            "total_bookings": bookings,
+            "total_revenue": revenue,
+        }
+        
+        result = (metrics, start_date, end_date)
+        self._metrics_cache[time_range.value] = result
+        return result
+    
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # Helper Methods (Database Operations)
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -496,28 +536,47 @@ class DeterministicDataEngine:
     
     async def _count_users(self) -> int:
         """Count total users"""
-        # Placeholder - implement with actual Firestore count
-        return 0
+        return int(await self._aggregate(self.db.collection("users"), "count"))
     
     async def _count_partners(self) -> int:
         """Count total partners"""
-        # Placeholder - implement with actual Firestore count
-        return 0
+        return int(await self._aggregate(self.db.collection("partners"), "count"))
     
     async def _count_listings(self) -> int:
         """Count total listings"""
-        # Placeholder - implement with actual Firestore count
-        return 0
+        return int(await self._aggregate(self.db.collection("listings"), "count"))
     
     async def _count_bookings(self, start_date: datetime, end_date: datetime) -> int:
         """Count bookings in time range"""
-        # Placeholder - implement with actual Firestore count
-        return 0
+        query = self.db.collection("bookings") \
+            .where("createdAt", ">=", start_date) \
+            .where("createdAt", "<=", end_date)
+        return int(await self._aggregate(query, "count"))
     
     async def _sum_revenue(self, start_date: datetime, end_date: datetime) -> float:
-        """Sum revenue in time range"""
-        # Placeholder - implement with actual Firestore aggregation
-        return 0.0
+        """Sum revenue (confirmed/completed bookings) in time range"""
+        query = self.db.collection("bookings") \
+            .where("status", "in", REVENUE_STATUSES) \
+            .where("createdAt", ">=", start_date) \
+            .where("createdAt", "<=", end_date)
+        return float(await self._aggregate(query, "sum", "totalPrice"))
+    
+    async def _aggregate(self, query, kind: str, field_path: Optional[str] = None):
+        """
+        Run a server-side aggregation query (count or sum)
+        
+        Firestore bills one read per 1,000 index entries scanned, instead of
+        one read per document.
+        """
+        if kind == "count":
+            aggregation = query.count(alias="value")
+        else:
+            aggregation = query.sum(field_path, alias="value")
+        
+        results = await run_blocking(aggregation.get)
+        # get() returns one list of AggregationResult per aggregation query
+        value = results[0][0].value if results and results[0] else 0
+        return value or 0
     
     async def _query_partners(self, status: str) -> List[Dict]:
         """Query partners by status"""
@@ -37,15 +37,23 @@ from enum import Enum
 import re
 import logging
 
+import numpy as np
+
+from services.embedding_cache import get_embedding_cache
+from services.onnx_embeddings import get_onnx_embeddings, onnx_backend_enabled
+
 logger = logging.getLogger(__name__)
 
 # Lazy imports for optional dependencies (installed via requirements.txt)
 try:
     from sentence_transformers import SentenceTransformer  # type: ignore[import-not-found]
-    import numpy as np
-    EMBEDDINGS_AVAILABLE = True
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# The ONNX backend (EMBEDDING_BACKEND=onnx) works without sentence-transformers
+EMBEDDINGS_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE or onnx_backend_enabled()
+if not EMBEDDINGS_AVAILABLE:
     logger.warning(
         "sentence-transformers not installed. Embedding classification disabled. "
         "Install with: pip install sentence-transformers numpy"
@@ -253,15 +261,24 @@ class IntentClassifier:
         
         if self._embedding_model is None:
             logger.info(f"Loading embedding model: {self._embedding_model_name}")
-            self._embedding_model = SentenceTransformer(self._embedding_model_name)
+            onnx_model = get_onnx_embeddings(self._embedding_model_name)
+            if onnx_model is None and not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise ImportError(
+                    "ONNX embedding backend unavailable and sentence-transformers not installed"
+                )
+            self._embedding_model = onnx_model or SentenceTransformer(self._embedding_model_name)
+            cache_name = self._embedding_model_name if onnx_model is None else f"{self._embedding_model_name}+{onnx_model.variant}"
+            
+            # Pre-compute example embeddings (from the on-disk cache after the first start)
+            def encode(texts):
+                return self._embedding_model.encode(texts, convert_to_numpy=True)
             
-            # Pre-compute example embeddings
+            cache = get_embedding_cache(cache_name)
             self._example_embeddings = {}
             for intent, examples in self.INTENT_EXAMPLES.items():
-                self._example_embeddings[intent] = self._embedding_model.encode(
-                    examples, 
-                    convert_to_numpy=True
-                )
+                self._example_embeddings[intent] = cache.embed(examples, encode) if cache else encode(examples)
+            if cache:
+                cache.save()
     
     async def classify(self, query: str) -> IntentMetadata:
         """
@@ -54,6 +54,8 @@ import logging
 import chromadb
 from chromadb.config import Settings
 
+from services.embedding_cache import get_embedding_cache
+from services.onnx_embeddings import get_onnx_embeddings
 from .intent_classifier import Intent
 from .role_validator import UserRole
 
@@ -109,16 +111,23 @@ class RAGEngine:
         self.llm = llm_provider
         self.similarity_threshold = similarity_threshold
         
+        # Queries and documents are embedded by Chroma's default MiniLM
+        # unless the quantized ONNX backend is enabled (EMBEDDING_BACKEND=onnx)
+        embedding_function = get_onnx_embeddings()
+        collection_kwargs = {"embedding_function": embedding_function} if embedding_function else {}
+        
         # Initialize collections
         try:
             self.policy_collection = self.chroma.get_or_create_collection(
                 name=self.POLICY_COLLECTION,
-                metadata={"description": "SkyConnect policy documents"}
+                metadata={"description": "SkyConnect policy documents"},
+                **collection_kwargs
             )
             
             self.help_collection = self.chroma.get_or_create_collection(
                 name=self.HELP_COLLECTION,
-                metadata={"description": "SkyConnect help and tutorial documents"}
+                metadata={"description": "SkyConnect help and tutorial documents"},
+                **collection_kwargs
             )
             
             logger.info("RAGEngine initialized with ChromaDB collections")
@@ -393,7 +402,8 @@ Provide a clear, helpful answer based ONLY on the context above."""
             self.policy_collection.add(
                 ids=ids,
                 documents=chunks,
-                metadatas=metadatas
+                metadatas=metadatas,
+                embeddings=self._embed_chunks(self.policy_collection, chunks)
             )
             
             logger.info(f"Indexed policy document: {title} ({len(chunks)} chunks)")
@@ -429,7 +439,8 @@ Provide a clear, helpful answer based ONLY on the context above."""
             self.help_collection.add(
                 ids=ids,
                 documents=chunks,
-                metadatas=metadatas
+                metadatas=metadatas,
+                embeddings=self._embed_chunks(self.help_collection, chunks)
             )
             
             logger.info(f"Indexed help document: {title} ({len(chunks)} chunks)")
@@ -439,6 +450,24 @@ Provide a clear, helpful answer based ONLY on the context above."""
             logger.error(f"Error indexing help document: {e}")
             return False
     
+    def _embed_chunks(self, collection: chromadb.Collection, chunks: List[str]) -> Optional[List[List[float]]]:
+        """
+        Chunk embeddings via the on-disk embedding cache
+        
+        Uses the collection's own embedding function, so indexed vectors
+        match the ones its queries are embedded with. Returns None (Chroma
+        embeds the chunks itself) when there is no cache.
+        """
+        embedding_function = getattr(collection, '_embedding_function', None)
+        if embedding_function is None:
+            return None
+        cache = get_embedding_cache(f"chroma/{type(embedding_function).__name__}")
+        if cache is None:
+            return None
+        vectors = cache.embed(chunks, embedding_function)
+        cache.save()
+        return vectors.tolist()
+    
     def _semantic_chunk(self, text: str, max_chunk_size: int) -> List[str]:
         """
         Split text into semantic chunks
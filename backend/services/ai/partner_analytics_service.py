@@ -8,6 +8,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 from services.firestore_service import firestore_service
+from data.catalog import get_listing_catalog
 from services.ai.llm_provider import get_llm_provider
 
 # Configure logging
@@ -108,6 +109,10 @@ class PartnerAnalyticsService:
     
     async def _get_partner_listings(self, partner_id: str) -> List[Dict[str, Any]]:
         """Fetch all listings for a partner"""
+        catalog = get_listing_catalog()
+        if catalog.ready:
+            return catalog.by_partner(partner_id, statuses=("approved", "pending"))
+        
         try:
             # Fetch all listings and filter by partner_id
             all_listings = await firestore_service.get_all_listings(status="approved")
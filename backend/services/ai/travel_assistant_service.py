@@ -274,13 +274,16 @@ Sound conversational and warm, like talking to a friend."""
     async def _get_user_liked_items(self, user_id: str) -> List[Dict[str, Any]]:
         """Get user's liked/saved items"""
         try:
-            # Try to get from Firestore
-            # Assuming there's a 'user_likes' or similar collection
-            # If not, return empty list
+            if not self.data_repo:
+                return []
             
-            # For now, return empty list
-            # TODO: Implement proper liked items fetching when schema is defined
-            return []
+            # Saved listing IDs (travelers/{id}/saved_listings), hydrated in one bulk fetch
+            saved_ids = await self.data_repo.get_user_saved_listings(user_id)
+            if not saved_ids:
+                return []
+            
+            saved_listings = await self.data_repo.get_listings_batch(saved_ids)
+            return [listing.to_dict() for listing in saved_listings]
             
         except Exception as e:
             logger.warning(f"Could not fetch liked items: {e}")
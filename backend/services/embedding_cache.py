@@ -0,0 +1,390 @@
+"""
+Embedding Cache
+Persistent, content-addressed cache of text embeddings
+
+Why:
+- Every training run re-encoded the static travel guide, every partner
+  and (whenever the index manifest was lost) every listing, although
+  the texts had not changed
+- The intent classifier re-encoded its example phrases on every start
+
+How:
+- A vector is stored under (model, hash of the normalized text), so any
+  caller encoding the same text with the same model reuses it
+- Vectors live in one float32 file per model that is memory-mapped, so
+  only the rows that are read are paged in. An append-only key log maps
+  text hashes to rows: the n-th key added owns row n, and evictions are
+  logged as removals
+- The size limit evicts the least recently used entries (recency is
+  tracked per process). Evicted rows are dead space until the file is
+  compacted (rewritten with the live rows only as a new generation),
+  which happens once more than half of it is dead
+- A small header names the current generation and is replaced atomically
+
+Several processes (uvicorn workers, train_bot.py next to the server) may
+share a cache directory. Every read and write holds an exclusive flock on
+the directory's lock file and first catches up with the key log, so rows
+are never claimed twice and every process sees the others' entries.
+Writes go straight to disk; there is nothing to lose on exit.
+
+User queries are deliberately not cached - only indexed content and
+fixed example phrases are written to disk.
+
+Usage:
+    cache = get_embedding_cache("sentence-transformers/all-MiniLM-L6-v2")
+    vectors = cache.embed(texts, model.embed_documents)  # encodes misses only
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per cache directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIRECTORY = "./embedding_cache"
+DEFAULT_MAX_MB = 512
+INITIAL_ROWS = 1024
+HEADER_FILE = "index.json"
+LOCK_FILE = ".lock"
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalized text with whitespace collapsed (case is kept - it changes the vector)"""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """Memory-mapped float32 vectors of one model, keyed by text hash"""
+
+    def __init__(self, directory: str, model_name: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        """
+        Args:
+            directory: Root directory; each model gets its own subdirectory
+            model_name: Identifies the model and any encode settings that change its vectors
+            max_bytes: Size limit of the live vectors
+        """
+        self.model_name = model_name
+        self.directory = os.path.join(directory, re.sub(r'[^A-Za-z0-9._-]+', '_', model_name))
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._rows: 'OrderedDict[str, int]' = OrderedDict()  # least recently used first
+        self._dim: Optional[int] = None
+        self._used = 0  # rows claimed in the vector file, live or dead
+        self._generation: Optional[int] = None
+        self._log_offset = 0  # bytes of the key log already applied
+        self._vectors: Optional[np.memmap] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compactions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._sync()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per text, None for misses"""
+        found: List[Optional[np.ndarray]] = []
+        with self._lock, self._file_lock():
+            self._sync()
+            for text in texts:
+                key = text_key(text)
+                row = self._rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    self._rows.move_to_end(key)
+                    found.append(np.array(self._vectors[row]))
+        return found
+
+    def put(self, texts: Sequence[str], vectors: Any):
+        """Store freshly encoded vectors"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._dim is None:
+                self._start_generation(0, int(vectors.shape[1]))
+                self._write_header()
+            elif vectors.shape[1] != self._dim:
+                logger.warning(f"Embedding cache {self.model_name}: got {vectors.shape[1]}-d vectors, "
+                               f"cache holds {self._dim}-d - not cached")
+                return
+
+            self._reserve(len(texts))
+            lines = []
+            for text, vector in zip(texts, vectors):
+                key = text_key(text)
+                if key in self._rows:
+                    continue
+                self._vectors[self._used] = vector
+                self._rows[key] = self._used
+                self._used += 1
+                lines.append(f"{key}\n")
+            while len(self._rows) > self.max_rows:
+                key, _ = self._rows.popitem(last=False)
+                lines.append(f"-{key}\n")
+                self.evictions += 1
+
+            # Vectors reach the file before the log lines that point at them
+            self._vectors.flush()
+            self._append_log(lines)
+
+            if self._used - len(self._rows) > len(self._rows):
+                self._compact()
+
+    def embed(self, texts: Sequence[str], encode: Callable[[List[str]], Any]) -> np.ndarray:
+        """
+        Vectors for texts, encoding only the ones not cached yet
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        vectors = self.get(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fresh = np.asarray(encode([texts[i] for i in missing]), dtype=np.float32)
+            self.put([texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        if not vectors:
+            return np.empty((0, self._dim or 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def save(self):
+        """Entries are written through by put(); kept for callers that persist explicitly"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+    @property
+    def max_rows(self) -> int:
+        return max(1, self.max_bytes // (4 * self._dim)) if self._dim else 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------
+    # Storage (callers hold self._lock and the file lock)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive across processes sharing the directory"""
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _vector_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"vectors-{generation}.f32")
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"keys-{generation}.log")
+
+    def _map(self):
+        """Map the whole vector file (it may have been grown by another process)"""
+        path = self._vector_path(self._generation)
+        rows = os.path.getsize(path) // (4 * self._dim)
+        if self._vectors is None or self._vectors.shape[0] != rows:
+            self._vectors = np.memmap(path, dtype=np.float32, mode='r+', shape=(rows, self._dim)) if rows else None
+
+    def _sync(self):
+        """Catch up with what other processes wrote since the last call"""
+        header_path = os.path.join(self.directory, HEADER_FILE)
+        if not os.path.exists(header_path):
+            # Nothing stored yet, or another process found the files corrupt and dropped them
+            self._clear()
+            return
+        try:
+            with open(header_path) as f:
+                header = json.load(f)
+            if header['model'] != self.model_name:
+                raise ValueError(f"cache belongs to {header['model']}")
+            generation, dim = int(header['generation']), int(header['dim'])
+
+            if generation != self._generation:
+                # First load, or another process compacted: rebuild from the new log
+                self._generation, self._dim = generation, dim
+                self._rows = OrderedDict()
+                self._used = 0
+                self._log_offset = 0
+                self._vectors = None
+
+            with open(self._log_path(generation), 'rb+') as log:
+                log.seek(self._log_offset)
+                data = log.read()
+                complete = data.rfind(b'\n') + 1
+                if complete < len(data):
+                    # A writer died mid-line; nobody else can be writing now
+                    log.truncate(self._log_offset + complete)
+            for line in data[:complete].decode('ascii').splitlines():
+                if line.startswith('-'):
+                    self._rows.pop(line[1:], None)
+                else:
+                    self._rows[line] = self._used
+                    self._used += 1
+            self._log_offset += complete
+            self._map()
+            if self._used > (self._vectors.shape[0] if self._vectors is not None else 0):
+                raise ValueError("key log points past the end of the vector file")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Embedding cache {self.directory} unreadable, starting over: {e}")
+            self._reset()
+
+    def _append_log(self, lines: List[str]):
+        if not lines:
+            return
+        with open(self._log_path(self._generation), 'ab') as log:
+            log.write("".join(lines).encode('ascii'))
+            log.flush()
+            os.fsync(log.fileno())
+            self._log_offset = log.tell()
+
+    def _start_generation(self, generation: int, dim: int, capacity: int = INITIAL_ROWS):
+        """Create empty vector and log files and point the header at them"""
+        self._generation, self._dim = generation, dim
+        with open(self._vector_path(generation), 'wb') as f:
+            f.truncate(capacity * 4 * dim)
+        open(self._log_path(generation), 'wb').close()
+        self._rows = OrderedDict()
+        self._used = 0
+        self._log_offset = 0
+        self._vectors = None
+        self._map()
+
+    def _write_header(self):
+        data = {'model': self.model_name, 'dim': self._dim, 'generation': self._generation}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, os.path.join(self.directory, HEADER_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _reset(self):
+        """Drop every file of the cache; the next put starts a fresh one"""
+        paths = glob.glob(os.path.join(self.directory, "vectors-*.f32")) + \
+            glob.glob(os.path.join(self.directory, "keys-*.log")) + \
+            [os.path.join(self.directory, HEADER_FILE)]
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
+        self._clear()
+
+    def _clear(self):
+        self._generation, self._dim = None, None
+        self._rows = OrderedDict()
+        self._used = 0
+        self._log_offset = 0
+        self._vectors = None
+
+    def _reserve(self, count: int):
+        """Grow the vector file to fit `count` more rows"""
+        capacity = self._vectors.shape[0] if self._vectors is not None else 0
+        if self._used + count <= capacity:
+            return
+        new_capacity = max(INITIAL_ROWS, 2 * capacity, self._used + count)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vector_path(self._generation), 'ab') as f:
+            f.truncate(new_capacity * 4 * self._dim)
+        self._map()
+
+    def _compact(self):
+        """Rewrite the live rows as a new generation and drop the old files"""
+        old_generation, old_vectors, old_rows = self._generation, self._vectors, self._rows
+        self._start_generation(old_generation + 1, self._dim, max(INITIAL_ROWS, 2 * len(old_rows)))
+        for new_row, (key, row) in enumerate(old_rows.items()):
+            self._vectors[new_row] = old_vectors[row]
+            self._rows[key] = new_row
+        self._used = len(old_rows)
+        self._vectors.flush()
+        self._append_log([f"{key}\n" for key in self._rows])
+
+        # Other processes switch over when they see the new header
+        self._write_header()
+        self.compactions += 1
+        del old_vectors
+        os.unlink(self._vector_path(old_generation))
+        os.unlink(self._log_path(old_generation))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        capacity = self._vectors.shape[0] if self._vectors is not None else 0
+        return {
+            'model': self.model_name,
+            'entries': len(self._rows),
+            'dim': self._dim,
+            'file_mb': round(capacity * 4 * (self._dim or 0) / (1024 * 1024), 1),
+            'max_mb': round(self.max_bytes / (1024 * 1024), 1),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'compactions': self.compactions,
+        }
+
+
+# One cache per model, shared by every caller in the process
+_caches: Dict[str, Optional[EmbeddingCache]] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> Optional[EmbeddingCache]:
+    """
+    Process-wide cache for a model, configured from the environment
+
+    Returns None when EMBEDDING_CACHE_ENABLED is false or the cache
+    directory can't be used - callers then encode everything.
+    """
+    if os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+    with _caches_lock:
+        if model_name not in _caches:
+            try:
+                _caches[model_name] = EmbeddingCache(
+                    os.getenv('EMBEDDING_CACHE_DIR', DEFAULT_DIRECTORY),
+                    model_name,
+                    max_bytes=int(float(os.getenv('EMBEDDING_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+                )
+            except OSError as e:
+                logger.warning(f"Embedding cache disabled for {model_name}: {e}")
+                _caches[model_name] = None
+        return _caches[model_name]
@@ -0,0 +1,192 @@
+"""
+Embedding Pipeline
+Batched, parallel embedding for knowledge base (re)indexing
+
+Why:
+- train_all embedded listings, partners and the travel guide one after
+  another, each as a single add_texts() call: no batching control, one
+  core busy, nothing reported until the very end
+- Fetching from Firestore and encoding on the CPU never overlapped
+
+Stages, connected by bounded queues:
+
+    source (async iterator)  →  batcher  →  [encode_queue]  →  N encode workers
+                                                                   ↓
+                                     writer  ←  [write_queue]  ←───┘
+
+- The batcher groups documents into batch_size batches. It keeps pulling
+  the source (e.g. the next Firestore page) while workers encode
+- Encode workers run embed() in a thread pool sized to the CPU count
+  (the model releases the GIL while encoding). Several pipelines may
+  share one pool
+- A single writer stores encoded batches in order of completion
+- Queues hold at most `queue_batches` batches, so memory stays bounded and
+  a slow stage applies back-pressure instead of buffering everything
+
+Usage:
+    pipeline = EmbeddingPipeline(embed=model.embed_documents, write=store_batch)
+    stats = await pipeline.run(documents)   # documents: AsyncIterable with .text
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+async def iterate_documents(documents: List[Any]) -> AsyncIterator[Any]:
+    """Feed an in-memory list to a pipeline"""
+    for document in documents:
+        yield document
+
+
+@dataclass
+class PipelineStats:
+    """Progress and timing of one pipeline run"""
+    workers: int
+    batch_size: int
+    documents: int = 0
+    batches: int = 0
+    encode_ms: float = 0.0  # summed over workers
+    write_ms: float = 0.0
+    wall_ms: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / (self.wall_ms / 1000) if self.wall_ms else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'documents': self.documents,
+            'batches': self.batches,
+            'workers': self.workers,
+            'batch_size': self.batch_size,
+            'wall_ms': round(self.wall_ms, 1),
+            'encode_ms': round(self.encode_ms, 1),
+            'write_ms': round(self.write_ms, 1),
+            'docs_per_second': round(self.docs_per_second, 1),
+        }
+
+
+class EmbeddingPipeline:
+    """Fetch → encode → write, with the stages running concurrently"""
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[List[float]]],
+        write: Callable[[List[Any], List[List[float]]], None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: Optional[int] = None,
+        queue_batches: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        progress: Optional[Callable[[PipelineStats], None]] = None
+    ):
+        """
+        Args:
+            embed: Blocking texts -> vectors (runs on the worker pool)
+            write: Blocking (documents, vectors) -> None (runs on its own thread)
+            batch_size: Documents per embed() call
+            workers: Concurrent embed() calls (default: CPU count)
+            queue_batches: Capacity of each queue in batches (default: 2 x workers)
+            executor: Shared worker pool; one of size `workers` is created per run otherwise
+            progress: Called with the stats after every written batch
+        """
+        self.embed = embed
+        self.write = write
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers or default_workers())
+        self.queue_batches = max(1, queue_batches or 2 * self.workers)
+        self.executor = executor
+        self.progress = progress
+
+    async def run(self, documents: AsyncIterable[Any]) -> PipelineStats:
+        """
+        Embed and write every document of the source
+
+        Documents need a `.text` attribute. If any stage fails the others
+        are cancelled and the error is raised; batches written before that
+        stay written.
+        """
+        loop = asyncio.get_running_loop()
+        stats = PipelineStats(workers=self.workers, batch_size=self.batch_size)
+        encode_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+
+        executor = self.executor or ThreadPoolExecutor(self.workers, thread_name_prefix='embed')
+        writer_executor = ThreadPoolExecutor(1, thread_name_prefix='embed-write')
+        started = time.perf_counter()
+
+        async def batch_source():
+            batch = []
+            async for document in documents:
+                batch.append(document)
+                if len(batch) >= self.batch_size:
+                    await encode_queue.put(batch)
+                    batch = []
+            if batch:
+                await encode_queue.put(batch)
+            for _ in range(self.workers):
+                await encode_queue.put(None)
+
+        async def encode_worker():
+            while True:
+                batch = await encode_queue.get()
+                if batch is None:
+                    return
+                t0 = time.perf_counter()
+                vectors = await loop.run_in_executor(executor, self.embed, [d.text for d in batch])
+                stats.encode_ms += (time.perf_counter() - t0) * 1000
+                await write_queue.put((batch, vectors))
+
+        async def writer():
+            while True:
+                item = await write_queue.get()
+                if item is None:
+                    return
+                batch, vectors = item
+                t0 = time.perf_counter()
+                await loop.run_in_executor(writer_executor, self.write, batch, vectors)
+                stats.write_ms += (time.perf_counter() - t0) * 1000
+                stats.documents += len(batch)
+                stats.batches += 1
+                stats.wall_ms = (time.perf_counter() - started) * 1000
+                if self.progress is not None:
+                    self.progress(stats)
+
+        producers = [asyncio.ensure_future(batch_source())] + \
+            [asyncio.ensure_future(encode_worker()) for _ in range(self.workers)]
+        write_task = asyncio.ensure_future(writer())
+        pending = set(producers) | {write_task}
+        writer_signalled = False
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+                if not writer_signalled and all(task.done() for task in producers):
+                    await write_queue.put(None)
+                    writer_signalled = True
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=False)
+            writer_executor.shutdown(wait=False)
+
+        stats.wall_ms = (time.perf_counter() - started) * 1000
+        return stats
@@ -3,50 +3,132 @@ Firestore Service
 Handles all Firestore database operations for the backend
 """
 
-from config.firebase_admin import init_db
-from typing import List, Dict, Any, Optional
+from config.firebase_admin import init_db, run_blocking, iterate_blocking
+from data.bulk_writes import BulkOperation, BulkWriteResult, DEFAULT_MAX_ATTEMPTS, run_bulk_write
+from data.catalog import get_listing_catalog
+from data.pagination import (
+    Page, DEFAULT_PAGE_SIZE, apply_cursor, build_page, clamp_page_size, cursor_token_for
+)
+from data.projection import apply_projection, merge_fields, project
+from data.query_planner import Predicate, QueryPlan, get_query_planner
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime
 
+# Documents fetched per executor hop when streaming
+STREAM_BATCH_SIZE = 100
+
 class FirestoreService:
     """Service for Firestore database operations"""
     
     def __init__(self):
         self.db = init_db()
+        # Listing replica (started in app startup); reads fall back to Firestore until ready
+        self.catalog = get_listing_catalog()
+    
+    # Internal helpers (all Firestore I/O runs on the shared executor)
+    async def _run_query(self, query) -> List[Dict[str, Any]]:
+        """
+        Execute a query off the event loop and return documents as dicts
+        """
+        docs = await run_blocking(query.get)
+        
+        results = []
+        for doc in docs:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            results.append(data)
+        
+        return results
+    
+    async def _run_paged_query(
+        self,
+        query,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Execute one page of a query using a start_after() cursor
+        
+        Raises InvalidPageToken for a bad token; Firestore errors yield an empty page
+        """
+        page_size = clamp_page_size(page_size)
+        query = apply_cursor(query, page_size, page_token)
+        
+        try:
+            docs = await run_blocking(query.get)
+        except Exception as e:
+            print(f"Error fetching page: {e}")
+            return Page()
+        
+        page_docs, next_token = build_page(docs, page_size)
+        
+        items = []
+        for doc in page_docs:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            items.append(data)
+        
+        return Page(items=items, next_page_token=next_token)
+    
+    async def _get_doc(self, collection: str, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single document off the event loop
+        """
+        doc_ref = self.db.collection(collection).document(document_id)
+        doc = await run_blocking(doc_ref.get)
+        
+        if doc.exists:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            return data
+        return None
     
     # Listings Operations
-    async def get_all_listings(self, status: str = "approved") -> List[Dict[str, Any]]:
+    async def get_all_listings(
+        self,
+        status: str = "approved",
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all listings with specified status
+        
+        Pass fields to fetch only those fields (Firestore select() projection)
         """
+        if self.catalog.ready:
+            return [project(listing, fields) for listing in self.catalog.all(statuses=(status,))]
+        
         try:
             listings_ref = self.db.collection('listings')
             query = listings_ref.where('status', '==', status)
-            docs = query.stream()
-            
-            listings = []
-            for doc in docs:
-                listing = doc.to_dict()
-                listing['id'] = doc.id
-                listings.append(listing)
-            
-            return listings
+            query = apply_projection(query, fields)
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching listings: {e}")
             return []
     
+    async def get_listings_page(
+        self,
+        status: str = "approved",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Page:
+        """
+        Get one page of listings with specified status (cursor pagination)
+        """
+        query = self.db.collection('listings').where('status', '==', status)
+        query = apply_projection(query, fields)
+        return await self._run_paged_query(query, page_size, page_token)
+    
     async def get_listing_by_id(self, listing_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a single listing by ID
         """
+        if self.catalog.ready:
+            return self.catalog.get(listing_id)
+        
         try:
-            doc_ref = self.db.collection('listings').document(listing_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                listing = doc.to_dict()
-                listing['id'] = doc.id
-                return listing
-            return None
+            return await self._get_doc('listings', listing_id)
         except Exception as e:
             print(f"Error fetching listing {listing_id}: {e}")
             return None
@@ -60,31 +142,114 @@ class FirestoreService:
     ) -> List[Dict[str, Any]]:
         """
         Search listings with filters
+        
+        Filters are pushed down to Firestore as far as the deployed indexes
+        allow (see data/query_planner.py); the rest are applied in Python.
         """
         try:
-            query = self.db.collection('listings').where('status', '==', 'approved')
+            plan = self._plan_listing_search(category, location, min_price, max_price)
+            query = plan.apply(self.db.collection('listings'))
+            for field_path, direction in plan.order_by:
+                query = query.order_by(field_path, direction=direction)
             
-            if category:
-                query = query.where('category', '==', category)
-            if location:
-                query = query.where('location', '==', location)
-            if min_price is not None:
-                query = query.where('price', '>=', min_price)
-            if max_price is not None:
-                query = query.where('price', '<=', max_price)
+            listings = await self._run_query(query)
+            return [listing for listing in listings if plan.matches(listing)]
+        except Exception as e:
+            print(f"Error searching listings: {e}")
+            return []
+    
+    async def search_listings_page(
+        self,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+        max_rounds: int = 3,
+        fields: Optional[List[str]] = None
+    ) -> Page:
+        """
+        Search approved listings with filters (cursor pagination)
+        
+        When the plan has post-filters a Firestore page may yield fewer
+        matches than page_size, so up to max_rounds pages are scanned to
+        fill the response. next_page_token resumes right after the last
+        document examined.
+        
+        With fields set, only those fields are returned. The projection
+        also fetches whatever the post-filters and cursor need.
+        """
+        page_size = clamp_page_size(page_size)
+        plan = self._plan_listing_search(category, location, min_price, max_price)
+        
+        if self.catalog.ready:
+            page = self.catalog.query_page(plan.pushed + plan.post_filters, page_size, page_token)
+            return Page(
+                items=[project(listing, fields) for listing in page.items],
+                next_page_token=page.next_page_token
+            )
+        
+        select_fields = merge_fields(
+            fields,
+            [p.field for p in plan.post_filters],
+            [field_path for field_path, _ in plan.order_by]
+        )
+        base_query = apply_projection(plan.apply(self.db.collection('listings')), select_fields)
+        
+        items = []
+        cursor = page_token
+        
+        for _ in range(max_rounds):
+            query = apply_cursor(base_query, page_size, cursor, plan.order_by)
+            try:
+                docs = await run_blocking(query.get)
+            except Exception as e:
+                print(f"Error searching listings page: {e}")
+                return Page(items=items)
             
-            docs = query.stream()
+            has_more = len(docs) > page_size
+            scanned = docs[:page_size]
             
-            listings = []
-            for doc in docs:
+            for position, doc in enumerate(scanned):
                 listing = doc.to_dict()
                 listing['id'] = doc.id
-                listings.append(listing)
+                if plan.matches(listing):
+                    items.append(project(listing, fields))
+                
+                if len(items) == page_size:
+                    more_after = has_more or position < len(scanned) - 1
+                    next_token = cursor_token_for(doc, plan.order_by) if more_after else None
+                    return Page(items=items, next_page_token=next_token)
             
-            return listings
-        except Exception as e:
-            print(f"Error searching listings: {e}")
-            return []
+            if not has_more:
+                return Page(items=items)
+            
+            cursor = cursor_token_for(scanned[-1], plan.order_by)
+        
+        # Page not filled within max_rounds - hand back what we have and resume later
+        return Page(items=items, next_page_token=cursor)
+    
+    def _plan_listing_search(
+        self,
+        category: Optional[str],
+        location: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        status: str = "approved"
+    ) -> QueryPlan:
+        """Build the query plan for the listing search filters"""
+        predicates = [Predicate('status', '==', status)]
+        if category:
+            predicates.append(Predicate('category', '==', category))
+        if location:
+            predicates.append(Predicate('location', '==', location))
+        if min_price is not None:
+            predicates.append(Predicate('price', '>=', min_price))
+        if max_price is not None:
+            predicates.append(Predicate('price', '<=', max_price))
+        
+        return get_query_planner().plan('listings', predicates)
     
     # User Operations
     async def get_user_profile(self, user_id: str, role: str) -> Optional[Dict[str, Any]]:
@@ -93,14 +258,7 @@ class FirestoreService:
         """
         try:
             collection_name = 'travelers' if role == 'traveler' else 'partners'
-            doc_ref = self.db.collection(collection_name).document(user_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                profile = doc.to_dict()
-                profile['id'] = doc.id
-                return profile
-            return None
+            return await self._get_doc(collection_name, user_id)
         except Exception as e:
             print(f"Error fetching user profile: {e}")
             return None
@@ -117,26 +275,39 @@ class FirestoreService:
         """
         return await self.get_user_profile(user_id, 'partner')
     
-    async def get_all_partners(self, status: str = "approved") -> List[Dict[str, Any]]:
+    async def get_all_partners(
+        self,
+        status: str = "approved",
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all partners with specified status
+        
+        Pass fields to fetch only those fields (Firestore select() projection)
         """
         try:
             partners_ref = self.db.collection('partners')
             query = partners_ref.where('status', '==', status)
-            docs = query.stream()
-            
-            partners = []
-            for doc in docs:
-                partner = doc.to_dict()
-                partner['id'] = doc.id
-                partners.append(partner)
-            
-            return partners
+            query = apply_projection(query, fields)
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching partners: {e}")
             return []
     
+    async def get_partners_page(
+        self,
+        status: str = "approved",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Page:
+        """
+        Get one page of partners with specified status (cursor pagination)
+        """
+        query = self.db.collection('partners').where('status', '==', status)
+        query = apply_projection(query, fields)
+        return await self._run_paged_query(query, page_size, page_token)
+    
     # Booking Operations
     async def get_user_bookings(self, user_id: str, role: str = 'traveler') -> List[Dict[str, Any]]:
         """
@@ -146,32 +317,31 @@ class FirestoreService:
             bookings_ref = self.db.collection('bookings')
             field_name = 'travelerId' if role == 'traveler' else 'partnerId'
             query = bookings_ref.where(field_name, '==', user_id)
-            docs = query.stream()
-            
-            bookings = []
-            for doc in docs:
-                booking = doc.to_dict()
-                booking['id'] = doc.id
-                bookings.append(booking)
-            
-            return bookings
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching bookings: {e}")
             return []
     
+    async def get_user_bookings_page(
+        self,
+        user_id: str,
+        role: str = 'traveler',
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of bookings for a user (cursor pagination)
+        """
+        field_name = 'travelerId' if role == 'traveler' else 'partnerId'
+        query = self.db.collection('bookings').where(field_name, '==', user_id)
+        return await self._run_paged_query(query, page_size, page_token)
+    
     async def get_booking_by_id(self, booking_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a single booking by ID
         """
         try:
-            doc_ref = self.db.collection('bookings').document(booking_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                booking = doc.to_dict()
-                booking['id'] = doc.id
-                return booking
-            return None
+            return await self._get_doc('bookings', booking_id)
         except Exception as e:
             print(f"Error fetching booking {booking_id}: {e}")
             return None
@@ -183,19 +353,23 @@ class FirestoreService:
         """
         try:
             query = self.db.collection('listings').where('partnerId', '==', partner_id)
-            docs = query.stream()
-            
-            listings = []
-            for doc in docs:
-                listing = doc.to_dict()
-                listing['id'] = doc.id
-                listings.append(listing)
-            
-            return listings
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching partner listings: {e}")
             return []
     
+    async def get_partner_listings_page(
+        self,
+        partner_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of listings for a specific partner (cursor pagination)
+        """
+        query = self.db.collection('listings').where('partnerId', '==', partner_id)
+        return await self._run_paged_query(query, page_size, page_token)
+    
     # Review Operations
     async def get_reviews(self, listing_id: Optional[str] = None, partner_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -209,19 +383,91 @@ class FirestoreService:
             elif partner_id:
                 query = query.where('partnerId', '==', partner_id)
             
-            docs = query.stream()
-            
-            reviews = []
-            for doc in docs:
-                review = doc.to_dict()
-                review['id'] = doc.id
-                reviews.append(review)
-            
-            return reviews
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching reviews: {e}")
             return []
     
+    async def get_reviews_page(
+        self,
+        listing_id: Optional[str] = None,
+        partner_id: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of reviews for a listing or partner (cursor pagination)
+        """
+        query = self.db.collection('reviews')
+        
+        if listing_id:
+            query = query.where('listingId', '==', listing_id)
+        elif partner_id:
+            query = query.where('partnerId', '==', partner_id)
+        
+        return await self._run_paged_query(query, page_size, page_token)
+    
+    # Streaming Operations (constant memory - documents are yielded as Firestore returns them)
+    async def _stream_query(self, query) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a query's documents as dicts
+        """
+        async for doc in iterate_blocking(query.stream, STREAM_BATCH_SIZE):
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+    
+    async def stream_listings(
+        self,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        fields: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every approved listing matching the filters
+        
+        Same filtering and projection as search_listings_page, without pages.
+        """
+        plan = self._plan_listing_search(category, location, min_price, max_price)
+        
+        if self.catalog.ready:
+            for listing in self.catalog.iter_query(plan.pushed + plan.post_filters):
+                yield project(listing, fields)
+            return
+        
+        select_fields = merge_fields(fields, [p.field for p in plan.post_filters])
+        query = apply_projection(plan.apply(self.db.collection('listings')), select_fields)
+        async for listing in self._stream_query(query):
+            if plan.matches(listing):
+                yield project(listing, fields)
+    
+    async def stream_partners(
+        self,
+        status: str = "approved",
+        fields: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every partner with specified status
+        """
+        query = self.db.collection('partners').where('status', '==', status)
+        async for partner in self._stream_query(apply_projection(query, fields)):
+            yield partner
+    
+    async def stream_partner_listings(self, partner_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every listing of a partner
+        """
+        if self.catalog.ready:
+            for listing in self.catalog.by_partner(partner_id):
+                yield listing
+            return
+        
+        query = self.db.collection('listings').where('partnerId', '==', partner_id)
+        async for listing in self._stream_query(query):
+            yield listing
+    
     # Generic Operations
     async def query_collection(
         self, 
@@ -246,34 +492,25 @@ class FirestoreService:
             if limit:
                 query = query.limit(limit)
             
-            docs = query.stream()
-            
-            results = []
-            for doc in docs:
-                result = doc.to_dict()
-                result['id'] = doc.id
-                results.append(result)
-            
-            return results
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error querying collection {collection}: {e}")
             return []
     
-    async def get_listings_since(self, since_date: datetime) -> List[Dict[str, Any]]:
+    async def get_listings_since(
+        self,
+        since_date: datetime,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get listings updated since a specific date (for auto-sync)
+        Get listings updated since a specific date, any status (for auto-sync)
+        
+        Pass fields to fetch only those fields (Firestore select() projection)
         """
         try:
             query = self.db.collection('listings').where('updatedAt', '>=', since_date)
-            docs = query.stream()
-            
-            listings = []
-            for doc in docs:
-                listing = doc.to_dict()
-                listing['id'] = doc.id
-                listings.append(listing)
-            
-            return listings
+            query = apply_projection(query, fields)
+            return await self._run_query(query)
         except Exception as e:
             print(f"Error fetching listings since {since_date}: {e}")
             return []
@@ -285,11 +522,11 @@ class FirestoreService:
         try:
             if document_id:
                 doc_ref = self.db.collection(collection).document(document_id)
-                doc_ref.set(data)
+                await run_blocking(doc_ref.set, data)
                 return document_id
             else:
-                doc_ref = self.db.collection(collection).add(data)
-                return doc_ref[1].id
+                _, doc_ref = await run_blocking(self.db.collection(collection).add, data)
+                return doc_ref.id
         except Exception as e:
             print(f"Error creating document in {collection}: {e}")
             return None
@@ -300,7 +537,7 @@ class FirestoreService:
         """
         try:
             doc_ref = self.db.collection(collection).document(document_id)
-            doc_ref.update(data)
+            await run_blocking(doc_ref.update, data)
             return True
         except Exception as e:
             print(f"Error updating document {document_id} in {collection}: {e}")
@@ -312,11 +549,43 @@ class FirestoreService:
         """
         try:
             doc_ref = self.db.collection(collection).document(document_id)
-            doc_ref.delete()
+            await run_blocking(doc_ref.delete)
             return True
         except Exception as e:
             print(f"Error deleting document {document_id} from {collection}: {e}")
             return False
+    
+    # Bulk Operations
+    async def bulk_write(
+        self,
+        operations: List[BulkOperation],
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> List[BulkWriteResult]:
+        """
+        Apply many create/set/update/delete operations with a BulkWriter
+        
+        Writes are batched and sent in parallel; each operation gets its
+        own result (in input order) and transient errors are retried.
+        
+        Raises:
+            ValueError: If the operations are malformed (nothing is written)
+        """
+        return await run_blocking(run_bulk_write, self.db, operations, max_attempts)
+    
+    async def bulk_update(
+        self,
+        collection: str,
+        document_ids: List[str],
+        data: Dict[str, Any]
+    ) -> List[BulkWriteResult]:
+        """
+        Apply the same update to many documents
+        """
+        operations = [
+            BulkOperation(op='update', collection=collection, document_id=document_id, data=data)
+            for document_id in document_ids
+        ]
+        return await self.bulk_write(operations)
 
 # Singleton instance
 firestore_service = FirestoreService()
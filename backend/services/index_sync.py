@@ -0,0 +1,231 @@
+"""
+Incremental Knowledge Base Sync
+Diff-based re-indexing of listings in the vector store
+
+Why:
+- incremental_update() found the recently changed listings and then
+  re-embedded the whole catalog anyway
+- Listings that were deleted or un-approved stayed searchable forever
+
+How:
+- The manifest stores a content hash per indexed document ID and a
+  high-water mark (the newest updatedAt already synced). It is a JSON
+  file next to the Chroma data, so a restart resumes where it left off
+- A sync plans against the manifest: changed or new approved listings
+  are upserted, listings that are no longer live are deleted, and
+  unchanged ones are skipped without embedding
+- "Live" is the set of approved listing IDs (from the catalog when it
+  is loaded, otherwise an ID-only query), which is how hard deletes are
+  noticed - they never show up in an updatedAt query
+
+Usage:
+    manifest = IndexManifest.load(path)
+    plan = manifest.plan(changed_listings, live_ids)
+    ... delete plan.deletes, embed plan.upserts ...
+    manifest.commit(plan, high_water_mark)
+    manifest.save()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+LISTING_PREFIX = "listing_"
+LIVE_STATUS = "approved"
+
+
+def listing_document(listing: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Text and metadata embedded for a listing"""
+    text_parts = [
+        f"Title: {listing.get('title', 'N/A')}",
+        f"Description: {listing.get('description', 'N/A')}",
+        f"Category: {listing.get('category', 'N/A')}",
+        f"Location: {listing.get('location', 'N/A')}",
+        f"Price: ${listing.get('price', 0)} {listing.get('currency', 'USD')}",
+    ]
+
+    # Add amenities if available
+    if listing.get('amenities'):
+        text_parts.append(f"Amenities: {', '.join(listing['amenities'])}")
+
+    # Add duration if available
+    if listing.get('duration'):
+        text_parts.append(f"Duration: {listing['duration']}")
+
+    # Add tags if available
+    if listing.get('tags'):
+        text_parts.append(f"Tags: {', '.join(listing['tags'])}")
+
+    metadata = {
+        'id': listing.get('id', ''),
+        'title': listing.get('title', ''),
+        'category': listing.get('category', ''),
+        'location': listing.get('location', ''),
+        'price': listing.get('price', 0),
+        'partnerId': listing.get('partnerId', ''),
+        'type': 'listing'
+    }
+    return "\n".join(text_parts), metadata
+
+
+def content_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Stable hash of everything that ends up in the vector store"""
+    payload = json.dumps([text, metadata], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class IndexedDocument:
+    """One document to embed"""
+    doc_id: str
+    text: str
+    metadata: Dict[str, Any]
+    hash: str
+
+
+@dataclass
+class SyncPlan:
+    """What a sync will change"""
+    upserts: List[IndexedDocument] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)  # live listing IDs never indexed and not fetched
+    unchanged: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'upserted': len(self.upserts),
+            'deleted': len(self.deletes),
+            'unchanged': self.unchanged,
+        }
+
+
+class IndexManifest:
+    """Content hashes of indexed listings plus the sync high-water mark"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hashes: Dict[str, str] = {}
+        self.high_water_mark: Optional[datetime] = None
+
+    @classmethod
+    def load(cls, path: str) -> 'IndexManifest':
+        """Read the manifest (empty if missing or unreadable - the next sync is a full one)"""
+        manifest = cls(path)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            manifest.hashes = dict(data.get('hashes', {}))
+            mark = data.get('high_water_mark')
+            manifest.high_water_mark = datetime.fromisoformat(mark) if mark else None
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Index manifest {path} unreadable, starting over: {e}")
+        return manifest
+
+    def save(self):
+        """Write atomically, so a crash never leaves a half-written manifest"""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        data = {
+            'hashes': self.hashes,
+            'high_water_mark': self.high_water_mark.isoformat() if self.high_water_mark else None,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @property
+    def synced(self) -> bool:
+        """True once a sync has completed (seeded entries alone don't count)"""
+        return self.high_water_mark is not None or any(self.hashes.values())
+
+    def seed(self, doc_ids: Iterable[str]):
+        """Track documents already in the store from before the manifest existed"""
+        for doc_id in doc_ids:
+            self.hashes.setdefault(doc_id, '')
+
+    def plan(self, listings: Iterable[Dict[str, Any]], live_ids: Optional[Set[str]] = None) -> SyncPlan:
+        """
+        Diff fetched listings against the manifest
+
+        Args:
+            listings: Listings changed since the high-water mark (or all of them)
+            live_ids: IDs of every approved listing; indexed documents not in
+                it are deleted. None skips the sweep for hard deletes.
+        """
+        plan = SyncPlan()
+        seen: Set[str] = set()
+
+        for listing in listings:
+            listing_id = listing.get('id')
+            if not listing_id:
+                continue
+            doc_id = LISTING_PREFIX + listing_id
+            seen.add(doc_id)
+
+            live = listing.get('status', LIVE_STATUS) == LIVE_STATUS and (live_ids is None or listing_id in live_ids)
+            if not live:
+                if doc_id in self.hashes:
+                    plan.deletes.append(doc_id)
+                continue
+
+            document = self.diff(listing)
+            if document is None:
+                plan.unchanged += 1
+            else:
+                plan.upserts.append(document)
+
+        if live_ids is not None:
+            live_doc_ids = {LISTING_PREFIX + listing_id for listing_id in live_ids}
+            plan.deletes.extend(self.stale(live_doc_ids | seen))
+            plan.missing = sorted(
+                doc_id[len(LISTING_PREFIX):] for doc_id in live_doc_ids - seen
+                if doc_id not in self.hashes
+            )
+        return plan
+
+    def diff(self, listing: Dict[str, Any]) -> Optional[IndexedDocument]:
+        """The document to embed for a live listing, or None if its content is unchanged"""
+        text, metadata = listing_document(listing)
+        doc_id = LISTING_PREFIX + listing['id']
+        digest = content_hash(text, metadata)
+        if self.hashes.get(doc_id) == digest:
+            return None
+        return IndexedDocument(doc_id, text, metadata, digest)
+
+    def stale(self, keep_doc_ids: Set[str]) -> List[str]:
+        """Indexed documents not in keep_doc_ids"""
+        return [doc_id for doc_id in self.hashes if doc_id not in keep_doc_ids]
+
+    def commit(self, plan: SyncPlan, high_water_mark: Optional[datetime] = None):
+        """Record an applied plan"""
+        for document in plan.upserts:
+            self.hashes[document.doc_id] = document.hash
+        for doc_id in plan.deletes:
+            self.hashes.pop(doc_id, None)
+        if high_water_mark is not None and (self.high_water_mark is None or high_water_mark > self.high_water_mark):
+            self.high_water_mark = high_water_mark
+
+
+def newest_update(listings: Iterable[Dict[str, Any]]) -> Optional[datetime]:
+    """Largest updatedAt among listings (the next high-water mark)"""
+    marks = [listing['updatedAt'] for listing in listings if isinstance(listing.get('updatedAt'), datetime)]
+    return max(marks) if marks else None
@@ -0,0 +1,45 @@
+"""
+NDJSON Streaming Responses
+Newline-delimited JSON for large list endpoints
+
+Clients opt in with `Accept: application/x-ndjson`. Each document is sent
+as one JSON line as soon as it is read, so the first rows arrive
+immediately and server memory stays constant regardless of result size.
+
+If the source fails mid-stream the status code can no longer change, so a
+final {"error": ...} line marks the response as truncated.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True if the client asked for a streamed NDJSON response"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def ndjson_lines(items: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode documents as NDJSON lines"""
+    count = 0
+    try:
+        async for item in items:
+            yield (json.dumps(jsonable_encoder(item)) + "\n").encode("utf-8")
+            count += 1
+    except Exception as e:
+        logger.error(f"NDJSON stream failed after {count} documents: {e}")
+        yield (json.dumps({"error": "stream interrupted", "count": count}) + "\n").encode("utf-8")
+
+
+def ndjson_response(items: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Stream documents to the client as NDJSON"""
+    return StreamingResponse(ndjson_lines(items), media_type=NDJSON_MEDIA_TYPE)
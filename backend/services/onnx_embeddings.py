@@ -0,0 +1,251 @@
+"""
+ONNX Embedding Backend
+Quantized CPU inference for all-MiniLM-L6-v2 sentence embeddings
+
+Why:
+- On CPU-only nodes, encoding through sentence-transformers/PyTorch
+  dominates the latency of the embedding paths (intent classification
+  fallback, semantic search, RAG queries)
+- An ONNX export with int8 dynamic quantization runs the same network
+  through onnxruntime in a fraction of the time and memory
+
+How:
+- export_onnx_model() exports the Hugging Face model to ONNX once and
+  quantizes its weights to int8 (dev machine; needs torch + transformers)
+- OnnxEmbeddings reproduces the sentence-transformers pipeline for this
+  model: WordPiece tokenization truncated at 256 tokens, mean pooling over
+  the attention mask, L2 normalization. It offers the interfaces the
+  callers already use: embed_documents/embed_query (LangChain),
+  encode (SentenceTransformer) and __call__ (Chroma embedding function)
+- EMBEDDING_BACKEND=onnx switches every caller over; anything missing
+  (onnxruntime, the exported model, a different source model) falls back
+  to PyTorch with a warning
+
+Compatibility tolerance:
+Quantized vectors are not bit-identical to the PyTorch ones, so indexes
+built with either backend are queried with the other. The backend is
+acceptable for the existing indexes when, on the benchmark corpus
+(benchmarks/onnx_embeddings.py):
+- cosine similarity to the PyTorch vector of the same text is at least
+  MIN_MEAN_COSINE on average and MIN_COSINE for every text
+- top-k neighbours agree with the PyTorch ones at recall@10 >= MIN_RECALL
+The benchmark exits non-zero when an exported model misses these bounds.
+Rebuild the index if stricter agreement is needed.
+
+Usage:
+    pip install -r requirements-onnx.txt
+    python -m services.onnx_embeddings export ./onnx_models/all-MiniLM-L6-v2-int8
+    EMBEDDING_BACKEND=onnx ONNX_MODEL_DIR=./onnx_models/all-MiniLM-L6-v2-int8
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional dependencies (onnxruntime and tokenizers also come with chromadb)
+try:
+    import onnxruntime as ort  # type: ignore[import-not-found]
+    from tokenizers import Tokenizer  # type: ignore[import-not-found]
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+SOURCE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_MODEL_DIR = "./onnx_models/all-MiniLM-L6-v2-int8"
+MAX_SEQ_LENGTH = 256
+EMBEDDING_DIM = 384
+BATCH_SIZE = 32
+EXPORT_FILE = "export.json"
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+# Compatibility tolerance with the PyTorch vectors (see module docstring)
+MIN_MEAN_COSINE = 0.99
+MIN_COSINE = 0.97
+MIN_RECALL = 0.95
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, normalize: bool = True) -> np.ndarray:
+    """Sentence vectors from token vectors, as the sentence-transformers Pooling + Normalize modules do"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    vectors = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    if normalize:
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return vectors.astype(np.float32)
+
+
+def same_model(a: str, b: str) -> bool:
+    """"all-MiniLM-L6-v2" and "sentence-transformers/all-MiniLM-L6-v2" are the same model"""
+    return a.rsplit('/', 1)[-1] == b.rsplit('/', 1)[-1]
+
+
+class OnnxEmbeddings:
+    """Sentence embeddings from an exported, int8-quantized ONNX model"""
+
+    variant = "onnx-int8"
+    dimension = EMBEDDING_DIM
+
+    def __init__(self, model_dir: str, threads: int = 0, normalize: bool = True):
+        """
+        Args:
+            model_dir: Directory written by export_onnx_model()
+            threads: onnxruntime intra-op threads (0 = one per core)
+            normalize: L2-normalize vectors (all-MiniLM-L6-v2 always does)
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError(
+                "onnxruntime and tokenizers are required for EMBEDDING_BACKEND=onnx. "
+                "Install with: pip install -r requirements-onnx.txt"
+            )
+
+        with open(os.path.join(model_dir, EXPORT_FILE)) as f:
+            self.export_info: Dict[str, Any] = json.load(f)
+        self.model_name = self.export_info['model']
+        self.dimension = self.export_info.get('dimension', EMBEDDING_DIM)
+        self.normalize = normalize
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.export_info.get('max_seq_length', MAX_SEQ_LENGTH))
+        self.tokenizer.enable_padding(pad_id=self.export_info.get('pad_id', 0),
+                                      pad_token=self.export_info.get('pad_token', '[PAD]'))
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE),
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: Sequence[str], convert_to_numpy: bool = True, **_: Any) -> np.ndarray:
+        """float32 array of shape (len(texts), dimension), like SentenceTransformer.encode"""
+        if isinstance(texts, str):
+            return self.encode([texts])[0]
+        batches = [self._encode_batch(texts[i:i + BATCH_SIZE]) for i in range(0, len(texts), BATCH_SIZE)]
+        return np.concatenate(batches) if batches else np.empty((0, self.dimension), dtype=np.float32)
+
+    def _encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': attention_mask,
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(None, {k: v for k, v in feeds.items() if k in self._input_names})[0]
+        return mean_pool(token_embeddings, attention_mask, self.normalize)
+
+    # LangChain Embeddings interface (KnowledgeBaseTrainer, Chroma vector store)
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+    # Chroma embedding function interface (RAGEngine collections)
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.encode(input).tolist()
+
+
+_backend: Optional[OnnxEmbeddings] = None
+_backend_failed = False
+_backend_lock = threading.Lock()
+
+
+def onnx_backend_enabled() -> bool:
+    return os.getenv('EMBEDDING_BACKEND', 'torch').lower() == 'onnx'
+
+
+def get_onnx_embeddings(model_name: str = SOURCE_MODEL) -> Optional[OnnxEmbeddings]:
+    """
+    Shared ONNX backend for model_name when EMBEDDING_BACKEND=onnx
+
+    Returns None - the caller uses PyTorch - when the backend is off, can't
+    be loaded, or was exported from a different model.
+    """
+    global _backend, _backend_failed
+    if not onnx_backend_enabled() or _backend_failed:
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend_failed:
+                return None
+            if _backend is None:
+                model_dir = os.getenv('ONNX_MODEL_DIR', DEFAULT_MODEL_DIR)
+                try:
+                    _backend = OnnxEmbeddings(model_dir, threads=int(os.getenv('ONNX_THREADS', 0)))
+                    logger.info(f"ONNX embedding backend loaded from {model_dir}")
+                except Exception as e:
+                    # onnxruntime reports a corrupt or incompatible model as RuntimeError subclasses
+                    logger.warning(f"ONNX embedding backend unavailable, using PyTorch: {e}")
+                    _backend_failed = True
+                    return None
+    if not same_model(_backend.model_name, model_name):
+        logger.warning(f"ONNX model was exported from {_backend.model_name}, not {model_name} - using PyTorch")
+        return None
+    return _backend
+
+
+def export_onnx_model(output_dir: str, model_name: str = SOURCE_MODEL, opset: int = 14) -> str:
+    """
+    Export model_name to ONNX and quantize it to int8 (dynamic quantization)
+
+    Needs torch, transformers, onnx and onnxruntime (requirements-onnx.txt) -
+    run once on a dev machine and ship the output directory.
+    """
+    import torch  # type: ignore[import-not-found]
+    from onnxruntime.quantization import QuantType, quantize_dynamic  # type: ignore[import-not-found]
+    from transformers import AutoModel, AutoTokenizer  # type: ignore[import-not-found]
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILE))
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["export sample"], return_tensors='pt')
+    input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+    fp32_path = os.path.join(output_dir, "model_fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']},
+            opset_version=opset
+        )
+
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    with open(os.path.join(output_dir, EXPORT_FILE), 'w') as f:
+        json.dump({
+            'model': model_name,
+            'quantization': 'dynamic-int8',
+            'max_seq_length': MAX_SEQ_LENGTH,
+            'dimension': model.config.hidden_size,
+            'pad_id': tokenizer.pad_token_id,
+            'pad_token': tokenizer.pad_token,
+            'opset': opset,
+        }, f, indent=2)
+    return model_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "export":
+        print("Usage: python -m services.onnx_embeddings export <output_dir> [model_name]")
+        sys.exit(1)
+    path = export_onnx_model(sys.argv[2], *(sys.argv[3:4]))
+    print(f"✅ Quantized ONNX model written to {path}")
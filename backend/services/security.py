@@ -262,8 +262,9 @@ async def detailed_health_check() -> Dict[str, Any]:
     
     # Check ChromaDB
     try:
-        from services.ai.embeddings import get_embeddings_service
-        embeddings = get_embeddings_service()
+        from services.ai import embeddings
+        if embeddings.knowledge_base is None:
+            raise RuntimeError("Knowledge base not loaded")
         health_status["checks"]["vector_db"] = {
             "status": "healthy",
             "message": "ChromaDB operational"
@@ -0,0 +1,223 @@
+"""
+Semantic Result Cache
+Reuses vector search results for queries that mean the same thing
+
+Why:
+- "beach resorts galle" and "Galle beach resort" each paid for an
+  embedding and a full vector search, and return the same listings
+- Exact-text caching misses these; comparing query embeddings catches them
+
+How:
+- Entries are keyed on the normalized query embedding, per scope (filter
+  and k - results for k=5 can't answer k=10)
+- A query within `max_distance` cosine distance of a cached query reuses
+  its results; identical query text is found without embedding at all
+- Every entry belongs to an index version; when the vector index is
+  retrained the version changes and all entries are dropped
+- A sample of hits (`verify_rate`) is re-run against the index and
+  compared, so false hits - a neighbouring query whose results differ -
+  are measured instead of guessed
+
+Usage:
+    cache = SemanticCache(max_distance=0.05)
+    hit = cache.get_text(query, scope, version)
+    if hit is None:
+        vector = embed(query)
+        hit = cache.get(vector, scope, version)
+    ...
+    cache.put(query, vector, scope, version, results)
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_DISTANCE = 0.05
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_VERIFY_RATE = 0.05
+
+
+def normalize_query(query: str) -> str:
+    """Case and whitespace don't change the meaning of a query"""
+    return " ".join(query.lower().split())
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class _Scope:
+    """Cached queries of one scope, with their vectors stacked for matching"""
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[np.ndarray, Any]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+
+    def matrix(self) -> Tuple[List[str], np.ndarray]:
+        if self._matrix is None:
+            self._keys = list(self.entries.keys())
+            self._matrix = np.stack([vector for vector, _ in self.entries.values()])
+        return self._keys, self._matrix
+
+    def put(self, text: str, vector: np.ndarray, results: Any):
+        self.entries[text] = (vector, results)
+        self._matrix = None
+
+    def remove(self, text: str):
+        self.entries.pop(text, None)
+        self._matrix = None
+
+
+class SemanticCache:
+    """
+    Nearest-query result cache for vector search
+
+    Thread-safe: the agent tools call search from worker threads.
+    """
+
+    def __init__(
+        self,
+        max_distance: float = DEFAULT_MAX_DISTANCE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        verify_rate: float = DEFAULT_VERIFY_RATE,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            max_distance: Largest cosine distance (1 - similarity) that counts as the same query
+            max_entries: Entries kept across all scopes (oldest dropped first)
+            verify_rate: Fraction of hits re-run to measure false hits
+            seed: Seed for hit sampling (tests)
+        """
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.verify_rate = verify_rate
+        self.version: Optional[Hashable] = None
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.false_hits = 0
+        self.invalidations = 0
+
+        self._scopes: Dict[Hashable, _Scope] = {}
+        self._order: "OrderedDict[Tuple[Hashable, str], None]" = OrderedDict()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Lookup
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def get_text(self, query: str, scope: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Results cached for this exact query text (no embedding needed)
+
+        Returns None on a miss without counting it - the caller goes on to
+        get() with the embedding, which records the outcome.
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._scopes.get(scope)
+            text = normalize_query(query)
+            if entry is None or text not in entry.entries:
+                return None
+            self.exact_hits += 1
+            self._touch(scope, text)
+            return entry.entries[text][1]
+
+    def get(self, vector: Sequence[float], scope: Hashable, version: Hashable) -> Optional[Any]:
+        """Results of the nearest cached query within max_distance, or None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._scopes.get(scope)
+            if entry is None or not entry.entries:
+                self.misses += 1
+                return None
+
+            keys, matrix = entry.matrix()
+            similarities = matrix @ _unit(vector)
+            best = int(np.argmax(similarities))
+            if 1.0 - float(similarities[best]) > self.max_distance:
+                self.misses += 1
+                return None
+
+            self.near_hits += 1
+            self._touch(scope, keys[best])
+            return entry.entries[keys[best]][1]
+
+    def put(self, query: str, vector: Sequence[float], scope: Hashable, version: Hashable, results: Any):
+        """Cache results of a query that was actually searched"""
+        with self._lock:
+            self._check_version(version)
+            text = normalize_query(query)
+            self._scopes.setdefault(scope, _Scope()).put(text, _unit(vector), results)
+            self._touch(scope, text)
+            while len(self._order) > self.max_entries:
+                (old_scope, old_text), _ = self._order.popitem(last=False)
+                self._scopes[old_scope].remove(old_text)
+                if not self._scopes[old_scope].entries:
+                    del self._scopes[old_scope]
+
+    def _touch(self, scope: Hashable, text: str):
+        self._order[(scope, text)] = None
+        self._order.move_to_end((scope, text))
+
+    def _check_version(self, version: Hashable):
+        if version != self.version:
+            if self._order:
+                self.invalidations += 1
+            self._scopes.clear()
+            self._order.clear()
+            self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+            self._order.clear()
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Instrumentation
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    def should_verify(self) -> bool:
+        """Whether to re-run this hit against the index"""
+        with self._lock:
+            return self._rng.random() < self.verify_rate
+
+    def record_verification(self, cached_ids: Sequence[Any], actual_ids: Sequence[Any]) -> bool:
+        """Compare a hit with a real search; returns True if it was a false hit"""
+        false_hit = list(cached_ids) != list(actual_ids)
+        with self._lock:
+            self.verified += 1
+            if false_hit:
+                self.false_hits += 1
+        return false_hit
+
+    def stats(self) -> Dict[str, Any]:
+        """Telemetry for the search stats endpoint"""
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            lookups = hits + self.misses
+            return {
+                'entries': len(self._order),
+                'max_entries': self.max_entries,
+                'max_distance': self.max_distance,
+                'index_version': self.version,
+                'hits': hits,
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+                'verified': self.verified,
+                'false_hits': self.false_hits,
+                'false_hit_rate': round(self.false_hits / self.verified, 4) if self.verified else 0.0,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,148 @@
+"""
+Unit Tests for the Booking Interval Index
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from data import FirestoreRepository, Listing, Booking
+from data.booking_index import BookingIndex
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+DAY = timedelta(days=1)
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def change(kind, booking_id, listing_id='l1', start=0, nights=2, status='confirmed', update_time=None):
+    data = {'listing_id': listing_id, 'start_date': T0 + start * DAY,
+            'end_date': T0 + (start + nights) * DAY, 'status': status}
+    document = SimpleNamespace(id=booking_id, to_dict=lambda: dict(data), update_time=update_time)
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+@pytest.fixture
+def index():
+    index = BookingIndex()
+    index.apply_changes([
+        change('ADDED', 'b1', start=0, nights=2),     # Mar 1-3
+        change('ADDED', 'b2', start=5, nights=10),    # Mar 6-16
+        change('ADDED', 'b3', start=20, nights=1),    # Mar 21-22
+        change('ADDED', 'other', listing_id='l2', start=0, nights=30),
+    ])
+    return index
+
+# ============================================================
+# Overlap Queries
+# ============================================================
+
+class TestOverlapping:
+    """Half-open intervals, same semantics as the Firestore scan"""
+
+    def test_finds_long_booking_starting_before_window(self, index):
+        assert index.overlapping('l1', T0 + 12 * DAY, T0 + 13 * DAY) == ['b2']
+
+    def test_touching_dates_do_not_conflict(self, index):
+        assert index.overlapping('l1', T0 + 2 * DAY, T0 + 5 * DAY) == []
+
+    def test_spanning_window_finds_all(self, index):
+        assert index.overlapping('l1', T0, T0 + 30 * DAY) == ['b1', 'b2', 'b3']
+
+    def test_naive_dates_treated_as_utc(self, index):
+        naive = T0.replace(tzinfo=None)
+        assert index.overlapping('l1', naive + DAY, naive + 2 * DAY) == ['b1']
+
+    def test_matches_linear_scan(self):
+        index = BookingIndex()
+        spans = [(i * 3 % 40, 1 + i % 7) for i in range(60)]
+        index.apply_changes([change('ADDED', f"b{i}", start=s, nights=n) for i, (s, n) in enumerate(spans)])
+
+        for day in range(45):
+            start, end = T0 + day * DAY, T0 + (day + 2) * DAY
+            expected = {f"b{i}" for i, (s, n) in enumerate(spans)
+                        if not (end <= T0 + s * DAY or start >= T0 + (s + n) * DAY)}
+            assert set(index.overlapping('l1', start, end)) == expected
+
+# ============================================================
+# Change Feed
+# ============================================================
+
+class TestApplyChanges:
+    """Listener updates keep the index current"""
+
+    def test_cancelled_booking_leaves_index(self, index):
+        index.apply_changes([change('REMOVED', 'b2')])
+
+        assert index.overlapping('l1', T0 + 12 * DAY, T0 + 13 * DAY) == []
+        assert index.version == 2
+
+    def test_moved_booking_reindexed(self, index):
+        index.apply_changes([change('MODIFIED', 'b1', start=25, nights=2)])
+
+        assert index.overlapping('l1', T0, T0 + 3 * DAY) == []
+        assert index.overlapping('l1', T0 + 25 * DAY, T0 + 26 * DAY) == ['b1']
+
+    def test_older_version_ignored(self):
+        index = BookingIndex()
+        index.apply_changes([change('ADDED', 'b1', start=0, update_time=T0 + 2 * DAY)])
+
+        index.apply_changes([change('MODIFIED', 'b1', start=10, update_time=T0 + DAY)])
+
+        assert index.overlapping('l1', T0, T0 + DAY) == ['b1']
+        assert index.stats()['stale_updates'] == 1
+
+    def test_not_ready_when_watch_inactive(self, index):
+        assert index.ready
+        index._watch = SimpleNamespace(is_active=False)
+        assert not index.ready
+
+# ============================================================
+# Repository Integration
+# ============================================================
+
+class TestCheckAvailability:
+    """FirestoreRepository answers from the index, or verifies it"""
+
+    @pytest.fixture
+    def repo_factory(self, index):
+        def make(verify):
+            repo = FirestoreRepository(firestore_db=None, booking_index=index, verify_availability=verify)
+            repo.scans = 0
+
+            async def get_listing(listing_id):
+                return Listing(id=listing_id, title='t', description='', location='Galle',
+                               price=1.0, category='tour', partner_id='p1')
+
+            async def get_bookings_for_listing(listing_id, status_filter=None, **kwargs):
+                repo.scans += 1
+                return [Booking('b2', 'l1', 'u1', T0 + 5 * DAY, T0 + 15 * DAY)]
+
+            repo.get_listing = get_listing
+            repo.get_bookings_for_listing = get_bookings_for_listing
+            return repo
+        return make
+
+    @pytest.mark.asyncio
+    async def test_index_answers_without_firestore(self, repo_factory):
+        repo = repo_factory(verify=False)
+
+        result = await repo.check_availability('l1', T0 + 6 * DAY, T0 + 8 * DAY)
+
+        assert not result.available
+        assert result.conflicting_bookings == ['b2']
+        assert repo.scans == 0
+
+    @pytest.mark.asyncio
+    async def test_verify_mode_counts_mismatches(self, repo_factory, index):
+        repo = repo_factory(verify=True)
+
+        await repo.check_availability('l1', T0 + 6 * DAY, T0 + 8 * DAY)
+        result = await repo.check_availability('l1', T0, T0 + DAY)  # index has b1, "Firestore" doesn't
+
+        assert result.available
+        assert repo.scans == 2
+        assert index.stats()['verified'] == 2
+        assert index.stats()['mismatches'] == 1
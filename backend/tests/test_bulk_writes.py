@@ -0,0 +1,153 @@
+"""
+Unit Tests for Bulk Writes
+run_bulk_write against a scripted BulkWriter fake
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from data.bulk_writes import (
+    BulkOperation, run_bulk_write, summarize, MAX_BULK_OPERATIONS
+)
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class FakeRef:
+    def __init__(self, collection, doc_id):
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self._name = name
+        self._generated = 0
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            self._generated += 1
+            doc_id = f"auto{self._generated}"
+        return FakeRef(self._name, doc_id)
+
+
+class FakeBulkWriter:
+    """Fails each document with the scripted gRPC codes before succeeding"""
+
+    def __init__(self, script):
+        self._script = script
+        self.sent = []
+
+    def on_write_result(self, callback):
+        self._on_success = callback
+
+    def on_write_error(self, callback):
+        self._on_error = callback
+
+    def _write(self, op, reference):
+        self.sent.append((op, reference.path))
+        failures = list(self._script.get(reference.path, []))
+        attempts = 0
+        while True:
+            attempts += 1
+            if not failures:
+                self._on_success(reference, None, self)
+                return
+            code = failures.pop(0)
+            failure = SimpleNamespace(
+                operation=SimpleNamespace(reference=reference),
+                code=code,
+                message=f"code {code}",
+                attempts=attempts,
+            )
+            if not self._on_error(failure, self):
+                return
+
+    def create(self, reference, data):
+        self._write('create', reference)
+
+    def set(self, reference, data, merge=False):
+        self._write('set', reference)
+
+    def update(self, reference, data):
+        self._write('update', reference)
+
+    def delete(self, reference):
+        self._write('delete', reference)
+
+    def close(self):
+        pass
+
+
+class FakeDb:
+    def __init__(self, script=None):
+        self.writer = FakeBulkWriter(script or {})
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+    def bulk_writer(self):
+        return self.writer
+
+# ============================================================
+# Results & Retries
+# ============================================================
+
+class TestRunBulkWrite:
+    """Per-item results, retries and validation"""
+
+    def test_results_follow_input_order(self):
+        db = FakeDb()
+        ops = [
+            BulkOperation('update', 'partners', 'p2', {'status': 'approved'}),
+            BulkOperation('delete', 'listings', 'l1'),
+            BulkOperation('create', 'listings', data={'title': 'New'}),
+        ]
+
+        results = run_bulk_write(db, ops)
+
+        assert [r.document_id for r in results] == ['p2', 'l1', 'auto1']
+        assert all(r.success for r in results)
+
+    def test_transient_errors_are_retried(self):
+        db = FakeDb({'partners/p1': [14, 10]})  # UNAVAILABLE, ABORTED, then OK
+
+        [result] = run_bulk_write(db, [BulkOperation('update', 'partners', 'p1', {'status': 'approved'})])
+
+        assert result.success
+
+    def test_permanent_error_fails_only_that_item(self):
+        db = FakeDb({'partners/missing': [5]})  # NOT_FOUND
+        ops = [
+            BulkOperation('update', 'partners', 'p1', {'status': 'approved'}),
+            BulkOperation('update', 'partners', 'missing', {'status': 'approved'}),
+        ]
+
+        results = run_bulk_write(db, ops)
+
+        assert [r.success for r in results] == [True, False]
+        assert results[1].error == 'code 5'
+        assert summarize(results) == {'total': 2, 'succeeded': 1, 'failed': 1}
+
+    def test_retries_stop_at_max_attempts(self):
+        db = FakeDb({'partners/p1': [14] * 10})
+
+        [result] = run_bulk_write(db, [BulkOperation('update', 'partners', 'p1', {'a': 1})], max_attempts=3)
+
+        assert not result.success
+        assert result.attempts == 3
+
+    def test_invalid_requests_write_nothing(self):
+        db = FakeDb()
+        with pytest.raises(ValueError):
+            run_bulk_write(db, [
+                BulkOperation('update', 'partners', 'p1', {'a': 1}),
+                BulkOperation('update', 'partners', 'p1', {'a': 2}),
+            ])
+        with pytest.raises(ValueError):
+            run_bulk_write(db, [BulkOperation('update', 'partners', 'p1')])
+        with pytest.raises(ValueError):
+            run_bulk_write(db, [BulkOperation('delete', 'partners', f"p{i}") for i in range(MAX_BULK_OPERATIONS + 1)])
+
+        assert db.writer.sent == []
@@ -0,0 +1,135 @@
+"""
+Unit Tests for Size-Aware Metered Caches
+"""
+
+import pytest
+
+from data import CachedRepository, Listing
+from data.cache_metrics import MeteredTTLCache, estimate_size
+from data.memory_repository import InMemoryRepository
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+def make_listing(listing_id, description=""):
+    return Listing(
+        id=listing_id, title=f"Listing {listing_id}", description=description, location='Galle',
+        price=100.0, category='tour', partner_id='p1', status='approved',
+    )
+
+# ============================================================
+# Sizing
+# ============================================================
+
+class TestEstimateSize:
+    """Deep size grows with content"""
+
+    def test_long_description_costs_more(self):
+        assert estimate_size(make_listing('a', 'x' * 5000)) > estimate_size(make_listing('a')) + 4000
+
+    def test_list_counts_its_items(self):
+        listings = [make_listing(str(i), f"description {i} " * 50) for i in range(10)]
+        assert estimate_size(listings) > 1.8 * estimate_size(listings[:5])
+
+    def test_shared_objects_counted_once(self):
+        listing = make_listing('a', 'x' * 5000)
+        assert estimate_size([listing, listing]) < 2 * estimate_size(listing)
+
+# ============================================================
+# Budget and Counters
+# ============================================================
+
+class TestMeteredTTLCache:
+    """Byte budget drives eviction"""
+
+    def test_evicts_when_budget_exceeded(self):
+        cache = MeteredTTLCache('test', budget_bytes=1000, ttl=60, getsizeof=len)
+
+        cache['a'] = 'x' * 400
+        cache['b'] = 'x' * 400
+        cache['c'] = 'x' * 400
+
+        assert 'a' not in cache
+        assert cache.currsize == 800
+        assert cache.evictions == 1
+
+    def test_oversized_value_rejected_not_raised(self):
+        cache = MeteredTTLCache('test', budget_bytes=100, ttl=60, getsizeof=len)
+
+        cache['big'] = 'x' * 500
+
+        assert 'big' not in cache
+        assert cache.rejected == 1
+
+    def test_oversized_refresh_drops_previous_value(self):
+        cache = MeteredTTLCache('test', budget_bytes=100, ttl=60, getsizeof=len)
+        cache['k'] = 'x' * 50
+
+        cache['k'] = 'x' * 500
+
+        assert 'k' not in cache
+        assert cache.currsize == 0
+        assert cache.rejected == 1
+
+    def test_clear_is_not_an_eviction(self):
+        cache = MeteredTTLCache('test', budget_bytes=1000, ttl=60, getsizeof=len)
+        cache['a'] = 'x'
+
+        cache.clear()
+
+        assert cache.evictions == 0
+
+# ============================================================
+# Repository Telemetry
+# ============================================================
+
+class TestRepositoryStats:
+    """Stats are reported per cache"""
+
+    @pytest.mark.asyncio
+    async def test_per_cache_counters(self):
+        base = InMemoryRepository()
+        base.put_listing(make_listing('l1'))
+        repo = CachedRepository(base)
+
+        await repo.get_listing('l1')
+        await repo.get_listing('l1')
+        await repo.get_user_preferences('nobody')
+
+        stats = repo._get_cache_stats()
+        assert stats['caches']['listing']['hits'] == 1
+        assert stats['caches']['listing']['misses'] == 1
+        assert stats['caches']['listing']['bytes'] > 0
+        assert stats['caches']['prefs']['misses'] == 1
+        assert stats['totals']['hit_ratio'] == pytest.approx(1 / 3, abs=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_budget_bounds_memory(self):
+        base = InMemoryRepository()
+        for i in range(50):
+            base.put_listing(make_listing(f"l{i}", 'x' * 2000))
+        repo = CachedRepository(base, memory_budgets={'listing': 20_000})
+
+        for i in range(50):
+            await repo.get_listing(f"l{i}")
+
+        stats = repo._get_cache_stats()['caches']['listing']
+        assert stats['bytes'] <= 20_000
+        assert stats['evictions'] > 0
+
+    @pytest.mark.asyncio
+    async def test_stale_copies_share_the_budget(self):
+        base = InMemoryRepository()
+        for i in range(50):
+            base.put_listing(make_listing(f"l{i}", 'x' * 2000))
+        repo = CachedRepository(base, memory_budgets={'listing': 20_000}, stale_windows={'listing': 10})
+
+        for i in range(50):
+            await repo.get_listing(f"l{i}")
+
+        stats = repo._get_cache_stats()
+        listing_bytes = stats['caches']['listing']['bytes'] + stats['caches']['listing_stale']['bytes']
+        assert stats['caches']['listing_stale']['bytes'] > 0
+        assert listing_bytes <= 20_000
+        assert stats['totals']['bytes'] >= listing_bytes
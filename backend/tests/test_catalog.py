@@ -0,0 +1,196 @@
+"""
+Unit Tests for the Listing Catalog
+Replica behaviour driven by fake snapshot changes
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from data import FirestoreRepository, SearchFilters
+from data.catalog import ListingCatalog
+from data.pagination import decode_page_token, encode_page_token, MAX_PAGE_SIZE
+from data.query_planner import Predicate
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def change(kind, doc_id, **data):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=FakeDoc(doc_id, data))
+
+
+def listing(doc_id, **overrides):
+    data = {
+        'title': f"Listing {doc_id}",
+        'partnerId': 'p1',
+        'category': 'tour',
+        'location': 'Kandy',
+        'price': 100,
+        'status': 'approved',
+        'available': True,
+        'tags': ['culture'],
+    }
+    data.update(overrides)
+    return change('ADDED', doc_id, **data)
+
+
+@pytest.fixture
+def catalog():
+    catalog = ListingCatalog()
+    catalog.apply_changes([
+        listing('a'),
+        listing('b', category='accommodation', location='Galle', tags=['beach']),
+        listing('c', partnerId='p2', status='pending'),
+        listing('d', price=300, tags=['culture', 'hiking']),
+    ])
+    return catalog
+
+# ============================================================
+# Replica Updates
+# ============================================================
+
+class TestCatalogUpdates:
+    """Snapshot changes keep the replica and its indexes current"""
+
+    def test_initial_snapshot_marks_ready(self, catalog):
+        assert catalog.ready
+        assert catalog.version == 1
+        assert len(catalog) == 4
+
+    def test_modified_document_is_reindexed(self, catalog):
+        catalog.apply_changes([change('MODIFIED', 'a', title='Moved', location='Galle', status='approved')])
+
+        assert catalog.version == 2
+        assert [l['id'] for l in catalog.by_location('Kandy')] == ['c', 'd']
+        assert [l['id'] for l in catalog.by_location('Galle')] == ['a', 'b']
+        assert catalog.by_tag('culture', statuses=('approved',))[0]['id'] == 'd'
+
+    def test_removed_document_leaves_indexes(self, catalog):
+        catalog.apply_changes([change('REMOVED', 'b')])
+
+        assert catalog.get('b') is None
+        assert catalog.by_tag('beach') == []
+        assert catalog.by_category('accommodation') == []
+
+    def test_readers_get_copies(self, catalog):
+        catalog.get('a')['title'] = 'mutated'
+        assert catalog.get('a')['title'] == 'Listing a'
+
+# ============================================================
+# Lookups & Queries
+# ============================================================
+
+class TestCatalogQueries:
+    """Indexed lookups and predicate queries"""
+
+    def test_by_partner_with_statuses(self, catalog):
+        assert [l['id'] for l in catalog.by_partner('p1')] == ['a', 'b', 'd']
+        assert [l['id'] for l in catalog.by_partner('p2', statuses=('approved',))] == []
+
+    def test_query_applies_all_predicates(self, catalog):
+        results = catalog.query([
+            Predicate('status', '==', 'approved'),
+            Predicate('category', '==', 'tour'),
+            Predicate('price', '<=', 200),
+        ])
+        assert [l['id'] for l in results] == ['a']
+
+    def test_query_page_tokens(self, catalog):
+        predicates = [Predicate('partnerId', '==', 'p1')]
+
+        first = catalog.query_page(predicates, page_size=2)
+        assert [l['id'] for l in first.items] == ['a', 'b']
+        assert decode_page_token(first.next_page_token) == ['b']
+
+        second = catalog.query_page(predicates, page_size=2, page_token=first.next_page_token)
+        assert [l['id'] for l in second.items] == ['d']
+        assert second.next_page_token is None
+
+    def test_query_page_tokens_match_firestore_cursor_shape(self, catalog):
+        predicates = [Predicate('partnerId', '==', 'p1')]
+        order_by = [('price', 'ASCENDING')]
+
+        first = catalog.query_page(predicates, page_size=2, order_by=order_by)
+        assert decode_page_token(first.next_page_token, expected_length=2) == [100, 'b']
+
+        # A cursor issued by the Firestore path resumes after its document ID
+        firestore_token = encode_page_token([100, 'a'])
+        resumed = catalog.query_page(predicates, page_size=2, page_token=firestore_token, order_by=order_by)
+        assert [l['id'] for l in resumed.items] == ['b', 'd']
+
+    def test_iter_query_is_lazy(self):
+        catalog = ListingCatalog()
+        catalog.apply_changes([listing(f"l{i:04d}") for i in range(1000)])
+
+        results = catalog.iter_query([Predicate('status', '==', 'approved')])
+        first = next(results)
+        catalog.apply_changes([change('REMOVED', 'l0999')])
+
+        assert first['id'] == 'l0000'
+        assert len(list(results)) == 998
+
+    def test_sorted_views_follow_changes(self, catalog):
+        predicates = [Predicate('partnerId', '==', 'p1')]
+        catalog.query(predicates)
+
+        catalog.apply_changes([listing('aa'), change('REMOVED', 'b')])
+
+        assert [l['id'] for l in catalog.query(predicates)] == ['a', 'aa', 'd']
+        assert [l['id'] for l in catalog.iter_query([], after='c')] == ['d']
+
+# ============================================================
+# Repository Integration
+# ============================================================
+
+class TestCatalogBackedRepository:
+    """FirestoreRepository serves listing reads from a ready catalog"""
+
+    @pytest.mark.asyncio
+    async def test_reads_never_touch_firestore(self, catalog):
+        repo = FirestoreRepository(firestore_db=None, catalog=catalog)
+
+        listing_a = await repo.get_listing('a')
+        batch = await repo.get_listings_batch(['d', 'missing', 'a'])
+        page = await repo.get_listings_page(SearchFilters(location='Kandy'), page_size=10)
+
+        assert listing_a.title == 'Listing a'
+        assert [l.id for l in batch] == ['d', 'a']
+        assert [l.id for l in page.items] == ['a', 'd']
+
+    @pytest.mark.asyncio
+    async def test_limit_above_page_size_not_truncated(self):
+        catalog = ListingCatalog()
+        catalog.apply_changes([listing(f"l{i:03d}") for i in range(MAX_PAGE_SIZE + 50)])
+        repo = FirestoreRepository(firestore_db=None, catalog=catalog)
+
+        listings = await repo.get_listings(SearchFilters(), limit=MAX_PAGE_SIZE + 20)
+
+        assert len(listings) == MAX_PAGE_SIZE + 20
+
+    @pytest.mark.asyncio
+    async def test_zero_limit_returns_nothing(self, catalog):
+        repo = FirestoreRepository(firestore_db=None, catalog=catalog)
+
+        assert await repo.get_listings(SearchFilters(), limit=0) == []
+        assert await repo.get_listings(SearchFilters(), limit=-5, offset=3) == []
+
+    def test_dead_listener_falls_back_to_firestore(self, catalog):
+        catalog._watch = SimpleNamespace(is_active=False)
+        repo = FirestoreRepository(firestore_db=None, catalog=catalog)
+
+        assert not catalog.ready
+        assert not repo._use_catalog()
+
+    @pytest.mark.asyncio
+    async def test_unready_catalog_is_ignored(self):
+        repo = FirestoreRepository(firestore_db=None, catalog=ListingCatalog())
+        assert not repo._use_catalog()
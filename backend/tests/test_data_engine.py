@@ -0,0 +1,155 @@
+"""
+Unit Tests for the Deterministic Data Engine
+System metrics come from server-side aggregation queries, cached per time range
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from cachetools import TTLCache
+
+pytest.importorskip("langchain_community")
+
+# services.firestore_service connects on import; tests have no credentials
+with patch('config.firebase_admin.get_firestore_client', return_value=Mock()):
+    from services.ai.hybrid.data_engine import DeterministicDataEngine, TimeRange
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class FakeAggregation:
+    def __init__(self, query, kind, field_path):
+        self.query = query
+        self.kind = kind
+        self.field_path = field_path
+
+    def get(self):
+        self.query.db.executed.append((self.query.name, self.kind, self.field_path, self.query.filters))
+        value = self.query.db.values.get((self.query.name, self.kind))
+        return [[SimpleNamespace(alias="value", value=value)]] if value is not None else []
+
+
+class FakeQuery:
+    """Collection/query supporting where() and the count()/sum() aggregations"""
+
+    def __init__(self, db, name, filters=()):
+        self.db = db
+        self.name = name
+        self.filters = filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.db, self.name, self.filters + ((field, op),))
+
+    def count(self, alias=None):
+        return FakeAggregation(self, "count", None)
+
+    def sum(self, field_path, alias=None):
+        return FakeAggregation(self, "sum", field_path)
+
+
+class FakeDB:
+    """Firestore client stand-in; logs every aggregation it runs"""
+
+    def __init__(self, values):
+        self.values = values
+        self.executed = []
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def db():
+    return FakeDB({
+        ("users", "count"): 120,
+        ("partners", "count"): 8,
+        ("listings", "count"): 45,
+        ("bookings", "count"): 17,
+        ("bookings", "sum"): 2450.5,
+    })
+
+
+@pytest.fixture
+def engine(db):
+    return DeterministicDataEngine(db)
+
+# ============================================================
+# Aggregation
+# ============================================================
+
+class TestAggregate:
+    """Counts and sums run as aggregation queries"""
+
+    @pytest.mark.asyncio
+    async def test_count(self, engine, db):
+        assert await engine._aggregate(db.collection("users"), "count") == 120
+        assert db.executed == [("users", "count", None, ())]
+
+    @pytest.mark.asyncio
+    async def test_sum(self, engine, db):
+        assert await engine._aggregate(db.collection("bookings"), "sum", "totalPrice") == 2450.5
+        assert db.executed[0][1:3] == ("sum", "totalPrice")
+
+    @pytest.mark.asyncio
+    async def test_empty_result_is_zero(self, engine, db):
+        assert await engine._aggregate(db.collection("reviews"), "count") == 0
+
+# ============================================================
+# System metrics
+# ============================================================
+
+class TestSystemMetrics:
+    """Five aggregations per time range, then served from the TTL cache"""
+
+    @pytest.mark.asyncio
+    async def test_gathers_metrics(self, engine, db):
+        metrics, start_date, end_date = await engine._get_system_metrics(TimeRange.LAST_30_DAYS)
+
+        assert metrics == {
+            "total_users": 120,
+            "total_partners": 8,
+            "total_listings": 45,
+            "total_bookings": 17,
+            "total_revenue": 2450.5,
+        }
+        assert start_date < end_date
+        assert len(db.executed) == 5
+
+    @pytest.mark.asyncio
+    async def test_bookings_and_revenue_filtered_by_range(self, engine, db):
+        await engine._get_system_metrics(TimeRange.LAST_7_DAYS)
+
+        filters = {(name, kind): query_filters for name, kind, _, query_filters in db.executed}
+        assert filters[("bookings", "count")] == (("createdAt", ">="), ("createdAt", "<="))
+        assert filters[("bookings", "sum")] == (("status", "in"), ("createdAt", ">="), ("createdAt", "<="))
+
+    @pytest.mark.asyncio
+    async def test_second_call_within_ttl_issues_no_queries(self, engine, db):
+        first = await engine._get_system_metrics(TimeRange.LAST_30_DAYS)
+        db.executed.clear()
+
+        assert await engine._get_system_metrics(TimeRange.LAST_30_DAYS) == first
+        assert db.executed == []
+
+    @pytest.mark.asyncio
+    async def test_cached_per_time_range(self, engine, db):
+        await engine._get_system_metrics(TimeRange.LAST_30_DAYS)
+        db.executed.clear()
+
+        await engine._get_system_metrics(TimeRange.LAST_7_DAYS)
+
+        assert len(db.executed) == 5
+
+    @pytest.mark.asyncio
+    async def test_requeried_after_ttl(self, engine, db):
+        clock = [0.0]
+        engine._metrics_cache = TTLCache(maxsize=len(TimeRange), ttl=60, timer=lambda: clock[0])
+        await engine._get_system_metrics(TimeRange.LAST_30_DAYS)
+        db.executed.clear()
+
+        clock[0] = 61.0
+        await engine._get_system_metrics(TimeRange.LAST_30_DAYS)
+
+        assert len(db.executed) == 5
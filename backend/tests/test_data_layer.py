@@ -0,0 +1,468 @@
+"""
+Unit Tests for the Data Layer
+Repository behaviour tested against a minimal in-process Firestore fake
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from data import FirestoreRepository, CachedRepository, Listing, InvalidPageToken, ChangeEvent, SearchFilters
+from data.pagination import (
+    encode_page_token, decode_page_token, build_page, clamp_page_size, MAX_PAGE_SIZE
+)
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class FakeSnapshot:
+    """Minimal DocumentSnapshot"""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentRef:
+    def __init__(self, store, collection, doc_id):
+        self._store = store
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        self._store.reads += 1
+        return FakeSnapshot(self.id, self._store.data[self._collection].get(self.id))
+
+
+class FakeQuery:
+    """Equality filters and limit over one collection"""
+
+    def __init__(self, store, name, filters=(), limit=None):
+        self._store = store
+        self._name = name
+        self._filters = list(filters)
+        self._limit = limit
+
+    def where(self, field, op, value):
+        assert op == '=='
+        return FakeQuery(self._store, self._name, self._filters + [(field, value)], self._limit)
+
+    def limit(self, count):
+        return FakeQuery(self._store, self._name, self._filters, count)
+
+    def get(self):
+        docs = [
+            FakeSnapshot(doc_id, data) for doc_id, data in self._store.data[self._name].items()
+            if all(data.get(field) == value for field, value in self._filters)
+        ]
+        self._store.reads += len(docs[:self._limit])
+        return docs[:self._limit]
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return FakeDocumentRef(self._store, self._name, doc_id)
+
+
+class FakeFirestore:
+    """Just enough of google.cloud.firestore.Client for repository tests"""
+
+    def __init__(self, data):
+        self.data = data
+        self.reads = 0
+        self.get_all_calls = []
+
+    def collection(self, name):
+        self.data.setdefault(name, {})
+        return FakeCollection(self, name)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.get_all_calls.append([ref.id for ref in refs])
+        # Firestore does not guarantee response order - reverse to prove we re-order
+        for ref in reversed(refs):
+            yield FakeSnapshot(ref.id, self.data[ref._collection].get(ref.id))
+
+
+def make_listing_doc(listing_id, **overrides):
+    doc = {
+        'title': f"Listing {listing_id}",
+        'description': 'A place',
+        'location': 'Galle',
+        'price': 100,
+        'category': 'accommodation',
+        'status': 'approved',
+        'available': True,
+    }
+    doc.update(overrides)
+    return doc
+
+
+@pytest.fixture
+def fake_db():
+    return FakeFirestore({
+        'listings': {f"l{i}": make_listing_doc(f"l{i}") for i in range(250)}
+    })
+
+
+def make_listing(listing_id):
+    return Listing.from_dict({'id': listing_id, **make_listing_doc(listing_id)})
+
+# ============================================================
+# Batch Fetch
+# ============================================================
+
+class TestFirestoreBatchFetch:
+    """FirestoreRepository.get_listings_batch uses chunked multi-get"""
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_multi_get_in_chunks(self, fake_db):
+        repo = FirestoreRepository(fake_db)
+        ids = [f"l{i}" for i in range(250)]
+
+        listings = await repo.get_listings_batch(ids)
+
+        assert len(listings) == 250
+        assert fake_db.reads == 0, "Should not fall back to per-document gets"
+        assert sorted(len(c) for c in fake_db.get_all_calls) == [50, 100, 100]
+
+    @pytest.mark.asyncio
+    async def test_batch_preserves_input_order_and_skips_missing(self, fake_db):
+        repo = FirestoreRepository(fake_db)
+
+        listings = await repo.get_listings_batch(["l7", "missing", "l3", "l200"])
+
+        assert [l.id for l in listings] == ["l7", "l3", "l200"]
+
+    @pytest.mark.asyncio
+    async def test_batch_empty_input(self, fake_db):
+        repo = FirestoreRepository(fake_db)
+        assert await repo.get_listings_batch([]) == []
+        assert fake_db.get_all_calls == []
+
+
+class TestCachedBatchFetch:
+    """CachedRepository.get_listings_batch sends only misses to the base"""
+
+    @pytest.mark.asyncio
+    async def test_only_misses_hit_base_in_one_call(self):
+        base = AsyncMock()
+        base.get_listings_batch = AsyncMock(return_value=[make_listing("b"), make_listing("d")])
+        repo = CachedRepository(base)
+        repo.listing_cache["listing:a"] = make_listing("a")
+        repo.listing_cache["listing:c"] = make_listing("c")
+
+        listings = await repo.get_listings_batch(["a", "b", "c", "d"])
+
+        base.get_listings_batch.assert_awaited_once_with(["b", "d"])
+        assert [l.id for l in listings] == ["a", "b", "c", "d"]
+        assert repo.cache_hits == 2
+        assert repo.cache_misses == 2
+
+    @pytest.mark.asyncio
+    async def test_all_cached_skips_base(self):
+        base = AsyncMock()
+        repo = CachedRepository(base)
+        repo.listing_cache["listing:a"] = make_listing("a")
+
+        listings = await repo.get_listings_batch(["a"])
+
+        base.get_listings_batch.assert_not_awaited()
+        assert [l.id for l in listings] == ["a"]
+
+
+class TestSingleFlight:
+    """Concurrent misses for one key share a single upstream fetch"""
+
+    @staticmethod
+    def slow_base(result=None, error=None):
+        base = AsyncMock()
+
+        async def get_listing(listing_id):
+            await asyncio.sleep(0.01)
+            if error:
+                raise error
+            return result
+
+        base.get_listing = AsyncMock(side_effect=get_listing)
+        return base
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        base = self.slow_base(result=make_listing("a"))
+        repo = CachedRepository(base)
+
+        listings = await asyncio.gather(*[repo.get_listing("a") for _ in range(10)])
+
+        assert base.get_listing.await_count == 1
+        assert all(l.id == "a" for l in listings)
+        stats = repo._get_cache_stats()
+        assert stats['caches']['listing']['misses'] == 10
+        assert stats['coalesced'] == 9
+        assert stats['inflight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self):
+        base = self.slow_base(error=RuntimeError("unavailable"))
+        repo = CachedRepository(base)
+
+        results = await asyncio.gather(*[repo.get_listing("a") for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert base.get_listing.await_count == 1
+        assert "listing:a" not in repo.listing_cache
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_fetch(self):
+        base = self.slow_base(result=make_listing("a"))
+        repo = CachedRepository(base)
+
+        first = asyncio.ensure_future(repo.get_listing("a"))
+        second = asyncio.ensure_future(repo.get_listing("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert (await second).id == "a"
+        assert "listing:a" in repo.listing_cache
+
+# ============================================================
+# Cursor Pagination
+# ============================================================
+
+class TestPageTokens:
+    """Opaque page tokens round-trip cursor values"""
+
+    def test_round_trip_with_datetime(self):
+        values = [120.5, datetime(2026, 1, 2, 3, 4, 5), "doc_42"]
+        assert decode_page_token(encode_page_token(values)) == values
+
+    def test_garbage_token_rejected(self):
+        with pytest.raises(InvalidPageToken):
+            decode_page_token("not-a-token!!")
+
+    def test_token_for_different_query_shape_rejected(self):
+        token = encode_page_token([100, "doc_1"])
+        with pytest.raises(InvalidPageToken):
+            decode_page_token(token, expected_length=1)
+
+    def test_page_size_is_clamped(self):
+        assert clamp_page_size(0) == clamp_page_size(None)
+        assert clamp_page_size(10_000) == MAX_PAGE_SIZE
+
+    def test_build_page_emits_token_only_when_more_results(self):
+        docs = [FakeSnapshot(f"d{i}", {"price": i}) for i in range(3)]
+
+        page_docs, token = build_page(docs, page_size=2, order_by=[("price", "ASCENDING")])
+        assert [d.id for d in page_docs] == ["d0", "d1"]
+        assert decode_page_token(token) == [1, "d1"]
+
+        page_docs, token = build_page(docs[:2], page_size=2)
+        assert token is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStaleWhileRevalidate:
+    """Briefly expired entries are served while refreshed in the background"""
+
+    @staticmethod
+    def repo_with_prices(*prices, **kwargs):
+        base = AsyncMock()
+        base.get_listing = AsyncMock(side_effect=[
+            Listing(id="a", title="A", description="", location="Galle",
+                    price=price, category="tour", partner_id="p1")
+            for price in prices
+        ])
+        clock = FakeClock()
+        repo = CachedRepository(base, ttls={'listing': 100}, stale_windows={'listing': 10},
+                                timer=clock, **kwargs)
+        return base, repo, clock
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_then_refreshed(self):
+        base, repo, clock = self.repo_with_prices(100.0, 120.0)
+        await repo.get_listing("a")
+
+        clock.now = 105
+        stale = await repo.get_listing("a")
+        await asyncio.gather(*repo._revalidation_tasks)
+
+        assert stale.price == 100.0
+        assert (await repo.get_listing("a")).price == 120.0
+        assert base.get_listing.await_count == 2
+        assert repo.stale_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_past_max_staleness_caller_waits(self):
+        base, repo, clock = self.repo_with_prices(100.0, 120.0)
+        await repo.get_listing("a")
+
+        clock.now = 111
+
+        assert (await repo.get_listing("a")).price == 120.0
+        assert repo.stale_hits == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidated_entry_never_served_stale(self):
+        base, repo, clock = self.repo_with_prices(100.0, 120.0)
+        await repo.get_listing("a")
+
+        repo.invalidate_listing("a")
+        clock.now = 105
+
+        assert (await repo.get_listing("a")).price == 120.0
+        assert repo.stale_hits == 0
+
+    @pytest.mark.asyncio
+    async def test_availability_and_price_bypass_cache(self):
+        base = AsyncMock()
+        base.get_listing_price = AsyncMock(return_value=100.0)
+        repo = CachedRepository(base)
+
+        await repo.get_listing_price("a")
+        await repo.get_listing_price("a")
+        await repo.check_availability("a", datetime(2026, 3, 1), datetime(2026, 3, 2))
+        await repo.check_availability("a", datetime(2026, 3, 1), datetime(2026, 3, 2))
+
+        assert base.get_listing_price.await_count == 2
+        assert base.check_availability.await_count == 2
+
+
+class TestNegativeCaching:
+    """Missing listings and travelers are remembered briefly"""
+
+    @pytest.mark.asyncio
+    async def test_missing_listing_fetched_once(self):
+        base = AsyncMock()
+        base.get_listing = AsyncMock(return_value=None)
+        repo = CachedRepository(base)
+
+        assert await repo.get_listing("gone") is None
+        assert await repo.get_listing("gone") is None
+
+        assert base.get_listing.await_count == 1
+        assert repo._get_cache_stats()['caches']['negative']['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_negative_entry_expires(self):
+        base = AsyncMock()
+        base.get_user_preferences = AsyncMock(return_value=None)
+        clock = FakeClock()
+        repo = CachedRepository(base, negative_ttl=30, timer=clock)
+
+        await repo.get_user_preferences("new-user")
+        clock.now = 31
+        await repo.get_user_preferences("new-user")
+
+        assert base.get_user_preferences.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_create_evicts_negative_entry(self):
+        base = AsyncMock()
+        base.get_listing = AsyncMock(side_effect=[None, make_listing("a")])
+        repo = CachedRepository(base)
+        await repo.get_listing("a")
+
+        await repo.apply_change_events([ChangeEvent("listings", "a", {"title": "A"})])
+
+        assert (await repo.get_listing("a")).id == "a"
+
+    @pytest.mark.asyncio
+    async def test_batch_skips_known_missing(self):
+        base = AsyncMock()
+        base.get_listing = AsyncMock(return_value=None)
+        base.get_listings_batch = AsyncMock(return_value=[make_listing("b")])
+        repo = CachedRepository(base)
+        await repo.get_listing("a")
+
+        listings = await repo.get_listings_batch(["a", "b"])
+
+        base.get_listings_batch.assert_awaited_once_with(["b"])
+        assert [l.id for l in listings] == ["b"]
+
+
+class TestCanonicalSearchKeys:
+    """Equivalent searches share a key; contained ranges reuse cached results"""
+
+    def test_equivalent_filters_have_same_digest(self):
+        a = SearchFilters(tags=['beach', 'surf'], amenities=[], min_price=100, location='')
+        b = SearchFilters(tags=['surf', 'beach', 'surf'], min_price=100.0)
+
+        assert a.digest() == b.digest()
+        assert a.digest() != SearchFilters(tags=['beach']).digest()
+
+    @staticmethod
+    def repo_with_listings(count=50, reusable=True):
+        base = AsyncMock()
+        listings = [make_listing(f"l{i:02d}") for i in range(count)]
+        base.get_listings = AsyncMock(side_effect=lambda f, limit, offset: listings[offset:offset + limit])
+        base.supports_range_reuse = lambda filters: reusable
+        return base, CachedRepository(base)
+
+    @pytest.mark.asyncio
+    async def test_smaller_range_served_from_cached_superset(self):
+        base, repo = self.repo_with_listings()
+        await repo.get_listings(SearchFilters(category='tour'), limit=40, offset=0)
+
+        second_page = await repo.get_listings(SearchFilters(category='tour'), limit=20, offset=20)
+
+        assert [l.id for l in second_page] == [f"l{i:02d}" for i in range(20, 40)]
+        assert base.get_listings.await_count == 1
+        assert repo.superset_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_range_beyond_cached_result_is_fetched(self):
+        base, repo = self.repo_with_listings()
+        await repo.get_listings(SearchFilters(), limit=20, offset=0)
+
+        await repo.get_listings(SearchFilters(), limit=20, offset=10)
+
+        assert base.get_listings.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_reuse_when_base_post_filters(self):
+        base, repo = self.repo_with_listings(reusable=False)
+        await repo.get_listings(SearchFilters(tags=['beach']), limit=40, offset=0)
+
+        await repo.get_listings(SearchFilters(tags=['beach']), limit=10, offset=0)
+
+        assert base.get_listings.await_count == 2
+
+    def test_firestore_reuse_only_without_post_filters(self, fake_db):
+        repo = FirestoreRepository(fake_db)
+
+        assert repo.supports_range_reuse(SearchFilters(category='tour'))
+        assert not repo.supports_range_reuse(SearchFilters(category='tour', tags=['beach']))
+        assert not repo.supports_range_reuse(SearchFilters(min_price=10, min_rating=4))
+
+# ============================================================
+# Text Search
+# ============================================================
+
+class TestSemanticSearchFallback:
+    """search_listings_semantic matches the search text against listings"""
+
+    @pytest.mark.asyncio
+    async def test_matching_title_returned(self):
+        db = FakeFirestore({'listings': {
+            'beach': make_listing_doc('beach', title='Mirissa Beach Villa'),
+            'hill': make_listing_doc('hill', title='Ella Hill Cabin', location='Ella'),
+            'hidden': make_listing_doc('hidden', title='Beach Hut', available=False),
+        }})
+        repo = FirestoreRepository(db)
+
+        results = await repo.search_listings_semantic("beach villa")
+
+        assert [l.id for l in results] == ['beach']
@@ -0,0 +1,159 @@
+"""
+Unit Tests for the Persistent Embedding Cache
+"""
+
+import numpy as np
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+MODEL = "test/model"
+DIM = 4
+
+
+class FakeModel:
+    """Deterministic encoder that counts the texts it encodes"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0, 0.5] for text in texts]
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path), MODEL)
+
+# ============================================================
+# Lookup
+# ============================================================
+
+class TestEmbed:
+    """Only texts never seen before are encoded"""
+
+    def test_misses_encoded_once(self, cache, model):
+        first = cache.embed(["beach", "hills"], model)
+        second = cache.embed(["hills", "beach", "fort"], model)
+
+        assert model.encoded == ["beach", "hills", "fort"]
+        assert second.dtype == np.float32
+        np.testing.assert_array_equal(second[:2], first[::-1])
+        assert cache.stats()['hits'] == 2
+
+    def test_whitespace_normalized_case_kept(self, cache, model):
+        cache.embed(["Beach  resort\n"], model)
+        cache.embed(["Beach resort", "beach resort"], model)
+
+        assert model.encoded == ["Beach  resort\n", "beach resort"]
+
+    def test_vectors_survive_restart(self, tmp_path, cache, model):
+        vectors = cache.embed(["beach", "hills"], model)
+        cache.save()
+
+        restored = EmbeddingCache(str(tmp_path), MODEL)
+
+        np.testing.assert_array_equal(restored.embed(["beach", "hills"], model), vectors)
+        assert model.encoded == ["beach", "hills"]
+
+    def test_models_do_not_share_vectors(self, tmp_path, cache, model):
+        cache.embed(["beach"], model)
+        cache.save()
+
+        EmbeddingCache(str(tmp_path), "other/model").embed(["beach"], model)
+
+        assert model.encoded == ["beach", "beach"]
+
+    def test_corrupt_index_starts_over(self, tmp_path, cache, model):
+        cache.embed(["beach"], model)
+        cache.save()
+        (tmp_path / "test_model" / "index.json").write_text("{not json")
+
+        assert len(EmbeddingCache(str(tmp_path), MODEL)) == 0
+
+# ============================================================
+# Size limits
+# ============================================================
+
+class TestLimits:
+    """Least recently used entries are evicted and dead rows compacted"""
+
+    def test_least_recently_used_evicted(self, tmp_path, model):
+        cache = EmbeddingCache(str(tmp_path), MODEL, max_bytes=2 * DIM * 4)
+        cache.embed(["a", "b"], model)
+        cache.embed(["a"], model)  # b is now the least recently used
+
+        cache.embed(["c"], model)
+        cache.embed(["a", "b"], model)
+
+        assert model.encoded == ["a", "b", "c", "b"]
+        assert cache.stats()['evictions'] == 2
+
+    def test_compaction_keeps_live_vectors(self, tmp_path, model):
+        cache = EmbeddingCache(str(tmp_path), MODEL, max_bytes=3 * DIM * 4)
+        texts = [f"text {i}" for i in range(10)]
+        expected = np.asarray(model(texts), dtype=np.float32)
+
+        for text in texts:
+            cache.embed([text], model)
+        cache.save()
+        restored = EmbeddingCache(str(tmp_path), MODEL)
+
+        assert cache.stats()['compactions'] >= 1
+        assert len(restored) == 3
+        np.testing.assert_array_equal(restored.get(texts[-3:]), expected[-3:])
+        assert len(list((tmp_path / "test_model").glob("vectors-*.f32"))) == 1
+
+# ============================================================
+# Shared directory
+# ============================================================
+
+class TestSharedDirectory:
+    """Processes sharing a directory never hand out each other's vectors"""
+
+    def test_writers_do_not_overwrite_each_other(self, tmp_path, model):
+        worker_a = EmbeddingCache(str(tmp_path), MODEL)
+        worker_b = EmbeddingCache(str(tmp_path), MODEL)
+
+        vector_a = worker_a.embed(["beach"], model)
+        vector_b = worker_b.embed(["hills"], model)
+
+        np.testing.assert_array_equal(worker_a.get(["hills"])[0], vector_b[0])
+        np.testing.assert_array_equal(worker_b.get(["beach"])[0], vector_a[0])
+        restored = EmbeddingCache(str(tmp_path), MODEL)
+        np.testing.assert_array_equal(restored.embed(["beach", "hills"], model), np.vstack([vector_a, vector_b]))
+        assert model.encoded == ["beach", "hills"]
+
+    def test_other_worker_follows_compaction(self, tmp_path, model):
+        texts = [f"text {i}" for i in range(10)]
+        expected = np.asarray(model(texts), dtype=np.float32)
+        reader = EmbeddingCache(str(tmp_path), MODEL, max_bytes=3 * DIM * 4)
+        writer = EmbeddingCache(str(tmp_path), MODEL, max_bytes=3 * DIM * 4)
+        reader.embed(texts[:1], model)
+
+        for text in texts[1:]:
+            writer.embed([text], model)
+
+        assert writer.stats()['compactions'] >= 1
+        np.testing.assert_array_equal(reader.get(texts[-3:]), expected[-3:])
+        assert reader.get(texts[:1]) == [None]
+
+    def test_torn_log_line_ignored(self, tmp_path, cache, model):
+        cache.embed(["beach"], model)
+        with open(tmp_path / "test_model" / "keys-0.log", "a") as log:
+            log.write("0123abc")  # writer died mid-line
+
+        restored = EmbeddingCache(str(tmp_path), MODEL)
+        restored.embed(["hills"], model)
+
+        assert len(EmbeddingCache(str(tmp_path), MODEL)) == 2
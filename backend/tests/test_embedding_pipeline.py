@@ -0,0 +1,121 @@
+"""
+Unit Tests for the Batched Embedding Pipeline
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from services.embedding_pipeline import EmbeddingPipeline, iterate_documents
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+@dataclass
+class Doc:
+    text: str
+
+
+def docs(count):
+    return [Doc(f"doc {i}") for i in range(count)]
+
+
+class Recorder:
+    """Fake model and store that track batches and concurrency"""
+
+    def __init__(self, encode_seconds=0.0):
+        self.encode_seconds = encode_seconds
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.written = []
+
+    def embed(self, texts):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.encode_seconds)
+        with self.lock:
+            self.active -= 1
+        return [[float(len(text))] for text in texts]
+
+    def write(self, batch, vectors):
+        assert len(batch) == len(vectors)
+        self.written.append([d.text for d in batch])
+
+# ============================================================
+# Pipeline
+# ============================================================
+
+class TestEmbeddingPipeline:
+    """Every document is embedded once, in bounded batches"""
+
+    @pytest.mark.asyncio
+    async def test_all_documents_written_in_batches(self):
+        recorder = Recorder()
+        pipeline = EmbeddingPipeline(recorder.embed, recorder.write, batch_size=4, workers=2)
+
+        stats = await pipeline.run(iterate_documents(docs(10)))
+
+        assert sorted(len(batch) for batch in recorder.written) == [2, 4, 4]
+        assert sorted(t for batch in recorder.written for t in batch) == sorted(d.text for d in docs(10))
+        assert stats.documents == 10
+        assert stats.batches == 3
+
+    @pytest.mark.asyncio
+    async def test_batches_encoded_in_parallel_up_to_workers(self):
+        recorder = Recorder(encode_seconds=0.05)
+        pipeline = EmbeddingPipeline(recorder.embed, recorder.write, batch_size=1, workers=3)
+
+        await pipeline.run(iterate_documents(docs(12)))
+
+        assert recorder.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_source_is_throttled_by_bounded_queues(self):
+        recorder = Recorder(encode_seconds=0.02)
+        pulled = 0
+        in_flight = []
+
+        async def source():
+            nonlocal pulled
+            for doc in docs(40):
+                pulled += 1
+                in_flight.append(pulled - sum(len(batch) for batch in recorder.written))
+                yield doc
+
+        pipeline = EmbeddingPipeline(recorder.embed, recorder.write, batch_size=2, workers=1, queue_batches=1)
+        await pipeline.run(source())
+
+        # batcher + encode queue + worker + write queue + writer, one batch each
+        assert max(in_flight) <= 5 * 2 + 1
+
+    @pytest.mark.asyncio
+    async def test_embed_error_propagates(self):
+        recorder = Recorder()
+
+        def failing_embed(texts):
+            if "doc 5" in texts:
+                raise RuntimeError("model crashed")
+            return recorder.embed(texts)
+
+        pipeline = EmbeddingPipeline(failing_embed, recorder.write, batch_size=1, workers=2)
+
+        with pytest.raises(RuntimeError, match="model crashed"):
+            await pipeline.run(iterate_documents(docs(50)))
+        assert len(recorder.written) < 50
+
+    @pytest.mark.asyncio
+    async def test_progress_reported_per_batch(self):
+        recorder = Recorder()
+        reported = []
+        pipeline = EmbeddingPipeline(recorder.embed, recorder.write, batch_size=3, workers=2,
+                                     progress=lambda stats: reported.append(stats.documents))
+
+        await pipeline.run(iterate_documents(docs(9)))
+
+        assert reported == [3, 6, 9]
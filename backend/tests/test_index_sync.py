@@ -0,0 +1,108 @@
+"""
+Unit Tests for Incremental Knowledge Base Sync
+"""
+
+import pytest
+from datetime import datetime, timezone
+
+from services.index_sync import IndexManifest, newest_update
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+def listing(listing_id, **overrides):
+    data = dict(id=listing_id, title=f"Listing {listing_id}", description="Nice", category='tour',
+                location='Galle', price=100, status='approved')
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def synced():
+    manifest = IndexManifest()
+    listings = [listing('a'), listing('b'), listing('c')]
+    manifest.commit(manifest.plan(listings, live_ids={'a', 'b', 'c'}))
+    return manifest
+
+# ============================================================
+# Planning
+# ============================================================
+
+class TestPlan:
+    """Only changed documents are embedded"""
+
+    def test_first_sync_embeds_everything(self):
+        plan = IndexManifest().plan([listing('a'), listing('b')], live_ids={'a', 'b'})
+
+        assert [d.doc_id for d in plan.upserts] == ['listing_a', 'listing_b']
+        assert plan.upserts[0].metadata['type'] == 'listing'
+
+    def test_unchanged_content_skipped(self, synced):
+        plan = synced.plan([listing('a'), listing('b', price=120)], live_ids={'a', 'b', 'c'})
+
+        assert [d.doc_id for d in plan.upserts] == ['listing_b']
+        assert plan.unchanged == 1
+
+    def test_unapproved_listing_deleted(self, synced):
+        plan = synced.plan([listing('a', status='suspended')], live_ids={'b', 'c'})
+
+        assert plan.deletes == ['listing_a']
+        assert plan.upserts == []
+
+    def test_hard_delete_found_by_live_sweep(self, synced):
+        plan = synced.plan([], live_ids={'a', 'b'})
+
+        assert plan.deletes == ['listing_c']
+
+    def test_no_sweep_without_live_ids(self, synced):
+        assert synced.plan([]).deletes == []
+
+    def test_live_but_never_indexed_reported_missing(self, synced):
+        assert synced.plan([], live_ids={'a', 'b', 'c', 'd'}).missing == ['d']
+
+    def test_seeded_documents_swept(self):
+        manifest = IndexManifest()
+        manifest.seed(['listing_old', 'listing_a'])
+
+        plan = manifest.plan([listing('a')], live_ids={'a'})
+
+        assert plan.deletes == ['listing_old']
+        assert [d.doc_id for d in plan.upserts] == ['listing_a']
+        assert not manifest.synced
+
+# ============================================================
+# Persistence
+# ============================================================
+
+class TestManifestPersistence:
+    """Restarts resume from the stored hashes and high-water mark"""
+
+    def test_round_trip(self, tmp_path, synced):
+        mark = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+        synced.path = str(tmp_path / "manifest.json")
+        synced.commit(synced.plan([listing('c')], live_ids={'a', 'b', 'c'}), high_water_mark=mark)
+        synced.save()
+
+        restored = IndexManifest.load(synced.path)
+
+        assert restored.hashes == synced.hashes
+        assert restored.high_water_mark == mark
+        assert restored.plan([listing('a')], live_ids={'a', 'b', 'c'}).unchanged == 1
+
+    def test_high_water_mark_never_moves_back(self, synced):
+        later = datetime(2026, 5, 2, tzinfo=timezone.utc)
+        synced.commit(synced.plan([]), later)
+        synced.commit(synced.plan([]), datetime(2026, 5, 1, tzinfo=timezone.utc))
+
+        assert synced.high_water_mark == later
+
+    def test_corrupt_manifest_starts_over(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+
+        assert len(IndexManifest.load(str(path))) == 0
+
+    def test_newest_update(self):
+        mark = datetime(2026, 5, 2, tzinfo=timezone.utc)
+        assert newest_update([listing('a', updatedAt=mark), listing('b')]) == mark
@@ -0,0 +1,195 @@
+"""
+Unit Tests for Change-Driven Cache Invalidation
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from data import CachedRepository, Listing, UserPreferences, SearchFilters
+from data.cached_repository import CHANGE_DRIVEN_TTLS
+from data.invalidation import CacheInvalidator, ChangeEvent, events_from_changes
+from data.memory_repository import InMemoryRepository, LatencyModel
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+def make_listing(listing_id, **overrides):
+    fields = dict(
+        id=listing_id, title=f"Listing {listing_id}", description="", location='Galle',
+        price=100.0, category='tour', partner_id='p1', status='approved',
+    )
+    fields.update(overrides)
+    return Listing(**fields)
+
+
+def change(kind, doc_id, data=None, update_time=None):
+    document = SimpleNamespace(id=doc_id, to_dict=lambda: data, update_time=update_time)
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+def listing_event(listing_id, **data):
+    fields = dict(title=f"Listing {listing_id}", location='Galle', price=100.0,
+                  category='tour', status='approved', available=True)
+    fields.update(data)
+    return ChangeEvent('listings', listing_id, fields, datetime.now(timezone.utc))
+
+
+@pytest.fixture
+def base():
+    repo = InMemoryRepository()
+    repo.put_listing(make_listing('l1'))
+    repo.put_listing(make_listing('l2', location='Kandy'))
+    repo.put_user_preferences(UserPreferences('u1', interests=['surfing']))
+    return repo
+
+
+@pytest.fixture
+def repo(base):
+    return CachedRepository(base, ttls=CHANGE_DRIVEN_TTLS)
+
+# ============================================================
+# Change Events
+# ============================================================
+
+class TestChangeEvents:
+    """DocumentChanges become ChangeEvents"""
+
+    def test_removed_documents_have_no_data(self):
+        read_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        events = events_from_changes('listings', [change('REMOVED', 'l1', {'title': 'x'})], read_time)
+
+        assert events == [ChangeEvent('listings', 'l1', None, read_time)]
+
+    def test_commit_time_taken_from_document(self):
+        updated = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        events = events_from_changes('listings', [change('MODIFIED', 'l1', {'price': 5}, updated)])
+
+        assert events[0].data == {'price': 5}
+        assert events[0].committed_at == updated
+
+# ============================================================
+# Eviction
+# ============================================================
+
+class TestApplyChangeEvents:
+    """Exactly the affected keys are evicted"""
+
+    @pytest.mark.asyncio
+    async def test_listing_change_evicts_listing_and_dependent_searches(self, repo):
+        await repo.get_listing('l1')
+        await repo.get_listing('l2')
+        await repo.get_listings(SearchFilters(location='Galle'))
+        await repo.get_listings(SearchFilters(location='Kandy'))
+
+        await repo.apply_change_events([listing_event('l1', price=80.0)])
+
+        assert 'listing:l1' not in repo.listing_cache
+        assert 'listing:l2' in repo.listing_cache
+        assert len(repo.search_cache) == 1  # Kandy search untouched
+
+    @pytest.mark.asyncio
+    async def test_new_listing_evicts_searches_it_now_matches(self, repo):
+        await repo.get_listings(SearchFilters(location='Galle'))
+        await repo.get_listings(SearchFilters(location='Kandy'))
+
+        await repo.apply_change_events([listing_event('l3', location='Kandy')])
+
+        remaining = list(repo._search_filters.values())
+        assert [f.location for f in remaining] == ['Galle']
+
+    @pytest.mark.asyncio
+    async def test_traveler_change_evicts_preferences(self, repo, base):
+        await repo.get_user_preferences('u1')
+        base.put_user_preferences(UserPreferences('u1', interests=['hiking']))
+
+        await repo.apply_change_events([ChangeEvent('travelers', 'u1', {'interests': ['hiking']})])
+
+        assert (await repo.get_user_preferences('u1')).interests == ['hiking']
+
+    @pytest.mark.asyncio
+    async def test_load_in_flight_during_change_is_not_cached(self):
+        base = InMemoryRepository(latency=LatencyModel(base_ms=20))
+        base.put_listing(make_listing('l1'))
+        repo = CachedRepository(base, ttls=CHANGE_DRIVEN_TTLS)
+
+        load = asyncio.ensure_future(repo.get_listing('l1'))
+        await asyncio.sleep(0.005)
+
+        await repo.apply_change_events([listing_event('l1')])
+        await load
+
+        assert 'listing:l1' not in repo.listing_cache
+
+    @pytest.mark.asyncio
+    async def test_lag_is_reported(self, repo):
+        event = listing_event('l1')
+        event.committed_at -= timedelta(milliseconds=250)
+
+        await repo.apply_change_events([event])
+
+        lag = repo._get_cache_stats()['change_driven']['invalidation_lag_ms']
+        assert lag['samples'] == 1
+        assert lag['max'] >= 250
+
+class TestManualInvalidation:
+    """invalidate_listing() also evicts the searches and pages it may affect"""
+
+    @pytest.mark.asyncio
+    async def test_evicts_dependent_searches_and_pages(self, repo, base):
+        await repo.get_listing('l1')
+        await repo.get_listings(SearchFilters(location='Galle'))
+        await repo.get_listings_page(SearchFilters(location='Galle'), page_size=5)
+        base.put_listing(make_listing('l1', price=80.0))
+
+        repo.invalidate_listing('l1')
+
+        assert len(repo.search_cache) == 0
+        assert [l.price for l in await repo.get_listings(SearchFilters(location='Galle'))] == [80.0]
+
+    @pytest.mark.asyncio
+    async def test_evicts_searches_the_listing_may_have_entered(self, repo, base):
+        await repo.get_listings(SearchFilters(location='Kandy'))
+        base.put_listing(make_listing('l1', location='Kandy'))
+
+        repo.invalidate_listing('l1')
+
+        assert {l.id for l in await repo.get_listings(SearchFilters(location='Kandy'))} == {'l1', 'l2'}
+
+# ============================================================
+# Listener Wiring
+# ============================================================
+
+class FakeWatchDb:
+    def __init__(self):
+        self.callbacks = {}
+
+    def collection(self, name):
+        def on_snapshot(callback):
+            self.callbacks[name] = callback
+            return SimpleNamespace(unsubscribe=lambda: self.callbacks.pop(name, None))
+        return SimpleNamespace(on_snapshot=on_snapshot)
+
+
+class TestCacheInvalidator:
+    """Snapshot callbacks reach the repository on the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_initial_snapshot_skipped_then_changes_applied(self, repo):
+        db = FakeWatchDb()
+        invalidator = CacheInvalidator(repo)
+        invalidator.start(db, asyncio.get_running_loop())
+        await repo.get_user_preferences('u1')
+
+        db.callbacks['travelers']([], [change('ADDED', 'u1', {})], None)
+        await asyncio.sleep(0.01)
+        assert 'prefs:u1' in repo.user_prefs_cache
+
+        db.callbacks['travelers']([], [change('MODIFIED', 'u1', {})], None)
+        await asyncio.sleep(0.01)
+        assert 'prefs:u1' not in repo.user_prefs_cache
+
+        invalidator.stop()
+        assert db.callbacks == {}
@@ -0,0 +1,167 @@
+"""
+Unit Tests for the Shared Knowledge Base
+Stubbed trainer and vector store: loading, threading and the search result cache
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from services.semantic_cache import SemanticCache
+
+pytest.importorskip("langchain_community")
+
+# services.firestore_service connects on import; tests have no credentials
+with patch('config.firebase_admin.get_firestore_client', return_value=Mock()):
+    from services.ai import embeddings
+    import main
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class StubTrainer:
+    """Stands in for KnowledgeBaseTrainer; counts constructions"""
+
+    constructed = 0
+
+    def __init__(self, persist_directory=None):
+        time.sleep(0.05)  # a slow load widens the race window
+        type(self).constructed += 1
+        self.search_threads = []
+        self.semantic_cache = Mock(stats=Mock(return_value={'hits': 3, 'misses': 1}))
+
+    def search(self, query, k=5, filter_type=None):
+        self.search_threads.append(threading.get_ident())
+        return [{'content': query, 'metadata': {'id': 'l1'}}]
+
+    def status(self):
+        return {'loaded': True, 'documents': 42}
+
+
+class StubVectorStore:
+    """Returns the listings currently stored, in order"""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.searches = 0
+
+    def similarity_search_by_vector(self, embedding, k, filter=None):
+        self.searches += 1
+        return [SimpleNamespace(page_content=f"listing {i}", metadata={'id': i}) for i in self.ids[:k]]
+
+
+@pytest.fixture
+def search_trainer():
+    """A trainer with a real semantic cache over a stub index"""
+    trainer = object.__new__(embeddings.KnowledgeBaseTrainer)
+    trainer.index_version = 0
+    trainer.embeddings = Mock(embed_query=Mock(side_effect=lambda text: [1.0, 0.0, float(len(text)) * 1e-4]))
+    trainer.vectorstore = StubVectorStore(['a', 'b'])
+    trainer.semantic_cache = SemanticCache(verify_rate=1.0, seed=1)
+    return trainer
+
+
+@pytest.fixture
+def stub_trainer(monkeypatch):
+    StubTrainer.constructed = 0
+    monkeypatch.setattr(embeddings, 'KnowledgeBaseTrainer', StubTrainer)
+    monkeypatch.setattr(embeddings, 'knowledge_base', None)
+    return StubTrainer
+
+# ============================================================
+# Singleton
+# ============================================================
+
+class TestGetKnowledgeBase:
+    """One trainer per process, however many callers race for it"""
+
+    def test_concurrent_callers_construct_once(self, stub_trainer):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instances = list(pool.map(lambda _: embeddings.get_knowledge_base(), range(16)))
+
+        assert stub_trainer.constructed == 1
+        assert all(instance is instances[0] for instance in instances)
+
+    def test_later_calls_reuse_instance(self, stub_trainer):
+        first = embeddings.get_knowledge_base()
+
+        assert embeddings.get_knowledge_base() is first
+        assert stub_trainer.constructed == 1
+
+# ============================================================
+# Endpoints
+# ============================================================
+
+class TestKnowledgeBaseEndpoints:
+    """Status endpoints report without loading; search runs off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_status_does_not_load(self, stub_trainer):
+        response = await main.knowledge_base_status()
+
+        assert response['knowledge_base'] == {'loaded': False}
+        assert stub_trainer.constructed == 0
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_stats_do_not_load(self, stub_trainer):
+        with pytest.raises(HTTPException) as error:
+            await main.semantic_cache_stats()
+
+        assert error.value.status_code == 503
+        assert stub_trainer.constructed == 0
+
+    @pytest.mark.asyncio
+    async def test_status_reports_loaded_instance(self, stub_trainer):
+        embeddings.get_knowledge_base()
+
+        status = await main.knowledge_base_status()
+        cache = await main.semantic_cache_stats()
+
+        assert status['knowledge_base'] == {'loaded': True, 'documents': 42}
+        assert cache['semantic_cache'] == {'hits': 3, 'misses': 1}
+        assert stub_trainer.constructed == 1
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_runs_in_executor(self, stub_trainer):
+        response = await main.semantic_search(main.SearchRequest(query="beach villa", limit=3))
+
+        assert response['count'] == 1
+        search_threads = embeddings.knowledge_base.search_threads
+        assert len(search_threads) == 1
+        assert search_threads[0] != threading.get_ident()
+
+# ============================================================
+# Search result cache
+# ============================================================
+
+class TestSearchCache:
+    """Cached results are served as copies and replaced when verification finds them wrong"""
+
+    def test_results_are_copies(self, search_trainer):
+        first = search_trainer.search("beach villa", k=2)
+        first[0]['metadata']['id'] = 'mutated'
+
+        second = search_trainer.search("beach villa", k=2)
+        second[1]['content'] = 'mutated'
+
+        assert [r['metadata']['id'] for r in search_trainer.search("beach villa", k=2)] == ['a', 'b']
+        assert search_trainer.search("beach villa", k=2)[1]['content'] == "listing b"
+
+    def test_false_hit_serves_and_caches_actual_results(self, search_trainer):
+        search_trainer.search("beach villa", k=2)
+        search_trainer.vectorstore.ids = ['c', 'a']
+
+        # Near-identical query: a semantic hit, verified against the index
+        results = search_trainer.search("beach villas", k=2)
+
+        assert [r['metadata']['id'] for r in results] == ['c', 'a']
+        assert search_trainer.semantic_cache.stats()['false_hits'] == 1
+        searches = search_trainer.vectorstore.searches
+        assert [r['metadata']['id'] for r in search_trainer.search("beach villas", k=2)] == ['c', 'a']
+        assert search_trainer.vectorstore.searches == searches
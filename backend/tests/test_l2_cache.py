@@ -0,0 +1,238 @@
+"""
+Unit Tests for the Shared L2 Cache
+Serialization and multi-worker behaviour over the in-process stand-in
+"""
+
+import asyncio
+import json
+import pytest
+from datetime import datetime
+
+from data import CachedRepository, Listing, UserPreferences, Page, SearchFilters
+from data.l2_cache import (
+    INVALIDATION_CHANNEL, LocalL2Cache, RedisL2Cache, encode_value, decode_value, get_l2_cache
+)
+from data.memory_repository import InMemoryRepository
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+def make_listing(listing_id, **overrides):
+    fields = dict(
+        id=listing_id, title=f"Listing {listing_id}", description="", location='Galle',
+        price=100.0, category='tour', partner_id='p1', status='approved',
+    )
+    fields.update(overrides)
+    return Listing(**fields)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def base():
+    repo = InMemoryRepository()
+    for listing_id in ('l1', 'l2', 'l3'):
+        repo.put_listing(make_listing(listing_id))
+    return repo
+
+
+def workers(base, count=2):
+    """Repositories sharing one L2, like uvicorn workers sharing Redis"""
+    l2 = LocalL2Cache()
+    return [CachedRepository(base, l2=l2) for _ in range(count)]
+
+# ============================================================
+# Serialization
+# ============================================================
+
+class TestSerialization:
+    """Cached values survive an L2 round trip"""
+
+    def test_listing_round_trip_keeps_datetimes(self):
+        listing = make_listing('l1', tags=['beach'], created_at=datetime(2026, 1, 2, 3, 4))
+        assert decode_value(encode_value(listing)) == listing
+
+    def test_preferences_round_trip(self):
+        prefs = UserPreferences('u1', interests=['surfing'], budget_max=500.0)
+        assert decode_value(encode_value(prefs)) == prefs
+
+    def test_page_round_trip(self):
+        page = Page(items=[make_listing('l1'), make_listing('l2')], next_page_token='abc')
+        decoded = decode_value(encode_value(page))
+        assert decoded.items == page.items
+        assert decoded.next_page_token == 'abc'
+
+    def test_unsupported_value_rejected(self):
+        with pytest.raises(TypeError):
+            encode_value({'raw': 'dict'})
+
+# ============================================================
+# Local Backend
+# ============================================================
+
+class TestLocalL2Cache:
+    """In-process stand-in honours TTLs"""
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self):
+        clock = FakeClock()
+        l2 = LocalL2Cache(timer=clock)
+        await l2.set('k', b'v', ttl=10)
+
+        assert await l2.get('k') == b'v'
+        clock.now = 11
+        assert await l2.get('k') is None
+
+    def test_factory(self):
+        assert get_l2_cache("") is None
+        assert isinstance(get_l2_cache("local"), LocalL2Cache)
+        assert get_l2_cache("memcached://host") is None
+
+class FakePubSub:
+    """Delivers one batch of messages per subscription, failing the first one"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.subscriptions = 0
+
+    async def subscribe(self, channel):
+        self.subscriptions += 1
+
+    async def listen(self):
+        batch = self.batches.pop(0)
+        for keys in batch:
+            yield {'type': 'message', 'data': json.dumps(keys)}
+        if not self.batches:
+            await asyncio.Event().wait()  # Stay subscribed until cancelled
+        raise ConnectionError("connection reset")
+
+    async def close(self):
+        pass
+
+
+class TestRedisListener:
+    """A lost subscription is reported once it is restored"""
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_reported_after_error(self):
+        l2 = object.__new__(RedisL2Cache)
+        l2._channel = INVALIDATION_CHANNEL
+        l2.resubscribe_delay = 0
+        pubsub = FakePubSub([[['listing:l1']], [['listing:l2']]])
+        received, resubscribed = [], []
+
+        listener = asyncio.ensure_future(l2._listen(pubsub, received.append, lambda: resubscribed.append(1)))
+        await asyncio.sleep(0.01)
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+        assert received == [['listing:l1'], ['listing:l2']]
+        assert pubsub.subscriptions == 1
+        assert resubscribed == [1]
+
+# ============================================================
+# Multi-Worker Behaviour
+# ============================================================
+
+class TestSharedCache:
+    """A key fetched by one worker is a hit for the others"""
+
+    @pytest.mark.asyncio
+    async def test_second_worker_hits_l2(self, base):
+        first, second = workers(base)
+
+        await first.get_listing('l1')
+        listing = await second.get_listing('l1')
+
+        assert listing.id == 'l1'
+        assert base.calls['get_listing'] == 1
+        assert second.l2_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_misses_checked_in_l2(self, base):
+        first, second = workers(base)
+        await first.get_listing('l1')
+
+        listings = await second.get_listings_batch(['l1', 'l2'])
+
+        assert [l.id for l in listings] == ['l1', 'l2']
+        assert base.calls['get_listings_batch'] == 1
+        assert second.l2_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_search_pages_are_shared(self, base):
+        first, second = workers(base)
+        filters = SearchFilters(location='Galle')
+
+        await first.get_listings_page(filters, page_size=2)
+        page = await second.get_listings_page(filters, page_size=2)
+
+        assert [l.id for l in page.items] == ['l1', 'l2']
+        assert base.calls['get_listings_page'] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_every_worker(self, base):
+        first, second = workers(base)
+        for worker in (first, second):
+            await worker.start_invalidation_listener()
+        await first.get_listing('l1')
+        await second.get_listing('l1')
+
+        base.put_listing(make_listing('l1', price=150.0))
+        first.invalidate_listing('l1')
+        await first.close()
+
+        assert 'listing:l1' not in second.listing_cache
+        assert (await second.get_listing('l1')).price == 150.0
+
+    @pytest.mark.asyncio
+    async def test_invalidation_evicts_searches_on_every_worker(self, base):
+        first, second = workers(base)
+        for worker in (first, second):
+            await worker.start_invalidation_listener()
+        filters = SearchFilters(location='Galle')
+        await second.get_listings(filters)
+
+        base.put_listing(make_listing('l1', price=150.0))
+        first.invalidate_listing('l1')
+        await first.close()
+        await asyncio.gather(*second._l2_tasks)
+
+        assert len(second.search_cache) == 0
+        assert 150.0 in [l.price for l in await second.get_listings(filters)]
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_clears_l1(self, base):
+        class ReconnectingL2(LocalL2Cache):
+            async def subscribe(self, handler, on_resubscribe=None):
+                self.on_resubscribe = on_resubscribe
+
+        l2 = ReconnectingL2()
+        repo = CachedRepository(base, l2=l2)
+        await repo.start_invalidation_listener()
+        await repo.get_listing('l1')
+        await repo.get_listings(SearchFilters(location='Galle'))
+
+        l2.on_resubscribe()
+
+        assert len(repo.listing_cache) == 0 and len(repo.search_cache) == 0
+        assert repo._get_cache_stats()['l2']['invalidation_resyncs'] == 1
+
+    @pytest.mark.asyncio
+    async def test_l2_failure_falls_back_to_base(self, base):
+        class BrokenL2(LocalL2Cache):
+            async def get(self, key):
+                raise ConnectionError("down")
+
+        repo = CachedRepository(base, l2=BrokenL2())
+
+        assert (await repo.get_listing('l1')).id == 'l1'
+        assert repo.l2_errors == 1
@@ -0,0 +1,122 @@
+"""
+Unit Tests for the In-Memory Repository and Synthetic Data
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from data import CachedRepository, SearchFilters, Listing, Booking
+from data.memory_repository import InMemoryRepository, LatencyModel
+from data.synthetic import generate_dataset, resolve_scale
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+@pytest.fixture(scope="module")
+def dataset():
+    return generate_dataset(500, seed=7)
+
+
+def make_listing(listing_id, **overrides):
+    fields = dict(
+        id=listing_id, title=f"Listing {listing_id}", description="", location='Galle',
+        price=100.0, category='tour', partner_id='p1', status='approved',
+    )
+    fields.update(overrides)
+    return Listing(**fields)
+
+# ============================================================
+# Synthetic Data
+# ============================================================
+
+class TestSyntheticData:
+    """Generator is seeded and internally consistent"""
+
+    def test_same_seed_same_data(self, dataset):
+        again = generate_dataset(500, seed=7)
+        assert [l.id for l in again.listings[:20]] == [l.id for l in dataset.listings[:20]]
+        assert again.listings[3].price == dataset.listings[3].price
+        assert again.bookings[10].listing_id == dataset.bookings[10].listing_id
+
+    def test_collections_scale_with_listings(self, dataset):
+        summary = dataset.summary()
+        assert summary['listings'] == 500
+        assert summary['bookings'] == 1000
+        assert summary['partners'] == 10
+
+    def test_bookings_reference_existing_listings(self, dataset):
+        listing_ids = {l.id for l in dataset.listings}
+        assert all(b.listing_id in listing_ids for b in dataset.bookings)
+
+    def test_popularity_is_skewed(self, dataset):
+        sample = dataset.sample_listing_ids(2000)
+        assert sample.count(dataset.listings[0].id) > sample.count(dataset.listings[-1].id)
+
+    def test_named_scales(self):
+        assert resolve_scale('100k') == 100_000
+        with pytest.raises(ValueError):
+            resolve_scale('huge')
+
+# ============================================================
+# Repository Behaviour
+# ============================================================
+
+class TestInMemoryRepository:
+    """DataRepository contract on the in-memory backend"""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_pagination(self, dataset):
+        repo = InMemoryRepository.from_dataset(dataset)
+        filters = SearchFilters(category='tour', max_price=200)
+
+        first = await repo.get_listings_page(filters, page_size=5)
+        second = await repo.get_listings_page(filters, page_size=5, page_token=first.next_page_token)
+
+        assert len(first.items) == 5
+        assert first.items[-1].id < second.items[0].id
+        for listing in first.items + second.items:
+            assert listing.category == 'tour' and listing.price <= 200 and listing.status == 'approved'
+
+    @pytest.mark.asyncio
+    async def test_availability_detects_overlap(self):
+        repo = InMemoryRepository()
+        repo.put_listing(make_listing('l1'))
+        check_in = datetime(2026, 3, 1)
+        repo.add_booking(Booking('b1', 'l1', 'u1', check_in, check_in + timedelta(days=3), status='confirmed'))
+
+        clash = await repo.check_availability('l1', check_in + timedelta(days=1), check_in + timedelta(days=5))
+        free = await repo.check_availability('l1', check_in + timedelta(days=3), check_in + timedelta(days=5))
+
+        assert clash.conflicting_bookings == ['b1']
+        assert free.available
+
+    @pytest.mark.asyncio
+    async def test_returned_models_are_copies(self):
+        repo = InMemoryRepository()
+        repo.put_listing(make_listing('l1'))
+
+        listing = await repo.get_listing('l1')
+        listing.price = 1.0
+
+        assert (await repo.get_listing('l1')).price == 100.0
+
+    @pytest.mark.asyncio
+    async def test_reindex_on_update(self):
+        repo = InMemoryRepository()
+        repo.put_listing(make_listing('l1'))
+        repo.put_listing(make_listing('l1', location='Kandy'))
+
+        assert await repo.get_listings(SearchFilters(location='Galle')) == []
+        assert [l.id for l in await repo.get_listings(SearchFilters(location='Kandy'))] == ['l1']
+
+    @pytest.mark.asyncio
+    async def test_calls_are_counted_behind_cache(self, dataset):
+        base = InMemoryRepository.from_dataset(dataset, latency=LatencyModel(base_ms=0.1, seed=1))
+        repo = CachedRepository(base)
+        listing_id = dataset.listings[0].id
+
+        for _ in range(5):
+            await repo.get_listing(listing_id)
+
+        assert base.calls['get_listing'] == 1
@@ -0,0 +1,177 @@
+"""
+Unit Tests for the ONNX Embedding Backend
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import services.onnx_embeddings as onnx_embeddings
+from services.onnx_embeddings import get_onnx_embeddings, mean_pool, same_model
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+@pytest.fixture(autouse=True)
+def fresh_backend(monkeypatch):
+    monkeypatch.setattr(onnx_embeddings, '_backend', None)
+    monkeypatch.setattr(onnx_embeddings, '_backend_failed', False)
+
+class StubTokenizer:
+    """One token per word, padded to the longest text in the batch like tokenizers.Tokenizer"""
+
+    def encode_batch(self, texts):
+        ids = [[len(word) for word in text.split()] for text in texts]
+        width = max(len(row) for row in ids)
+        return [
+            SimpleNamespace(
+                ids=row + [0] * (width - len(row)),
+                attention_mask=[1] * len(row) + [0] * (width - len(row)),
+                type_ids=[0] * width,
+            )
+            for row in ids
+        ]
+
+
+class StubSession:
+    """Token vectors derived from the token ids; records every batch it runs"""
+
+    def __init__(self, input_names=('input_ids', 'attention_mask')):
+        self.input_names = input_names
+        self.feeds = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name=name) for name in self.input_names]
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        ids = feeds['input_ids']
+        # Padding positions get large vectors: pooling must ignore them
+        scale = np.where(ids == 0, 1000.0, ids.astype(np.float32))
+        return [np.sin(np.arange(onnx_embeddings.EMBEDDING_DIM) * scale[..., None]).astype(np.float32)]
+
+
+@pytest.fixture
+def stub_model():
+    """OnnxEmbeddings without an exported model on disk"""
+    model = object.__new__(onnx_embeddings.OnnxEmbeddings)
+    model.model_name = onnx_embeddings.SOURCE_MODEL
+    model.normalize = True
+    model.tokenizer = StubTokenizer()
+    model.session = StubSession()
+    model._input_names = {model_input.name for model_input in model.session.get_inputs()}
+    return model
+
+# ============================================================
+# Pooling
+# ============================================================
+
+class TestMeanPool:
+    """Same pooling as sentence-transformers, padding excluded"""
+
+    def test_padding_ignored(self):
+        tokens = np.array([[[1.0, 0.0], [3.0, 2.0], [100.0, 100.0]]], dtype=np.float32)
+        mask = np.array([[1, 1, 0]])
+
+        np.testing.assert_allclose(mean_pool(tokens, mask, normalize=False), [[2.0, 1.0]])
+
+    def test_normalized_to_unit_length(self):
+        tokens = np.random.default_rng(1).normal(size=(3, 5, 8)).astype(np.float32)
+        vectors = mean_pool(tokens, np.ones((3, 5), dtype=np.int64))
+
+        assert vectors.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+
+# ============================================================
+# Encoding
+# ============================================================
+
+class TestEncode:
+    """The SentenceTransformer/Chroma interfaces over the ONNX session"""
+
+    def test_batches_of_batch_size(self, stub_model):
+        texts = [f"listing number {i}" for i in range(70)]
+
+        vectors = stub_model.encode(texts)
+
+        assert vectors.shape == (70, onnx_embeddings.EMBEDDING_DIM)
+        assert vectors.dtype == np.float32
+        assert [len(feeds['input_ids']) for feeds in stub_model.session.feeds] == [32, 32, 6]
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+    def test_only_model_inputs_fed(self, stub_model):
+        stub_model.encode(["beach villa"])
+
+        assert set(stub_model.session.feeds[0]) == {'input_ids', 'attention_mask'}
+
+    def test_padding_does_not_change_vectors(self, stub_model):
+        texts = ["villa", "quiet beach villa near galle fort"]
+
+        batched = stub_model.encode(texts)
+
+        np.testing.assert_allclose(batched[0], stub_model.encode(["villa"])[0], rtol=1e-5, atol=1e-6)
+
+    def test_single_string_gives_one_vector(self, stub_model):
+        assert stub_model.encode("beach villa").shape == (onnx_embeddings.EMBEDDING_DIM,)
+
+    def test_chroma_and_langchain_interfaces(self, stub_model):
+        vectors = stub_model(["beach villa", "kandy tour"])
+
+        assert len(vectors) == 2 and len(vectors[0]) == onnx_embeddings.EMBEDDING_DIM
+        assert stub_model.embed_query("beach villa") == vectors[0]
+
+    def test_empty_input_keeps_dimension(self, stub_model):
+        vectors = stub_model.encode([])
+
+        assert vectors.shape == (0, onnx_embeddings.EMBEDDING_DIM)
+        assert stub_model.session.feeds == []
+
+# ============================================================
+# Backend selection
+# ============================================================
+
+class TestBackendSelection:
+    """PyTorch stays the default and the fallback"""
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv('EMBEDDING_BACKEND', raising=False)
+        assert get_onnx_embeddings() is None
+
+    def test_missing_export_falls_back(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('EMBEDDING_BACKEND', 'onnx')
+        monkeypatch.setenv('ONNX_MODEL_DIR', str(tmp_path / "missing"))
+
+        assert get_onnx_embeddings() is None
+        assert onnx_embeddings._backend_failed
+
+    def test_runtime_load_error_falls_back(self, monkeypatch):
+        def corrupt_model(*args, **kwargs):
+            raise RuntimeError("[ONNXRuntimeError] : 7 : INVALID_PROTOBUF")
+        monkeypatch.setenv('EMBEDDING_BACKEND', 'onnx')
+        monkeypatch.setattr(onnx_embeddings, 'OnnxEmbeddings', corrupt_model)
+
+        assert get_onnx_embeddings() is None
+        assert onnx_embeddings._backend_failed
+
+    def test_concurrent_callers_load_once(self, monkeypatch):
+        loads = []
+        def slow_load(*args, **kwargs):
+            time.sleep(0.05)
+            loads.append(1)
+            return SimpleNamespace(model_name=onnx_embeddings.SOURCE_MODEL)
+        monkeypatch.setenv('EMBEDDING_BACKEND', 'onnx')
+        monkeypatch.setattr(onnx_embeddings, 'OnnxEmbeddings', slow_load)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            backends = list(pool.map(lambda _: get_onnx_embeddings(), range(16)))
+
+        assert len(loads) == 1
+        assert all(backend is backends[0] for backend in backends)
+
+    def test_model_names_match_without_organization(self):
+        assert same_model("sentence-transformers/all-MiniLM-L6-v2", "all-MiniLM-L6-v2")
+        assert not same_model("sentence-transformers/all-mpnet-base-v2", "all-MiniLM-L6-v2")
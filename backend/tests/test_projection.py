@@ -0,0 +1,72 @@
+"""
+Unit Tests for Field Projections
+fields= parsing and Firestore select() wiring
+"""
+
+import pytest
+
+from data.projection import (
+    parse_fields, merge_fields, apply_projection, project, InvalidFieldSelection,
+    LISTING_FIELDS, LISTING_PRESETS, LISTING_CARD_FIELDS
+)
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+class RecordingQuery:
+    """Records select() calls"""
+
+    def __init__(self):
+        self.selected = None
+
+    def select(self, field_paths):
+        self.selected = list(field_paths)
+        return self
+
+# ============================================================
+# fields= Parsing
+# ============================================================
+
+class TestParseFields:
+    """parse_fields maps the query parameter to a projection"""
+
+    def test_no_fields_means_whole_document(self):
+        assert parse_fields(None, LISTING_FIELDS) is None
+        assert parse_fields("  ", LISTING_FIELDS) is None
+
+    def test_fields_are_deduplicated_and_id_skipped(self):
+        fields = parse_fields("title, price,id,title", LISTING_FIELDS)
+        assert fields == ['title', 'price']
+
+    def test_preset_expands(self):
+        fields = parse_fields("card,images", LISTING_FIELDS, LISTING_PRESETS)
+        assert fields == list(LISTING_CARD_FIELDS) + ['images']
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(InvalidFieldSelection):
+            parse_fields("title,secretField", LISTING_FIELDS)
+
+# ============================================================
+# Query Projection
+# ============================================================
+
+class TestApplyProjection:
+    """Projections reach Firestore and are trimmed afterwards"""
+
+    def test_none_leaves_query_untouched(self):
+        query = RecordingQuery()
+        assert apply_projection(query, None) is query
+        assert query.selected is None
+
+    def test_id_only_projection_selects_document_name(self):
+        query = apply_projection(RecordingQuery(), [])
+        assert query.selected == ['__name__']
+
+    def test_merge_adds_server_side_fields(self):
+        assert merge_fields(['title'], ['price'], ['title', 'createdAt']) == ['title', 'price', 'createdAt']
+        assert merge_fields(None, ['price']) is None
+
+    def test_project_trims_extra_fields_but_keeps_id(self):
+        doc = {'id': 'l1', 'title': 'Villa', 'price': 120, 'createdAt': 'x'}
+        assert project(doc, ['title']) == {'id': 'l1', 'title': 'Villa'}
@@ -0,0 +1,125 @@
+"""
+Unit Tests for the Firestore Query Planner
+Plans are checked against the composite indexes in firestore.indexes.json
+"""
+
+import pytest
+
+from data.query_planner import QueryPlanner, Predicate, CompositeIndex
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+@pytest.fixture(scope="module")
+def planner():
+    """Planner loaded from the repo's deployed index definitions"""
+    planner = QueryPlanner.from_file()
+    assert planner.indexes, "firestore.indexes.json should define composite indexes"
+    return planner
+
+
+APPROVED = Predicate('status', '==', 'approved')
+
+
+def fields_of(predicates):
+    return sorted((p.field, p.op) for p in predicates)
+
+# ============================================================
+# Plan Selection
+# ============================================================
+
+class TestPlanSelection:
+    """Planner pushes down as much as the deployed indexes allow"""
+
+    def test_equality_only_uses_single_field_indexes(self, planner):
+        plan = planner.plan('listings', [APPROVED, Predicate('category', '==', 'tour')])
+
+        assert fields_of(plan.pushed) == [('category', '=='), ('status', '==')]
+        assert plan.post_filters == []
+        assert plan.order_by == []
+
+    def test_composite_not_used_when_it_adds_nothing(self, planner):
+        plan = planner.plan('listings', [
+            APPROVED,
+            Predicate('category', '==', 'tour'),
+            Predicate('location', '==', 'Kandy'),
+        ])
+
+        assert plan.post_filters == []
+        assert plan.index is None
+        assert plan.order_by == []
+
+    def test_price_range_uses_status_price_index(self, planner):
+        plan = planner.plan('listings', [
+            APPROVED,
+            Predicate('price', '>=', 50),
+            Predicate('price', '<=', 200),
+        ])
+
+        assert fields_of(plan.pushed) == [('price', '<='), ('price', '>='), ('status', '==')]
+        assert plan.post_filters == []
+        assert plan.order_by[0] == ('price', 'ASCENDING')
+
+    def test_unindexed_combination_post_filters_range(self, planner):
+        plan = planner.plan('listings', [
+            APPROVED,
+            Predicate('category', '==', 'tour'),
+            Predicate('price', '<=', 200),
+        ])
+
+        assert fields_of(plan.pushed) == [('category', '=='), ('status', '==')]
+        assert fields_of(plan.post_filters) == [('price', '<=')]
+
+    def test_second_inequality_is_post_filtered(self, planner):
+        plan = planner.plan('listings', [
+            APPROVED,
+            Predicate('price', '<=', 200),
+            Predicate('rating', '>=', 4),
+        ])
+
+        range_fields = {p.field for p in plan.pushed if p.op != '=='}
+        assert len(range_fields) == 1
+        assert len(plan.post_filters) == 1
+
+    def test_available_category_location_price_index(self, planner):
+        plan = planner.plan('listings', [
+            Predicate('available', '==', True),
+            Predicate('category', '==', 'stay'),
+            Predicate('location', '==', 'Galle'),
+            Predicate('price', '<=', 300),
+        ])
+
+        assert plan.post_filters == []
+        assert plan.order_by == [('price', 'ASCENDING')]
+
+    def test_missing_index_file_falls_back_to_equality(self):
+        planner = QueryPlanner.from_file('/nonexistent/firestore.indexes.json')
+        plan = planner.plan('listings', [APPROVED, Predicate('price', '>=', 10)])
+
+        assert fields_of(plan.pushed) == [('status', '==')]
+        assert fields_of(plan.post_filters) == [('price', '>=')]
+
+# ============================================================
+# Post-filter Evaluation
+# ============================================================
+
+class TestPlanMatching:
+    """Post-filters evaluate correctly on document dicts"""
+
+    def test_matches_applies_only_post_filters(self):
+        planner = QueryPlanner([CompositeIndex('listings', (('status', 'ASCENDING'), ('price', 'ASCENDING')))])
+        plan = planner.plan('listings', [
+            APPROVED,
+            Predicate('price', '<=', 100),
+            Predicate('rating', '>=', 4),
+        ])
+
+        assert plan.matches({'status': 'approved', 'price': 90, 'rating': 4.5})
+        assert not plan.matches({'status': 'approved', 'price': 90, 'rating': 3.0})
+        assert not plan.matches({'status': 'approved', 'price': 90})
+
+    def test_array_contains_predicate(self):
+        predicate = Predicate('amenities', 'array_contains', 'wifi')
+        assert predicate.matches({'amenities': ['pool', 'wifi']})
+        assert not predicate.matches({'amenities': 'wifi'})
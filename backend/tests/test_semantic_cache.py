@@ -0,0 +1,93 @@
+"""
+Unit Tests for the Semantic Result Cache
+"""
+
+import numpy as np
+import pytest
+
+from services.semantic_cache import SemanticCache, normalize_query
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+SCOPE = ('listing', 5)
+
+
+def vec(*values):
+    return np.array(values, dtype=np.float32)
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(max_distance=0.05, verify_rate=0.0)
+    cache.put("beach resorts galle", vec(1.0, 0.0, 0.0), SCOPE, 1, ['l1', 'l2'])
+    return cache
+
+# ============================================================
+# Lookup
+# ============================================================
+
+class TestLookup:
+    """Exact text, then nearest embedding within max_distance"""
+
+    def test_exact_text_hit_ignores_case_and_spacing(self, cache):
+        assert cache.get_text("  Beach resorts   GALLE", SCOPE, 1) == ['l1', 'l2']
+        assert normalize_query(" A  b ") == "a b"
+
+    def test_near_embedding_reuses_results(self, cache):
+        assert cache.get(vec(0.99, 0.1, 0.0), SCOPE, 1) == ['l1', 'l2']
+        assert cache.stats()['near_hits'] == 1
+
+    def test_distant_embedding_misses(self, cache):
+        assert cache.get(vec(0.7, 0.7, 0.0), SCOPE, 1) is None
+        assert cache.stats()['misses'] == 1
+
+    def test_scopes_are_separate(self, cache):
+        assert cache.get(vec(1.0, 0.0, 0.0), ('listing', 10), 1) is None
+
+    def test_new_index_version_drops_entries(self, cache):
+        assert cache.get(vec(1.0, 0.0, 0.0), SCOPE, 2) is None
+
+        stats = cache.stats()
+        assert stats['entries'] == 0
+        assert stats['invalidations'] == 1
+        assert stats['index_version'] == 2
+
+    def test_oldest_entry_dropped_at_capacity(self):
+        cache = SemanticCache(max_entries=2)
+        cache.put("a", vec(1.0, 0.0), SCOPE, 1, ['a'])
+        cache.put("b", vec(0.0, 1.0), SCOPE, 1, ['b'])
+        cache.get_text("a", SCOPE, 1)  # a is now more recent than b
+
+        cache.put("c", vec(-1.0, 0.0), SCOPE, 1, ['c'])
+
+        assert cache.get_text("a", SCOPE, 1) == ['a']
+        assert cache.get_text("b", SCOPE, 1) is None
+
+# ============================================================
+# Instrumentation
+# ============================================================
+
+class TestInstrumentation:
+    """Hit ratio and false hits"""
+
+    def test_hit_ratio_counts_exact_and_near_hits(self, cache):
+        cache.get_text("beach resorts galle", SCOPE, 1)
+        cache.get(vec(0.99, 0.1, 0.0), SCOPE, 1)
+        cache.get(vec(0.0, 1.0, 0.0), SCOPE, 1)
+
+        assert cache.stats()['hit_ratio'] == pytest.approx(2 / 3, abs=1e-3)
+
+    def test_false_hits_measured(self, cache):
+        assert not cache.record_verification(['l1', 'l2'], ['l1', 'l2'])
+        assert cache.record_verification(['l1', 'l2'], ['l3'])
+
+        stats = cache.stats()
+        assert stats['verified'] == 2
+        assert stats['false_hit_rate'] == 0.5
+
+    def test_verify_rate_samples_hits(self):
+        cache = SemanticCache(verify_rate=0.25, seed=7)
+        sampled = sum(cache.should_verify() for _ in range(4000))
+        assert 800 < sampled < 1200
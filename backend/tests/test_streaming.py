@@ -0,0 +1,113 @@
+"""
+Unit Tests for NDJSON Streaming
+Blocking-iterator bridge and NDJSON encoding
+"""
+
+import json
+import pytest
+from datetime import datetime
+
+from config.firebase_admin import iterate_blocking
+from services.ndjson import ndjson_lines
+
+# ============================================================
+# Blocking Iterator Bridge
+# ============================================================
+
+class TestIterateBlocking:
+    """iterate_blocking yields every item, batch by batch"""
+
+    @pytest.mark.asyncio
+    async def test_yields_all_items_in_order(self):
+        items = [item async for item in iterate_blocking(lambda: iter(range(250)), batch_size=100)]
+        assert items == list(range(250))
+
+    @pytest.mark.asyncio
+    async def test_source_is_consumed_lazily(self):
+        pulled = []
+
+        def source():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        stream = iterate_blocking(source, batch_size=10)
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first == 0
+        assert len(pulled) == 10
+
+    @pytest.mark.asyncio
+    async def test_source_closed_when_consumer_stops(self):
+        closed = []
+
+        def source():
+            try:
+                yield from range(1000)
+            finally:
+                closed.append(True)
+
+        generator = source()  # Held here, so only an explicit close() runs its finally
+        stream = iterate_blocking(lambda: generator, batch_size=10)
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_grpc_style_stream_cancelled(self):
+        class ResponseStream:
+            def __init__(self):
+                self.items = iter(range(50))
+                self.cancelled = False
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                return next(self.items)
+
+            def cancel(self):
+                self.cancelled = True
+
+        response = ResponseStream()
+        stream = iterate_blocking(lambda: response, batch_size=10)
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert response.cancelled
+
+# ============================================================
+# NDJSON Encoding
+# ============================================================
+
+async def collect(lines):
+    return [json.loads(line) async for line in lines]
+
+
+async def documents(*docs, fail=False):
+    for doc in docs:
+        yield doc
+    if fail:
+        raise RuntimeError("connection reset")
+
+
+class TestNdjsonLines:
+    """One JSON document per line"""
+
+    @pytest.mark.asyncio
+    async def test_one_line_per_document(self):
+        lines = [line async for line in ndjson_lines(documents({'id': 'a'}, {'id': 'b'}))]
+
+        assert lines == [b'{"id": "a"}\n', b'{"id": "b"}\n']
+
+    @pytest.mark.asyncio
+    async def test_datetimes_are_encoded(self):
+        rows = await collect(ndjson_lines(documents({'createdAt': datetime(2026, 1, 2, 3, 4)})))
+        assert rows == [{'createdAt': '2026-01-02T03:04:00'}]
+
+    @pytest.mark.asyncio
+    async def test_failure_appends_error_line(self):
+        rows = await collect(ndjson_lines(documents({'id': 'a'}, fail=True)))
+        assert rows == [{'id': 'a'}, {'error': 'stream interrupted', 'count': 1}]
@@ -0,0 +1,132 @@
+"""
+Unit Tests for Startup Cache Warm-Up
+"""
+
+import asyncio
+import pytest
+
+from data import CachedRepository, Listing, UserPreferences, SearchFilters
+from data.memory_repository import InMemoryRepository, LatencyModel
+from data.warmup import WarmupPlan, warm_cache, start_warmup
+import data.warmup as warmup
+
+# ============================================================
+# Test Fixtures
+# ============================================================
+
+def make_listing(listing_id, category='tour'):
+    return Listing(
+        id=listing_id, title=f"Listing {listing_id}", description="", location='Galle',
+        price=100.0, category=category, partner_id='p1', status='approved',
+    )
+
+
+@pytest.fixture
+def base():
+    repo = InMemoryRepository()
+    for i in range(5):
+        repo.put_listing(make_listing(f"l{i}", category='tour' if i % 2 else 'hotel'))
+    repo.put_user_preferences(UserPreferences('u1', interests=['surfing']))
+    return repo
+
+
+@pytest.fixture
+def plan():
+    return WarmupPlan(
+        listing_ids=[f"l{i}" for i in range(5)],
+        searches=[SearchFilters(), SearchFilters(category='tour')],
+        user_ids=['u1'],
+    )
+
+# ============================================================
+# Warm-Up
+# ============================================================
+
+class TestWarmCache:
+    """Planned entries end up cached"""
+
+    @pytest.mark.asyncio
+    async def test_later_reads_hit_cache(self, base, plan):
+        repo = CachedRepository(base)
+
+        report = await warm_cache(repo, plan)
+        calls = sum(base.calls.values())
+
+        await repo.get_listing('l3')
+        await repo.get_listings(SearchFilters(category='tour'))
+        await repo.get_user_preferences('u1')
+
+        assert sum(base.calls.values()) == calls
+        assert report.state == "complete"
+        assert report.coverage == 1.0
+
+    @pytest.mark.asyncio
+    async def test_failures_counted_not_raised(self, base, plan):
+        repo = CachedRepository(base)
+
+        async def broken(user_id):
+            raise RuntimeError("unavailable")
+        repo.get_user_preferences = broken
+
+        report = await warm_cache(repo, plan)
+
+        assert report.errors == 1
+        assert report.loaded['preferences'] == 0
+        assert report.coverage == pytest.approx(7 / 8)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, base):
+        repo = CachedRepository(base)
+        running = peak = 0
+
+        async def tracked(user_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.005)
+            running -= 1
+        repo.get_user_preferences = tracked
+
+        await warm_cache(repo, WarmupPlan(user_ids=[f"u{i}" for i in range(20)]), concurrency=3)
+
+        assert peak == 3
+
+# ============================================================
+# Deadline
+# ============================================================
+
+class TestStartWarmup:
+    """Startup never waits past the deadline"""
+
+    @pytest.mark.asyncio
+    async def test_deadline_returns_early_and_keeps_loading(self, monkeypatch, plan):
+        slow = InMemoryRepository(latency=LatencyModel(base_ms=30))
+        for listing_id in plan.listing_ids:
+            slow.put_listing(make_listing(listing_id))
+        repo = CachedRepository(slow)
+
+        async def fixed_plan(*args):
+            return plan
+        monkeypatch.setattr(warmup, 'build_warmup_plan', fixed_plan)
+
+        report, task = await start_warmup(repo, db=None, deadline=0.01, concurrency=1)
+
+        assert task is not None
+        assert report.deadline_exceeded
+        assert report.coverage < 1.0
+
+        await task
+        assert report.state == "complete"
+        assert report.to_dict()['coverage'] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_planning_failure_reported(self, monkeypatch, base):
+        async def failing_plan(*args):
+            raise RuntimeError("index missing")
+        monkeypatch.setattr(warmup, 'build_warmup_plan', failing_plan)
+
+        report, task = await start_warmup(CachedRepository(base), db=None)
+
+        assert task is None
+        assert report.state == "failed"
+        assert not report.deadline_exceeded
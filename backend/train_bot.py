@@ -10,7 +10,7 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from services.ai.embeddings import KnowledgeBaseTrainer
+from services.ai.embeddings import get_knowledge_base
 
 
 async def main():
@@ -21,7 +21,7 @@ async def main():
     
     # Initialize trainer
     print("📦 Initializing knowledge base trainer...")
-    trainer = KnowledgeBaseTrainer()
+    trainer = get_knowledge_base()
     print()
     
     # Train all data
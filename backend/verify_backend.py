@@ -149,10 +149,10 @@ async def verify_embeddings():
     print("5️⃣  Verifying Embeddings Setup...")
     
     try:
-        from services.ai.embeddings import KnowledgeBaseTrainer
+        from services.ai.embeddings import get_knowledge_base
         
         # Initialize trainer
-        trainer = KnowledgeBaseTrainer()
+        trainer = get_knowledge_base()
         print("   ✅ Knowledge base trainer initialized")
         
         # Test search (will be empty if not trained)